@@ -0,0 +1,41 @@
+"""
+Gunicorn settings, read by ``gunicorn -c gunicorn.conf.py`` (see Procfile).
+
+By default this serves the WSGI app with sync workers. Set TRACKER_ASGI=True
+to serve ``pushup_counter.asgi`` through uvicorn workers instead; the same
+variable makes Django route the dashboard, leaderboard, profile and feed API
+to their async views. The ASGI path needs ``pip install uvicorn-worker``.
+
+Compare the two with ``python manage.py benchmark_views`` before switching.
+"""
+import multiprocessing
+import os
+
+asgi = os.environ.get('TRACKER_ASGI', 'False') == 'True'
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+# Seen by the workers' Django settings, which refuse a per-process cache for several workers
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+if asgi:
+    wsgi_app = 'pushup_counter.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'pushup_counter.wsgi:application'
+    worker_class = 'sync'
+    # Sync workers block on each request; threads let one worker overlap DB waits
+    threads = int(os.environ.get('GUNICORN_THREADS', 1))
+
+# Sync workers are killed after this many seconds on one request (keep it
+# above the slowest export); uvicorn workers only use it as a heartbeat
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to cap memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = 100
+
+accesslog = '-'
+errorlog = '-'
@@ -2,6 +2,8 @@
 ASGI config for pushup_counter project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. uvicorn) to stream the live activity feed
+over server-sent events (``TRACKER_FEED_SSE=True``).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -49,6 +51,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Per-user "today" and month boundaries (needs the user)
+    'tracker.middleware.UserTimezoneMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -77,13 +81,85 @@ WSGI_APPLICATION = 'pushup_counter.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# DJANGO_SQLITE_TUNED=True switches SQLite to settings that let several
+# workers write at once without "database is locked" errors (see ENV_CONFIG.md)
+SQLITE_TUNED_OPTIONS = {
+    # Wait up to this many seconds for another writer to finish
+    'timeout': 20,
+    # Take the write lock when a transaction begins: a transaction that reads
+    # first and has to upgrade its lock later fails at once instead of waiting
+    'transaction_mode': 'IMMEDIATE',
+    # Run on every new connection
+    'init_command': (
+        # Readers no longer block the writer, nor the writer the readers
+        'PRAGMA journal_mode=WAL;'
+        # Safe with WAL: only a power loss can drop the last commits
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA mmap_size=134217728;'
+        # In KiB when negative: 20 MB of page cache per connection
+        'PRAGMA cache_size=-20000;'
+    ),
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('DJANGO_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': SQLITE_TUNED_OPTIONS if os.environ.get('DJANGO_SQLITE_TUNED', 'False') == 'True' else {},
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# DJANGO_CACHE_BACKEND picks locmem, file or redis; DJANGO_CACHE_LOCATION is the
+# directory (file) or URL (redis). Writes invalidate cached pages by bumping
+# versions in this cache, which only reaches other workers through a shared
+# backend: locmem is the default with DEBUG on, file otherwise.
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_LOCATIONS = {
+    'locmem': 'pushup-counter',
+    'file': '/var/tmp/pushup_counter_cache',
+    'redis': 'redis://127.0.0.1:6379/1',
+}
+_cache_backend = os.environ.get('DJANGO_CACHE_BACKEND', 'locmem' if DEBUG else 'file')
+# gunicorn.conf.py exports its worker count as WEB_CONCURRENCY
+if _cache_backend == 'locmem' and int(os.environ.get('WEB_CONCURRENCY', 1)) > 1:
+    raise ImproperlyConfigured(
+        'DJANGO_CACHE_BACKEND=locmem is per-process; use file or redis with more than one worker.'
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[_cache_backend],
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', CACHE_LOCATIONS[_cache_backend]),
     }
 }
 
+# How long cached leaderboards and stats live (seconds); writes invalidate them sooner
+TRACKER_CACHE_TIMEOUT = int(os.environ.get('TRACKER_CACHE_TIMEOUT', 60 * 60))
+# How long a user's timezone stays cached (seconds); a profile change drops it sooner
+TRACKER_TIMEZONE_CACHE_TIMEOUT = int(os.environ.get('TRACKER_TIMEZONE_CACHE_TIMEOUT', 5 * 60))
+
+# Live activity feed: the dashboard polls /api/feed/?after=<cursor> every
+# TRACKER_FEED_POLL_INTERVAL seconds, or, with TRACKER_FEED_SSE on (ASGI server
+# only), listens on /api/feed/stream/ where one query per interval serves
+# every connected dashboard in the process.
+TRACKER_FEED_SSE = os.environ.get('TRACKER_FEED_SSE', 'False') == 'True'
+TRACKER_FEED_POLL_INTERVAL = float(os.environ.get('TRACKER_FEED_POLL_INTERVAL', 5))
+TRACKER_FEED_BUFFER = int(os.environ.get('TRACKER_FEED_BUFFER', 100))
+TRACKER_FEED_STREAM_LIFETIME = int(os.environ.get('TRACKER_FEED_STREAM_LIFETIME', 300))
+
+# Serve the dashboard, leaderboard, profile and feed API from their async
+# versions (tracker/async_views.py). Turn on together with an ASGI server;
+# gunicorn.conf.py switches to uvicorn workers on the same variable.
+TRACKER_ASYNC_VIEWS = os.environ.get('TRACKER_ASGI', 'False') == 'True'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
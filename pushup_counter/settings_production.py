@@ -7,6 +7,9 @@ Usage: python manage.py runserver --settings=pushup_counter.settings_production
 
 from pathlib import Path
 import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -45,6 +48,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Per-user "today" and month boundaries (needs the user)
+    'tracker.middleware.UserTimezoneMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,6 +76,28 @@ WSGI_APPLICATION = 'pushup_counter.wsgi.application'
 
 # Database
 # For production, use PostgreSQL instead of SQLite
+# Connections (see ENV_CONFIG.md): by default each worker thread keeps its
+# connection open for DB_CONN_MAX_AGE seconds instead of reconnecting on
+# every request. DB_POOL=True uses a psycopg 3 pool per worker process
+# instead, which is the right choice under ASGI, where Django's persistent
+# connections are not reused across requests.
+DB_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+_db_options = {}
+# Cancel runaway queries before gunicorn kills the worker (GUNICORN_TIMEOUT)
+_statement_timeout = int(os.environ.get('DB_STATEMENT_TIMEOUT', 30000))
+# Not for migrate: index builds and backfills on large tables may take longer,
+# and a migration cancelled halfway has to be repaired by hand
+_migrating = sys.argv[1:2] == ['migrate']
+if _statement_timeout and not _migrating:
+    _db_options['options'] = f'-c statement_timeout={_statement_timeout}'
+if DB_POOL:
+    _db_options['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 4)),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+_default_max_age = 0 if os.environ.get('TRACKER_ASGI', 'False') == 'True' else 60
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -79,17 +106,70 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', ''),
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # A pool replaces persistent connections; Django rejects both at once
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', _default_max_age)),
+        # Check a reused connection before the request's first query, so a
+        # connection the server dropped while idle is replaced, not an error
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+        'OPTIONS': _db_options,
     }
 }
 
-# If you want to keep using SQLite in production (not recommended but works):
+# If you want to keep using SQLite in production (not recommended but works),
+# use the tuned options from settings.py so concurrent writers wait their turn:
+# from .settings import SQLITE_TUNED_OPTIONS
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
 #         'NAME': BASE_DIR / 'db.sqlite3',
+#         'OPTIONS': SQLITE_TUNED_OPTIONS,
 #     }
 # }
 
+# Cache (see ENV_CONFIG.md): locmem is per-process, so use file or redis
+# when running more than one worker
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_LOCATIONS = {
+    'locmem': 'pushup-counter',
+    'file': '/var/tmp/pushup_counter_cache',
+    'redis': 'redis://127.0.0.1:6379/1',
+}
+_cache_backend = os.environ.get('DJANGO_CACHE_BACKEND', 'file')
+# gunicorn.conf.py exports its worker count as WEB_CONCURRENCY
+if _cache_backend == 'locmem' and int(os.environ.get('WEB_CONCURRENCY', 1)) > 1:
+    raise ImproperlyConfigured(
+        'DJANGO_CACHE_BACKEND=locmem is per-process; use file or redis with more than one worker.'
+    )
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[_cache_backend],
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', CACHE_LOCATIONS[_cache_backend]),
+    }
+}
+
+TRACKER_CACHE_TIMEOUT = int(os.environ.get('TRACKER_CACHE_TIMEOUT', 60 * 60))
+# How long a user's timezone stays cached (seconds); a profile change drops it sooner
+TRACKER_TIMEZONE_CACHE_TIMEOUT = int(os.environ.get('TRACKER_TIMEZONE_CACHE_TIMEOUT', 5 * 60))
+
+# Live activity feed: the dashboard polls /api/feed/?after=<cursor> every
+# TRACKER_FEED_POLL_INTERVAL seconds, or, with TRACKER_FEED_SSE on (ASGI server
+# only), listens on /api/feed/stream/ where one query per interval serves
+# every connected dashboard in the process.
+TRACKER_FEED_SSE = os.environ.get('TRACKER_FEED_SSE', 'False') == 'True'
+TRACKER_FEED_POLL_INTERVAL = float(os.environ.get('TRACKER_FEED_POLL_INTERVAL', 5))
+TRACKER_FEED_BUFFER = int(os.environ.get('TRACKER_FEED_BUFFER', 100))
+TRACKER_FEED_STREAM_LIFETIME = int(os.environ.get('TRACKER_FEED_STREAM_LIFETIME', 300))
+
+# Serve the dashboard, leaderboard, profile and feed API from their async
+# versions (tracker/async_views.py). Turn on together with an ASGI server;
+# gunicorn.conf.py switches to uvicorn workers on the same variable.
+TRACKER_ASYNC_VIEWS = os.environ.get('TRACKER_ASGI', 'False') == 'True'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -109,8 +189,17 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
-# WhiteNoise configuration for serving static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# WhiteNoise serves collected files with content hashes in their names, gzip
+# and brotli variants (brotli needs the Brotli package) and a far-future
+# immutable Cache-Control header
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 
 # Media files (if you add user uploads later)
 MEDIA_URL = '/media/'
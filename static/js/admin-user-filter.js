@@ -0,0 +1,14 @@
+// Admin changelist: reload the list for the user picked in the autocomplete
+// filter (UserAutocompleteFilter in tracker/admin.py)
+window.addEventListener('load', function() {
+    django.jQuery('#changelist-filter select[data-user-filter]').on('change', function() {
+        const params = new URLSearchParams(window.location.search);
+        params.delete('p');
+        if (this.value) {
+            params.set('user', this.value);
+        } else {
+            params.delete('user');
+        }
+        window.location.search = params.toString();
+    });
+});
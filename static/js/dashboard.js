@@ -0,0 +1,218 @@
+// Dashboard: the month chart, the live activity feed and refreshing the stats
+// URLs and settings come from the script tag's data- attributes, since this file is static
+const dashboard = document.currentScript.dataset;
+
+document.addEventListener('DOMContentLoaded', function() {
+    const ctx = document.getElementById('pushupChart').getContext('2d');
+    
+    // Chart data from the page's json_script blocks
+    const labels = JSON.parse(document.getElementById('chart-labels').textContent);
+    const data = JSON.parse(document.getElementById('chart-data').textContent);
+    
+    // Create gradient
+    const gradient = ctx.createLinearGradient(0, 0, 0, 300);
+    gradient.addColorStop(0, 'rgba(102, 126, 234, 0.8)');
+    gradient.addColorStop(1, 'rgba(118, 75, 162, 0.8)');
+    
+    const chart = window.pushupChart = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: labels,
+            datasets: [{
+                label: 'Pushups',
+                data: data,
+                backgroundColor: gradient,
+                borderColor: 'rgba(102, 126, 234, 1)',
+                borderWidth: 2,
+                borderRadius: 8,
+                borderSkipped: false,
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: false
+                },
+                tooltip: {
+                    backgroundColor: 'rgba(0, 0, 0, 0.8)',
+                    padding: 12,
+                    cornerRadius: 8,
+                    titleFont: {
+                        size: 14,
+                        weight: 'bold'
+                    },
+                    bodyFont: {
+                        size: 13
+                    },
+                    callbacks: {
+                        title: function(context) {
+                            return 'Day ' + context[0].label;
+                        },
+                        label: function(context) {
+                            return context.parsed.y + ' pushups';
+                        }
+                    }
+                }
+            },
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    ticks: {
+                        stepSize: 10,
+                        font: {
+                            size: 12
+                        }
+                    },
+                    grid: {
+                        color: 'rgba(0, 0, 0, 0.05)'
+                    }
+                },
+                x: {
+                    ticks: {
+                        font: {
+                            size: 11
+                        },
+                        maxRotation: 0,
+                        autoSkip: true,
+                        maxTicksLimit: 15
+                    },
+                    grid: {
+                        display: false
+                    }
+                }
+            },
+            interaction: {
+                intersect: false,
+                mode: 'index'
+            }
+        }
+    });
+});
+
+// Live activity: new feed items are prepended as they arrive, either pushed
+// over server-sent events or fetched with ?after=<cursor> polling.
+(function() {
+    const feed = document.getElementById('activity-feed');
+    const feedSize = Number(dashboard.feedSize);
+    const pollInterval = Number(dashboard.feedPollInterval) * 1000;
+    const currentUser = dashboard.username;
+    const today = dashboard.today;
+    const yesterday = dashboard.yesterday;
+    let cursor = feed.dataset.cursor;
+
+    function feedItem(item) {
+        const mine = item.username === currentUser;
+        const element = document.createElement('div');
+        element.className = 'activity-item mb-3 pb-3 border-bottom';
+        element.innerHTML =
+            '<div class="d-flex align-items-start">' +
+                '<div class="activity-icon me-2"><i class="bi ' + (mine ? 'bi-person-fill text-primary' : 'bi-person text-secondary') + '"></i></div>' +
+                '<div class="flex-grow-1">' +
+                    '<div class="activity-content"><strong></strong> logged <span class="badge bg-primary"></span> pushups</div>' +
+                    '<small class="text-muted"><i class="bi bi-clock"></i> just now</small>' +
+                '</div>' +
+            '</div>';
+        element.querySelector('strong').textContent = mine ? 'You' : item.username;
+        element.querySelector('.badge').textContent = item.count;
+        const badge = item.date === today ? ['bg-success', 'Today'] : item.date === yesterday ? ['bg-secondary', 'Yesterday'] : null;
+        if (badge) {
+            const span = document.createElement('span');
+            span.className = 'badge ' + badge[0];
+            span.textContent = badge[1];
+            element.querySelector('.activity-content').append(' ', span);
+        }
+        return element;
+    }
+
+    function prepend(items) {
+        const empty = document.getElementById('activity-empty');
+        if (empty && items.length) {
+            empty.remove();
+        }
+        // items arrive oldest first
+        items.forEach((item) => feed.prepend(feedItem(item)));
+        const rows = feed.querySelectorAll('.activity-item');
+        for (let i = feedSize; i < rows.length; i++) {
+            rows[i].remove();
+        }
+        const last = feed.querySelector('.activity-item:last-child');
+        if (last) {
+            last.classList.remove('border-bottom');
+        }
+    }
+
+    function poll() {
+        if (document.visibilityState !== 'visible') {
+            return;
+        }
+        const url = dashboard.feedUrl + (cursor ? '?after=' + encodeURIComponent(cursor) : '');
+        fetch(url, { credentials: 'same-origin' })
+            .then((response) => response.ok ? response.json() : null)
+            .then((page) => {
+                if (!page || !page.rows.length) return;
+                const items = page.rows.map((row) => Object.fromEntries(page.columns.map((column, i) => [column, row[i]])));
+                prepend(items.reverse());
+                cursor = page.cursor;
+            })
+            .catch(() => {});
+    }
+
+    function startPolling() {
+        setInterval(poll, pollInterval);
+    }
+
+    // Only set when the server has TRACKER_FEED_SSE on
+    if (dashboard.feedStreamUrl && window.EventSource) {
+        const source = new EventSource(dashboard.feedStreamUrl + (cursor ? '?after=' + encodeURIComponent(cursor) : ''));
+        source.addEventListener('entry', (event) => {
+            prepend([JSON.parse(event.data)]);
+            cursor = event.lastEventId;
+        });
+        source.addEventListener('reload', (event) => {
+            // We fell too far behind; a page reload resyncs the whole feed
+            cursor = JSON.parse(event.data).cursor;
+            window.location.reload();
+        });
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                startPolling();
+            }
+        };
+        return;
+    }
+    startPolling();
+})();
+
+// Refresh the numbers from the JSON API when the tab becomes visible again.
+// The API answers 304 (via ETag) when nothing has changed.
+document.addEventListener('visibilitychange', function() {
+    if (document.visibilityState !== 'visible') {
+        return;
+    }
+    // Day of the month on the user's own calendar, not the browser's or UTC's
+    const today = Number(new Intl.DateTimeFormat('en-US', { day: 'numeric', timeZone: dashboard.timezone }).format(new Date()));
+
+    fetch(dashboard.statsUrl, { credentials: 'same-origin' })
+        .then((response) => response.ok ? response.json() : null)
+        .then((stats) => {
+            if (!stats) return;
+            document.getElementById('stat-total').textContent = stats.total;
+            document.getElementById('stat-average').textContent = stats.average;
+            document.getElementById('stat-best').textContent = stats.best_day;
+            document.getElementById('stat-rank').textContent = stats.rank ? '#' + stats.rank : '-';
+            document.getElementById('stat-competitors').textContent = stats.competitors;
+        })
+        .catch(() => {});
+
+    fetch(dashboard.chartUrl, { credentials: 'same-origin' })
+        .then((response) => response.ok ? response.json() : null)
+        .then((chart) => {
+            if (!chart || !window.pushupChart) return;
+            window.pushupChart.data.datasets[0].data = chart.data;
+            window.pushupChart.update();
+            document.getElementById('stat-today').textContent = chart.data[today - 1] || 0;
+        })
+        .catch(() => {});
+});
@@ -0,0 +1,77 @@
+// Entry form: without a connection, keep the entry on the device and send it later
+// (offline-queue.js provides PushupQueue)
+document.addEventListener('DOMContentLoaded', function() {
+    if (!('indexedDB' in window) || !('randomUUID' in crypto)) {
+        return;
+    }
+    const form = document.getElementById('entry-form');
+    const status = document.getElementById('offline-queue-status');
+    const csrfToken = form.querySelector('[name=csrfmiddlewaretoken]').value;
+
+    function showStatus(message) {
+        status.textContent = message;
+        status.classList.remove('d-none');
+    }
+
+    function requestSync() {
+        if (!('serviceWorker' in navigator)) {
+            return PushupQueue.flush(csrfToken);
+        }
+        return navigator.serviceWorker.ready.then(function(registration) {
+            if ('sync' in registration) {
+                return registration.sync.register(PushupQueue.SYNC_TAG);
+            }
+            registration.active.postMessage({ type: 'flush-queue' });
+        });
+    }
+
+    function queueEntry() {
+        const data = new FormData(form);
+        return PushupQueue.add({
+            date: data.get('date'),
+            count: parseInt(data.get('count'), 10),
+            notes: data.get('notes'),
+        }, csrfToken).then(function() {
+            form.reset();
+            showStatus('You are offline. The entry was saved on this device and will be sent when you reconnect.');
+            return requestSync().catch(function() {});
+        });
+    }
+
+    form.addEventListener('submit', function(event) {
+        if (navigator.onLine || !form.checkValidity()) {
+            return;
+        }
+        event.preventDefault();
+        queueEntry();
+    });
+
+    window.addEventListener('online', function() {
+        requestSync().catch(function() {});
+    });
+
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.addEventListener('message', function(event) {
+            if (event.data && event.data.type === 'queue-synced') {
+                const result = event.data.result;
+                const parts = [];
+                if (result.created) {
+                    parts.push(result.created + ' queued ' + (result.created === 1 ? 'entry was' : 'entries were') + ' saved.');
+                }
+                if (result.invalid.length) {
+                    parts.push(result.invalid.length + ' could not be saved (for example, a past date).');
+                }
+                if (parts.length) {
+                    showStatus(parts.join(' '));
+                }
+            }
+        });
+    }
+
+    // Anything left from an earlier offline session
+    PushupQueue.all().then(function(items) {
+        if (items.length && navigator.onLine) {
+            requestSync().catch(function() {});
+        }
+    });
+});
@@ -0,0 +1,97 @@
+// Offline entry queue, shared by the pages and the service worker.
+//
+// Entries saved while offline are kept in IndexedDB, each with a client_id
+// generated when it was queued, and flushed in one POST to
+// /api/entries/sync/. The server recognises a client_id it already stored,
+// so a flush that is interrupted halfway can simply be sent again.
+
+(function (scope) {
+  const DB_NAME = 'pushup-offline';
+  const STORE = 'entries';
+  const SYNC_URL = '/api/entries/sync/';
+  const SYNC_TAG = 'sync-pushups';
+  // The server's SYNC_BATCH_LIMIT
+  const BATCH_SIZE = 200;
+
+  function open() {
+    return new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, 1);
+      request.onupgradeneeded = () => {
+        request.result.createObjectStore(STORE, { keyPath: 'client_id' });
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+  }
+
+  function transact(mode, work) {
+    return open().then((db) => new Promise((resolve, reject) => {
+      const tx = db.transaction(STORE, mode);
+      const result = work(tx.objectStore(STORE));
+      tx.oncomplete = () => { db.close(); resolve(result.result); };
+      tx.onerror = () => { db.close(); reject(tx.error); };
+    }));
+  }
+
+  function add(entry, csrfToken) {
+    const item = {
+      client_id: scope.crypto.randomUUID(),
+      date: entry.date,
+      count: entry.count,
+      notes: entry.notes || '',
+      csrf: csrfToken,
+      queued_at: Date.now(),
+    };
+    return transact('readwrite', (store) => store.put(item)).then(() => item);
+  }
+
+  function all() {
+    return transact('readonly', (store) => store.getAll());
+  }
+
+  function remove(clientIds) {
+    return transact('readwrite', (store) => {
+      clientIds.forEach((clientId) => store.delete(clientId));
+      return {};
+    });
+  }
+
+  // POST queued entries and drop those the server settled (created,
+  // duplicate or invalid). Rejects on a network error so the caller can
+  // retry; an expired session or CSRF token leaves the queue untouched.
+  function flush(csrfToken) {
+    return all().then((items) => {
+      if (!items.length) {
+        return { created: 0, invalid: [], pending: 0 };
+      }
+      const batch = items.slice(0, BATCH_SIZE);
+      return fetch(SYNC_URL, {
+        method: 'POST',
+        credentials: 'same-origin',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-CSRFToken': csrfToken || batch[0].csrf,
+        },
+        body: JSON.stringify({
+          entries: batch.map((item) => ({
+            client_id: item.client_id, date: item.date, count: item.count, notes: item.notes,
+          })),
+        }),
+      }).then((response) => {
+        if (!response.ok) {
+          return { created: 0, invalid: [], pending: items.length, status: response.status };
+        }
+        return response.json().then((payload) => {
+          const invalid = payload.results.filter((result) => result.status === 'invalid');
+          return remove(payload.results.map((result) => result.client_id)).then(() => ({
+            created: payload.created,
+            invalid: invalid,
+            pending: items.length - payload.results.length,
+          }));
+        });
+      });
+    });
+  }
+
+  scope.PushupQueue = { add, all, flush, SYNC_TAG };
+})(self);
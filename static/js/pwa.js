@@ -0,0 +1,79 @@
+// PWA: service worker registration and the install button, loaded by base.html
+// The worker's URL comes from the script tag, since this file is static
+const serviceWorkerUrl = document.currentScript.dataset.serviceWorker;
+
+// Register service worker for PWA functionality
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register(serviceWorkerUrl)
+            .then((registration) => {
+                console.log('✅ Service Worker registered successfully:', registration.scope);
+
+                // Check for updates periodically
+                setInterval(() => {
+                    registration.update();
+                }, 60000); // Check every minute
+            })
+            .catch((error) => {
+                console.log('❌ Service Worker registration failed:', error);
+            });
+    });
+}
+
+// Install prompt for PWA
+let deferredPrompt;
+
+window.addEventListener('beforeinstallprompt', (e) => {
+    console.log('💡 Install prompt available');
+    // Prevent the mini-infobar from appearing on mobile
+    e.preventDefault();
+    // Store the event so it can be triggered later
+    deferredPrompt = e;
+    // Show your custom install button (we'll add this next)
+    showInstallButton();
+});
+
+function showInstallButton() {
+    // Check if already installed
+    if (window.matchMedia('(display-mode: standalone)').matches) {
+        console.log('✅ App already installed');
+        return;
+    }
+
+    // Show install button in UI
+    const installButton = document.getElementById('pwa-install-button');
+    if (installButton) {
+        installButton.style.display = 'block';
+    }
+}
+
+// Handle install button click
+window.installPWA = function() {
+    if (!deferredPrompt) {
+        console.log('Install prompt not available');
+        return;
+    }
+
+    // Show the install prompt
+    deferredPrompt.prompt();
+
+    // Wait for the user's response
+    deferredPrompt.userChoice.then((choiceResult) => {
+        if (choiceResult.outcome === 'accepted') {
+            console.log('✅ User accepted the install prompt');
+        } else {
+            console.log('❌ User dismissed the install prompt');
+        }
+        deferredPrompt = null;
+    });
+};
+
+// Detect if app is already installed
+window.addEventListener('appinstalled', () => {
+    console.log('✅ PWA was installed');
+    // Hide install button
+    const installButton = document.getElementById('pwa-install-button');
+    if (installButton) {
+        installButton.style.display = 'none';
+    }
+});
@@ -0,0 +1,18 @@
+// Fill [data-browser-timezone] fields with the browser's IANA timezone:
+// a hidden input gets the value if empty, a select is preselected when the
+// user has not chosen anything yet (data-browser-timezone="suggest")
+document.addEventListener('DOMContentLoaded', function() {
+    const browserTimezone = Intl.DateTimeFormat().resolvedOptions().timeZone;
+    if (!browserTimezone) return;
+
+    document.querySelectorAll('[data-browser-timezone]').forEach(function(field) {
+        if (field.tagName === 'SELECT') {
+            if (field.dataset.browserTimezone !== 'suggest') return;
+            if (Array.from(field.options).some((option) => option.value === browserTimezone)) {
+                field.value = browserTimezone;
+            }
+        } else if (!field.value) {
+            field.value = browserTimezone;
+        }
+    });
+});
@@ -1,208 +0,0 @@
-// Service Worker for Pushup Counter PWA
-// Version 1.0.0
-
-const CACHE_NAME = 'pushup-counter-v1';
-const urlsToCache = [
-  '/',
-  '/dashboard/',
-  '/leaderboard/',
-  '/add/',
-  '/history/',
-  '/static/css/custom.css',
-  '/static/js/custom.js',
-  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css',
-  'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/bootstrap-icons.css',
-  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js',
-  'https://cdn.jsdelivr.net/npm/chart.js',
-];
-
-// Install Service Worker and cache files
-self.addEventListener('install', (event) => {
-  console.log('[Service Worker] Installing...');
-  event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then((cache) => {
-        console.log('[Service Worker] Caching app shell');
-        return cache.addAll(urlsToCache);
-      })
-      .catch((error) => {
-        console.log('[Service Worker] Caching failed:', error);
-      })
-  );
-  // Activate immediately
-  self.skipWaiting();
-});
-
-// Activate Service Worker and clean up old caches
-self.addEventListener('activate', (event) => {
-  console.log('[Service Worker] Activating...');
-  event.waitUntil(
-    caches.keys().then((cacheNames) => {
-      return Promise.all(
-        cacheNames.map((cacheName) => {
-          if (cacheName !== CACHE_NAME) {
-            console.log('[Service Worker] Deleting old cache:', cacheName);
-            return caches.delete(cacheName);
-          }
-        })
-      );
-    })
-  );
-  // Take control immediately
-  return self.clients.claim();
-});
-
-// Fetch Strategy: Cache First, then Network
-self.addEventListener('fetch', (event) => {
-  // Skip non-GET requests
-  if (event.request.method !== 'GET') {
-    return;
-  }
-
-  // Skip Chrome extensions and other non-http(s) requests
-  if (!event.request.url.startsWith('http')) {
-    return;
-  }
-
-  event.respondWith(
-    caches.match(event.request)
-      .then((cachedResponse) => {
-        // Return cached version if available
-        if (cachedResponse) {
-          // Update cache in background
-          fetch(event.request).then((response) => {
-            if (response && response.status === 200) {
-              caches.open(CACHE_NAME).then((cache) => {
-                cache.put(event.request, response.clone());
-              });
-            }
-          }).catch(() => {
-            // Network failed, but we have cache
-          });
-          return cachedResponse;
-        }
-
-        // Not in cache, fetch from network
-        return fetch(event.request)
-          .then((response) => {
-            // Check if valid response
-            if (!response || response.status !== 200 || response.type === 'error') {
-              return response;
-            }
-
-            // Clone response (can only be consumed once)
-            const responseToCache = response.clone();
-
-            // Cache successful responses
-            caches.open(CACHE_NAME)
-              .then((cache) => {
-                cache.put(event.request, responseToCache);
-              });
-
-            return response;
-          })
-          .catch(() => {
-            // Network failed and no cache
-            // Return offline page or default response
-            return new Response(
-              '<html><body><h1>Offline</h1><p>No internet connection. Please try again later.</p></body></html>',
-              {
-                headers: { 'Content-Type': 'text/html' }
-              }
-            );
-          });
-      })
-  );
-});
-
-// Handle push notifications (for Android/Desktop)
-self.addEventListener('push', (event) => {
-  console.log('[Service Worker] Push received:', event);
-  
-  let data = {};
-  if (event.data) {
-    data = event.data.json();
-  }
-
-  const title = data.title || 'Pushup Counter';
-  const options = {
-    body: data.body || 'You have a new notification',
-    icon: '/static/icons/icon-192x192.png',
-    badge: '/static/icons/icon-96x96.png',
-    vibrate: [200, 100, 200],
-    data: {
-      url: data.url || '/',
-      dateOfArrival: Date.now(),
-    },
-    actions: [
-      {
-        action: 'open',
-        title: 'View',
-        icon: '/static/icons/icon-96x96.png'
-      },
-      {
-        action: 'close',
-        title: 'Close',
-        icon: '/static/icons/icon-96x96.png'
-      }
-    ],
-    tag: data.tag || 'default',
-    requireInteraction: false,
-  };
-
-  event.waitUntil(
-    self.registration.showNotification(title, options)
-  );
-});
-
-// Handle notification clicks
-self.addEventListener('notificationclick', (event) => {
-  console.log('[Service Worker] Notification click:', event);
-  
-  event.notification.close();
-
-  if (event.action === 'close') {
-    return;
-  }
-
-  // Open the app
-  const urlToOpen = event.notification.data.url || '/';
-  
-  event.waitUntil(
-    clients.matchAll({ type: 'window', includeUncontrolled: true })
-      .then((windowClients) => {
-        // Check if app is already open
-        for (let i = 0; i < windowClients.length; i++) {
-          const client = windowClients[i];
-          if (client.url === urlToOpen && 'focus' in client) {
-            return client.focus();
-          }
-        }
-        // App not open, open new window
-        if (clients.openWindow) {
-          return clients.openWindow(urlToOpen);
-        }
-      })
-  );
-});
-
-// Background sync (for when connection returns)
-self.addEventListener('sync', (event) => {
-  console.log('[Service Worker] Background sync:', event.tag);
-  
-  if (event.tag === 'sync-pushups') {
-    event.waitUntil(
-      // Sync pending pushup entries when back online
-      syncPendingData()
-    );
-  }
-});
-
-// Helper function to sync pending data
-function syncPendingData() {
-  // This would sync any pending pushup entries saved while offline
-  // For now, just log
-  console.log('[Service Worker] Syncing pending data...');
-  return Promise.resolve();
-}
-
@@ -1,17 +1,228 @@
-from django.contrib import admin
-from .models import PushupEntry
+from datetime import timedelta
+from functools import partial
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import actions as admin_actions
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db import transaction
+from django.db.models import DateField, ExpressionWrapper, F, Q
+from django.http import Http404
+from django.urls import path
+from django.utils import timezone
+from . import cache
+from .exports import FORMATS, stream_export
+from .models import PushupEntry, MonthlyTotal, DailyTotal, LeaderboardSnapshot, Profile
+from .pagination import EstimatedCountPaginator
+from .services import refresh_summaries
+
+
+class UserAutocompleteFilter(admin.SimpleListFilter):
+    """
+    Filter by user through the admin's autocomplete view, instead of a
+    sidebar listing every user.
+    """
+    title = 'user'
+    parameter_name = 'user'
+    template = 'admin/tracker/user_autocomplete_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            try:
+                return queryset.filter(user_id=int(self.value()))
+            except ValueError:
+                raise IncorrectLookupParameters('Invalid user.')
+        return queryset
+
+    def choices(self, changelist):
+        user_field = PushupEntry._meta.get_field('user')
+        field = forms.ModelChoiceField(
+            user_field.remote_field.model.objects.all(), required=False,
+            widget=AutocompleteSelect(
+                user_field, changelist.model_admin.admin_site,
+                attrs={'data-user-filter': '', 'style': 'width: 100%'},
+            ),
+        )
+        yield {
+            # Only the selected user is loaded; the rest come from the autocomplete view
+            'widget': field.widget.render(self.parameter_name, self.value()),
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+        }
 
 
 @admin.register(PushupEntry)
 class PushupEntryAdmin(admin.ModelAdmin):
     list_display = ('user', 'date', 'count', 'created_at')
-    list_filter = ('date', 'user')
-    search_fields = ('user__username', 'notes')
-    date_hierarchy = 'date'
+    list_filter = (UserAutocompleteFilter, 'date')
+    list_select_related = ('user',)
+    # Exact username or entry id only (see get_search_results)
+    search_fields = ('user__username',)
+    search_help_text = 'Exact username or entry id.'
+    autocomplete_fields = ('user',)
     ordering = ('-date', '-created_at')
+    # No COUNT(*) of the whole table, and large filtered counts are estimated
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    actions = ['delete_selected', 'move_to_previous_day', 'move_to_next_day', 'clear_notes']
+    change_list_template = 'admin/tracker/pushupentry/change_list.html'
+    export_columns = ('id', 'user__username', 'date', 'count', 'notes', 'created_at', 'updated_at')
+
+    @property
+    def media(self):
+        # The user filter needs the autocomplete widget's select2 assets
+        widget = AutocompleteSelect(PushupEntry._meta.get_field('user'), self.admin_site)
+        return super().media + widget.media + forms.Media(js=['js/admin-user-filter.js'])
     
     def get_readonly_fields(self, request, obj=None):
         if obj:  # Editing an existing object
             return ('created_at', 'updated_at')
         return ('created_at', 'updated_at')
 
+    def get_urls(self):
+        urls = [
+            path(
+                'export.<str:fmt>',
+                self.admin_site.admin_view(self.export_view),
+                name='tracker_pushupentry_export',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def export_view(self, request, fmt):
+        """Stream every entry (all users) as CSV or NDJSON."""
+        if fmt not in FORMATS or not self.has_view_permission(request):
+            raise Http404
+        rows = PushupEntry.objects.order_by('id').values_list(*self.export_columns).iterator(chunk_size=5000)
+        return stream_export(self.export_columns, rows, 'pushup-entries', fmt)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Equality lookups hit the username and primary key indexes; a
+        # LIKE '%term%' over usernames and notes would scan every row
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        query = Q(user__username=term)
+        if term.isdigit():
+            query |= Q(pk=int(term))
+        return queryset.filter(query), False
+
+    def get_deleted_objects(self, objs, request):
+        # Nothing references an entry, so the confirmation page shows a count
+        # instead of collecting and listing every selected row
+        count = len(objs) if isinstance(objs, list) else objs.count()
+        perms_needed = set() if self.has_delete_permission(request) else {PushupEntry._meta.verbose_name}
+        return [f'{count} pushup entries'], {PushupEntry._meta.verbose_name_plural: count}, perms_needed, []
+
+    def delete_queryset(self, request, queryset):
+        # One DELETE per batch of ids with only the columns the post_delete
+        # signal needs loaded (no per-object delete()), then refresh the
+        # touched months
+        entries = PushupEntry.objects.filter(pk__in=queryset.values('pk')).only('pk', 'user_id', 'date')
+        affected = set(entries.order_by().values_list('user_id', 'date__year', 'date__month').distinct())
+        with transaction.atomic():
+            deleted, _ = entries.delete()
+            refresh_summaries(affected)
+        return deleted
+
+    def log_deletions(self, request, queryset):
+        # The LogEntry repr needs the username, count and date, not the notes
+        return super().log_deletions(
+            request, queryset.select_related('user').only('pk', 'user__username', 'date', 'count')
+        )
+
+    @admin.action(description='Delete selected pushup entries', permissions=['delete'])
+    def delete_selected(self, request, queryset):
+        # The built-in action loads every row in full before deleting; only
+        # its confirmation page is reused
+        if not request.POST.get('post'):
+            return admin_actions.delete_selected(self, request, queryset)
+        self.log_deletions(request, queryset)
+        deleted = self.delete_queryset(request, queryset)
+        self.message_user(request, f'Deleted {deleted} entries.', messages.SUCCESS)
+
+    def _move(self, request, queryset, days):
+        entries = PushupEntry.objects.filter(pk__in=queryset.values('pk'))
+        moved = set(entries.order_by().values_list('user_id', 'date').distinct())
+        affected = {
+            (user_id, day.year, day.month)
+            for user_id, date in moved
+            for day in (date, date + timedelta(days=days))
+        }
+        with transaction.atomic():
+            updated = entries.update(
+                date=ExpressionWrapper(F('date') + timedelta(days=days), output_field=DateField()),
+                updated_at=timezone.now(),
+            )
+            refresh_summaries(affected)
+        self.message_user(request, f'Moved {updated} entries.', messages.SUCCESS)
+
+    @admin.action(description='Move selected entries to the previous day', permissions=['change'])
+    def move_to_previous_day(self, request, queryset):
+        self._move(request, queryset, -1)
+
+    @admin.action(description='Move selected entries to the next day', permissions=['change'])
+    def move_to_next_day(self, request, queryset):
+        self._move(request, queryset, 1)
+
+    @admin.action(description='Clear notes of selected entries', permissions=['change'])
+    def clear_notes(self, request, queryset):
+        entries = PushupEntry.objects.filter(pk__in=queryset.values('pk'))
+        touched = set(entries.order_by().values_list('user_id', 'date__year', 'date__month').distinct())
+        with transaction.atomic():
+            updated = entries.update(notes=None, updated_at=timezone.now())
+            # Totals are unchanged, but cached history, feed and API responses show the notes
+            transaction.on_commit(partial(
+                cache.record_write,
+                [user_id for user_id, _, _ in touched],
+                [(year, month) for _, year, month in touched],
+            ))
+        self.message_user(request, f'Cleared the notes of {updated} entries.', messages.SUCCESS)
+
+
+@admin.register(MonthlyTotal)
+class MonthlyTotalAdmin(admin.ModelAdmin):
+    list_display = ('user', 'year', 'month', 'total', 'days_active', 'best_day')
+    list_filter = ('year', 'month')
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'year', 'month', 'total', 'days_active', 'best_day')
+
+    def has_add_permission(self, request):
+        # Rows are derived from PushupEntry; use rebuild_monthly_totals instead
+        return False
+
+
+@admin.register(DailyTotal)
+class DailyTotalAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'total')
+    search_fields = ('user__username',)
+    list_filter = ('date',)
+    readonly_fields = ('user', 'date', 'total')
+
+    def has_add_permission(self, request):
+        # Rows are derived from PushupEntry; use rebuild_monthly_totals instead
+        return False
+
+
+@admin.register(LeaderboardSnapshot)
+class LeaderboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('year', 'month', 'frozen_at')
+    list_filter = ('year',)
+    readonly_fields = ('year', 'month', 'rows', 'frozen_at')
+
+    def has_add_permission(self, request):
+        # Snapshots are frozen from MonthlyTotal; use freeze_leaderboards instead
+        return False
+
+
+@admin.register(Profile)
+class ProfileAdmin(admin.ModelAdmin):
+    list_display = ('user', 'timezone')
+    search_fields = ('user__username', 'timezone')
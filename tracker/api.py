@@ -0,0 +1,255 @@
+"""
+JSON API for the dashboard, leaderboard, profile and history data, plus
+the bulk endpoint offline clients flush their queued entries to.
+
+Read responses are compact and carry ETag/Last-Modified headers derived
+from the cache versions in cache.py, so a client revalidating unchanged
+data gets a 304 without the server touching the database.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET, require_POST
+
+from . import cache
+from .feed import COLUMNS, event_stream, feed_row, recent_entries
+from .pagination import decode_feed_cursor, encode_feed_cursor, keyset_page
+from .services import month_chart, month_from_request, sync_entries
+from .timezones import local_today
+from .views import filter_history, HISTORY_PAGE_SIZE
+
+
+def api_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={'separators': (',', ':')})
+
+
+def api_login_required(view):
+    """Like login_required, but answers 401 instead of redirecting."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            # Resolved here so the (sync) ETag functions can read request.user
+            request.user = await request.auser()
+            if not request.user.is_authenticated:
+                return api_response({'error': 'Authentication required.'}, status=401)
+            return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return api_response({'error': 'Authentication required.'}, status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def versioned(scopes):
+    """
+    Add conditional-GET support keyed on cache scopes.
+
+    ``scopes(request)`` returns the cache scopes the response depends on.
+    The ETag covers their versions, the user and the query string; the
+    Last-Modified date is the latest change among them.
+    """
+    def etag(request, *args, **kwargs):
+        versions = [f'{scope}={cache.scope_version(scope)}' for scope in scopes(request)]
+        raw = '|'.join([request.path, request.GET.urlencode(), str(request.user.pk), *versions])
+        return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        return max(cache.scope_modified(scope) for scope in scopes(request))
+
+    def decorator(view):
+        view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+        view = cache_control(private=True, no_cache=True)(view)
+        return require_GET(api_login_required(view))
+    return decorator
+
+
+def _month_scopes(request):
+    return [cache.month_scope(*month_from_request(request))]
+
+
+@versioned(_month_scopes)
+def leaderboard(request):
+    year, month = month_from_request(request)
+    board = cache.get_leaderboard(year, month)
+    return api_response({
+        'year': year,
+        'month': month,
+        'competitors': board.competitor_count,
+        'leader_total': board.leader_total,
+        'columns': ['rank', 'user_id', 'username', 'name', 'total'],
+        'rows': [
+            [row.rank, row.user_id, row.username, row.display_name, row.total]
+            for row in board
+        ],
+    })
+
+
+@versioned(_month_scopes)
+def my_stats(request):
+    year, month = month_from_request(request)
+    stats = cache.get_user_stats(request.user, year, month)
+    rank, competitors = cache.get_user_rank(request.user, year, month)
+    return api_response({
+        'year': year,
+        'month': month,
+        **stats,
+        'rank': rank,
+        'competitors': competitors,
+    })
+
+
+@versioned(_month_scopes)
+def my_chart(request):
+    year, month = month_from_request(request)
+    stats = cache.get_user_stats(request.user, year, month, with_series=True)
+    labels, data = month_chart(year, month, stats['daily'])
+    return api_response({'year': year, 'month': month, 'labels': labels, 'data': data})
+
+
+@versioned(lambda request: [cache.user_scope(request.user.pk), cache.day_scope(local_today(request.user))])
+def my_trends(request):
+    """Streaks, weekly/monthly/yearly totals and rolling averages over your whole history."""
+    trends = cache.get_user_trends(request.user, local_today(request.user))
+    return api_response({
+        'current_streak': trends['current_streak'],
+        'longest_streak': trends['longest_streak'],
+        'total': trends['total'],
+        'days_active': trends['days_active'],
+        'rolling': trends['rolling'],
+        'rolling_series': trends['rolling_series'],
+        'weekly': trends['weekly'],
+        'monthly': [[month.strftime('%Y-%m'), total] for month, total in trends['monthly']],
+        'yearly': trends['yearly'],
+    })
+
+
+# Other users one comparison may include (besides the requester)
+COMPARE_LIMIT = 10
+
+
+@versioned(_month_scopes)
+def compare(request):
+    """
+    Head-to-head month for the requester and ``?users=alice,bob`` (up to
+    COMPARE_LIMIT others): totals, daily and running series, and each
+    user's running gap to the requester, from a single grouped query.
+    """
+    year, month = month_from_request(request)
+    names = list(dict.fromkeys(name for name in request.GET.get('users', '').split(',') if name))
+    names = [name for name in names if name != request.user.username]
+    if not names:
+        return api_response({'error': 'Pass ?users= with one or more usernames.'}, status=400)
+    if len(names) > COMPARE_LIMIT:
+        return api_response({'error': f'At most {COMPARE_LIMIT} users per comparison.'}, status=400)
+
+    found = {
+        user.username: user
+        for user in User.objects.filter(username__in=names).only('username', 'first_name', 'last_name')
+    }
+    missing = [name for name in names if name not in found]
+    if missing:
+        return api_response({'error': 'Unknown users.', 'users': missing}, status=404)
+
+    comparison = cache.get_comparison([request.user, *(found[name] for name in names)], year, month)
+    return api_response({
+        'year': year,
+        'month': month,
+        'labels': comparison.labels,
+        'columns': ['user_id', 'username', 'name', 'total', 'days_active', 'best_day', 'daily', 'cumulative', 'gap'],
+        'rows': [
+            [series.user_id, series.username, series.display_name, series.total, series.days_active,
+             series.best_day, series.daily, series.cumulative, series.gap]
+            for series in comparison
+        ],
+    })
+
+
+@versioned(lambda request: [cache.FEED_SCOPE])
+def feed(request):
+    """
+    The latest feed items, or with ``?after=<cursor>`` only those newer than
+    the cursor. ``cursor`` in the response is what to send next time.
+    """
+    after = request.GET.get('after')
+    if after and decode_feed_cursor(after) is None:
+        return api_response({'error': 'Invalid cursor.'}, status=400)
+
+    entries = recent_entries(after)
+    return api_response({
+        'columns': COLUMNS,
+        'rows': [feed_row(entry) for entry in entries],
+        'cursor': encode_feed_cursor(entries[0]) if entries else after,
+        'server_time': timezone.now(),
+    })
+
+
+async def feed_stream(request):
+    """
+    Server-sent events for new feed items (``event: entry``), resuming
+    from ``Last-Event-ID`` or ``?after=``. Only enabled with
+    ``TRACKER_FEED_SSE`` under an ASGI server.
+    """
+    if not getattr(settings, 'TRACKER_FEED_SSE', False):
+        raise Http404('Live feed streaming is disabled.')
+    user = await request.auser()
+    if not user.is_authenticated:
+        return api_response({'error': 'Authentication required.'}, status=401)
+
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('after') or None
+    response = StreamingHttpResponse(
+        event_stream(cursor, lifetime=getattr(settings, 'TRACKER_FEED_STREAM_LIFETIME', 300)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx and similar proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@versioned(lambda request: [cache.user_scope(request.user.pk)])
+def history(request):
+    entries, year, month = filter_history(request)
+    page, next_cursor = keyset_page(entries, request.GET.get('after'), page_size=HISTORY_PAGE_SIZE)
+    return api_response({
+        'columns': ['id', 'date', 'count', 'notes', 'created_at'],
+        'rows': [[entry.pk, entry.date, entry.count, entry.notes, entry.created_at] for entry in page],
+        'next': next_cursor,
+    })
+
+
+# Entries one sync request may carry
+SYNC_BATCH_LIMIT = 200
+
+
+@require_POST
+@api_login_required
+def sync(request):
+    """
+    Store entries queued offline: ``{"entries": [{"client_id", "date",
+    "count", "notes"}, ...]}``. Safe to retry; see ``services.sync_entries``.
+    """
+    try:
+        entries = json.loads(request.body)['entries']
+    except (ValueError, KeyError, TypeError):
+        return api_response({'error': 'Expected a JSON object with an "entries" list.'}, status=400)
+    if not isinstance(entries, list):
+        return api_response({'error': '"entries" must be a list.'}, status=400)
+    if len(entries) > SYNC_BATCH_LIMIT:
+        return api_response({'error': f'At most {SYNC_BATCH_LIMIT} entries per request.'}, status=400)
+
+    results = sync_entries(request.user, entries)
+    return api_response({
+        'results': results,
+        'created': sum(result['status'] == 'created' for result in results),
+    })
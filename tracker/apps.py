@@ -5,3 +5,5 @@ class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
 
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,58 @@
+"""
+Third-party front-end assets (Bootstrap, Bootstrap Icons, Chart.js).
+
+Pinned releases are vendored into ``static/vendor/<package>/`` with
+``manage.py vendor_assets`` and then served like any other static file:
+fingerprinted, compressed and cached forever by WhiteNoise in production,
+and available to the service worker offline. A file that has not been
+vendored yet falls back to the same pinned release on jsDelivr.
+
+The releases' ``.map`` files are not vendored, so their trailing
+``sourceMappingURL`` comments are stripped on download: the manifest
+storage fails collectstatic on any reference it cannot resolve.
+"""
+import re
+from functools import lru_cache
+
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+CDN_URL = 'https://cdn.jsdelivr.net/npm/'
+
+# name: (package@version, path inside the package)
+VENDOR = {
+    'bootstrap.css': ('bootstrap@5.3.2', 'dist/css/bootstrap.min.css'),
+    'bootstrap.js': ('bootstrap@5.3.2', 'dist/js/bootstrap.bundle.min.js'),
+    'bootstrap-icons.css': ('bootstrap-icons@1.11.3', 'font/bootstrap-icons.min.css'),
+    # Referenced by bootstrap-icons.css as ./fonts/...
+    'bootstrap-icons.woff2': ('bootstrap-icons@1.11.3', 'font/fonts/bootstrap-icons.woff2'),
+    'bootstrap-icons.woff': ('bootstrap-icons@1.11.3', 'font/fonts/bootstrap-icons.woff'),
+    'chart.js': ('chart.js@4.4.1', 'dist/chart.umd.js'),
+}
+
+SOURCE_MAP_COMMENT = re.compile(rb'\s*(/\*# sourceMappingURL=[^*]*\*/|//# sourceMappingURL=\S*)\s*$')
+
+
+def static_path(name):
+    """Where ``name`` lives under the static root, e.g. ``vendor/bootstrap/dist/css/bootstrap.min.css``."""
+    package, path = VENDOR[name]
+    return f"vendor/{package.rpartition('@')[0]}/{path}"
+
+
+def cdn_url(name):
+    package, path = VENDOR[name]
+    return f'{CDN_URL}{package}/{path}'
+
+
+def strip_source_map(content):
+    """Drop a trailing ``sourceMappingURL`` comment from CSS or JavaScript bytes."""
+    return SOURCE_MAP_COMMENT.sub(b'\n', content, count=1)
+
+
+@lru_cache(maxsize=None)
+def is_vendored(name):
+    return finders.find(static_path(name)) is not None
+
+
+def asset_url(name):
+    return static(static_path(name)) if is_vendored(name) else cdn_url(name)
@@ -0,0 +1,101 @@
+"""
+Async versions of the read-heavy pages and the feed API.
+
+They mirror the views in views.py and api.py but use the async ORM and
+cache APIs, awaiting independent lookups (stats, rank, entries) together
+with ``asyncio.gather``. urls.py routes to them when ``TRACKER_ASYNC_VIEWS``
+is on, which only pays off under an ASGI server (see gunicorn.conf.py);
+under WSGI every async view costs an extra event loop hop.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.http import Http404
+from django.shortcuts import render
+from django.utils import timezone
+
+from . import cache
+from .api import api_response, versioned
+from .feed import COLUMNS, feed_row, recent_query
+from .models import PushupEntry
+from .pagination import decode_feed_cursor, encode_feed_cursor
+from .services import DashboardSnapshot, alist
+from .timezones import alocal_today
+from .views import leaderboard_context, leaderboard_month, profile_context, profile_users
+
+
+async def _resolve_user(request):
+    # Resolve the user once so request.user (used by context processors and
+    # templates) never triggers a synchronous query inside the event loop
+    request.user = await request.auser()
+    return request.user
+
+
+async def _render(request, template_name, context):
+    # Templates (and the session-backed messages framework) are sync
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@login_required
+async def dashboard(request):
+    """User dashboard with personal stats."""
+    user = await _resolve_user(request)
+    snapshot = await DashboardSnapshot.aload(user)
+
+    return await _render(request, 'tracker/dashboard.html', snapshot.context())
+
+
+@login_required
+async def leaderboard(request):
+    """Leaderboard view showing all users' rankings for a month (``?year=&month=``)."""
+    await _resolve_user(request)
+    now = timezone.localtime()
+    year, month = leaderboard_month(request, now)
+
+    board = await cache.aget_leaderboard(year, month)
+
+    context = leaderboard_context(request, board, year, month, now)
+    return await _render(request, 'tracker/leaderboard.html', context)
+
+
+@login_required
+async def profile(request, username=None):
+    """View a user's profile and stats."""
+    user = await _resolve_user(request)
+    if username:
+        try:
+            profile_user = await User.objects.aget(username=username)
+        except User.DoesNotExist:
+            raise Http404('No such user.')
+    else:
+        profile_user = user
+
+    now = timezone.localtime()
+    today = await alocal_today(profile_user)
+    comparison, rank, recent_entries, trends = await asyncio.gather(
+        cache.aget_comparison(profile_users(request, profile_user), now.year, now.month),
+        cache.aget_user_rank(profile_user, now.year, now.month),
+        alist(PushupEntry.objects.filter(user=profile_user)[:10]),
+        cache.aget_user_trends(profile_user, today),
+    )
+
+    context = profile_context(request, profile_user, comparison, rank, recent_entries, trends, now)
+    return await _render(request, 'tracker/profile.html', context)
+
+
+@versioned(lambda request: [cache.FEED_SCOPE])
+async def feed(request):
+    """Async ``api.feed``: the latest feed items, or those after ``?after=``."""
+    after = request.GET.get('after')
+    if after and decode_feed_cursor(after) is None:
+        return api_response({'error': 'Invalid cursor.'}, status=400)
+
+    entries = await alist(recent_query(after))
+    return api_response({
+        'columns': COLUMNS,
+        'rows': [feed_row(entry) for entry in entries],
+        'cursor': encode_feed_cursor(entries[0]) if entries else after,
+        'server_time': timezone.now(),
+    })
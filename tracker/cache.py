@@ -0,0 +1,289 @@
+"""
+Versioned caching for leaderboards and user stats.
+
+Every cached value is keyed by a per-month version number. Writes to
+PushupEntry bump the version of the month they touch (see signals.py), so
+reads keep hitting the cache until something in that month changes; stale
+keys simply expire. The same versions (plus per-user and feed ones) back
+the API's ETag/Last-Modified headers.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import DailyTotal, PushupEntry, LeaderboardSnapshot
+
+VERSION_KEY = 'tracker:version:{scope}'
+MODIFIED_KEY = 'tracker:modified:{scope}'
+STATS_KEY = 'tracker:cache-stats:{outcome}'
+
+# Everything that can change when an entry is written: its month, its
+# user's history, and the global activity feed.
+FEED_SCOPE = 'feed'
+
+
+def month_scope(year, month):
+    return f'month:{year}-{month}'
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def day_scope(day):
+    # Never bumped: each new day is a new scope, so responses that change
+    # with the date alone (streaks) revalidate once a day
+    return f'day:{day.isoformat()}'
+
+
+def _timeout():
+    return getattr(settings, 'TRACKER_CACHE_TIMEOUT', 60 * 60)
+
+
+def scope_version(scope):
+    """Return the current version number for a scope."""
+    key = VERSION_KEY.format(scope=scope)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses old keys
+        cache.add(key, time.time_ns(), timeout=None)
+        cache.add(MODIFIED_KEY.format(scope=scope), timezone.now(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def ascope_version(scope):
+    key = VERSION_KEY.format(scope=scope)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        await cache.aadd(MODIFIED_KEY.format(scope=scope), timezone.now(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def scope_modified(scope):
+    """When the scope last changed (or was first seen by this cache)."""
+    modified = cache.get(MODIFIED_KEY.format(scope=scope))
+    if modified is None:
+        modified = timezone.now()
+        cache.add(MODIFIED_KEY.format(scope=scope), modified, timeout=None)
+    return modified
+
+
+def bump_scope(scope):
+    """Invalidate everything cached under a scope."""
+    key = VERSION_KEY.format(scope=scope)
+    # A plain set, not incr(): FileBasedCache's incr() is an unlocked read and
+    # write, so two bumps could both store the same number. Any value the scope
+    # has not had before retires its old keys; max() guards against coarse clocks.
+    cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), timeout=None)
+    cache.set(MODIFIED_KEY.format(scope=scope), timezone.now(), timeout=None)
+
+
+def month_version(year, month):
+    return scope_version(month_scope(year, month))
+
+
+def bump_month_version(year, month):
+    bump_scope(month_scope(year, month))
+
+
+def record_write(user_ids, months):
+    """Bump every scope touched by entry writes for these users and months."""
+    for year, month in set(months):
+        bump_month_version(year, month)
+    for user_id in set(user_ids):
+        bump_scope(user_scope(user_id))
+    bump_scope(FEED_SCOPE)
+
+
+def _count(outcome):
+    key = STATS_KEY.format(outcome=outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing counter; if another process created it meanwhile, count again
+        if not cache.add(key, 1, timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                pass
+
+
+async def _acount(outcome):
+    key = STATS_KEY.format(outcome=outcome)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, timeout=None):
+            try:
+                await cache.aincr(key)
+            except ValueError:
+                pass
+
+
+def cache_stats():
+    """Return the hit/miss counters recorded in the cache backend."""
+    hits = cache.get(STATS_KEY.format(outcome='hits'), 0)
+    misses = cache.get(STATS_KEY.format(outcome='misses'), 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / lookups, 3) if lookups else 0,
+    }
+
+
+def reset_cache_stats():
+    cache.delete_many([STATS_KEY.format(outcome='hits'), STATS_KEY.format(outcome='misses')])
+
+
+def _month_key(name, year, month, version, parts):
+    suffix = ''.join(f':{part}' for part in parts)
+    return f'tracker:{name}:{year}-{month}:{version}{suffix}'
+
+
+def cached_month_value(name, year, month, compute, *parts):
+    """
+    Return ``compute()`` cached under ``name`` for a month.
+
+    Extra ``parts`` (a user id, flags) are appended to the key.
+    """
+    key = _month_key(name, year, month, month_version(year, month), parts)
+
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value
+
+    _count('misses')
+    value = compute()
+    cache.set(key, value, _timeout())
+    return value
+
+
+async def acached_month_value(name, year, month, compute, *parts):
+    """Async ``cached_month_value``; ``compute`` is a coroutine function."""
+    key = _month_key(name, year, month, await ascope_version(month_scope(year, month)), parts)
+
+    value = await cache.aget(key)
+    if value is not None:
+        await _acount('hits')
+        return value
+
+    await _acount('misses')
+    value = await compute()
+    await cache.aset(key, value, _timeout())
+    return value
+
+
+def _user_key(name, user_id, version, parts):
+    suffix = ''.join(f':{part}' for part in parts)
+    return f'tracker:{name}:user-{user_id}:{version}{suffix}'
+
+
+def cached_user_value(name, user_id, compute, *parts):
+    """Return ``compute()`` cached until the user's entries change."""
+    key = _user_key(name, user_id, scope_version(user_scope(user_id)), parts)
+
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value
+
+    _count('misses')
+    value = compute()
+    cache.set(key, value, _timeout())
+    return value
+
+
+async def acached_user_value(name, user_id, compute, *parts):
+    key = _user_key(name, user_id, await ascope_version(user_scope(user_id)), parts)
+
+    value = await cache.aget(key)
+    if value is not None:
+        await _acount('hits')
+        return value
+
+    await _acount('misses')
+    value = await compute()
+    await cache.aset(key, value, _timeout())
+    return value
+
+
+def get_leaderboard(year, month):
+    """Cached ``LeaderboardSnapshot.get_leaderboard`` (live or frozen)."""
+    return cached_month_value(
+        'leaderboard', year, month,
+        lambda: LeaderboardSnapshot.get_leaderboard(year, month),
+    )
+
+
+def get_user_stats(user, year, month, with_series=False):
+    """Cached ``PushupEntry.get_user_stats``."""
+    return cached_month_value(
+        'stats', year, month,
+        lambda: PushupEntry.get_user_stats(user, year, month, with_series=with_series),
+        user.pk, 'series' if with_series else 'totals',
+    )
+
+
+def get_user_rank(user, year, month):
+    """Cached ``PushupEntry.get_user_rank``."""
+    return cached_month_value(
+        'rank', year, month,
+        lambda: PushupEntry.get_user_rank(user, year, month),
+        user.pk,
+    )
+
+
+def get_comparison(users, year, month):
+    """Cached ``PushupEntry.compare_users``."""
+    return cached_month_value(
+        'compare', year, month,
+        lambda: PushupEntry.compare_users(users, year, month),
+        *[user.pk for user in users],
+    )
+
+
+def get_user_trends(user, today):
+    """Cached ``DailyTotal.trends``."""
+    return cached_user_value('trends', user.pk, lambda: DailyTotal.trends(user, today), today.isoformat())
+
+
+async def aget_leaderboard(year, month):
+    return await acached_month_value(
+        'leaderboard', year, month,
+        lambda: LeaderboardSnapshot.aget_leaderboard(year, month),
+    )
+
+
+async def aget_user_stats(user, year, month, with_series=False):
+    return await acached_month_value(
+        'stats', year, month,
+        lambda: PushupEntry.aget_user_stats(user, year, month, with_series=with_series),
+        user.pk, 'series' if with_series else 'totals',
+    )
+
+
+async def aget_user_rank(user, year, month):
+    return await acached_month_value(
+        'rank', year, month,
+        lambda: PushupEntry.aget_user_rank(user, year, month),
+        user.pk,
+    )
+
+
+async def aget_comparison(users, year, month):
+    return await acached_month_value(
+        'compare', year, month,
+        lambda: PushupEntry.acompare_users(users, year, month),
+        *[user.pk for user in users],
+    )
+
+
+async def aget_user_trends(user, today):
+    return await acached_user_value('trends', user.pk, lambda: DailyTotal.atrends(user, today), today.isoformat())
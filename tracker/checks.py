@@ -0,0 +1,16 @@
+from django.core.checks import Tags, Warning, register
+
+from .assets import VENDOR, is_vendored, static_path
+
+
+@register(Tags.staticfiles, deploy=True)
+def check_vendored_assets(app_configs, **kwargs):
+    """Pages fall back to the CDN (and cannot paint offline) until the assets are vendored."""
+    missing = [static_path(name) for name in VENDOR if not is_vendored(name)]
+    if not missing:
+        return []
+    return [Warning(
+        f'{len(missing)} third-party assets are not vendored: {", ".join(missing)}.',
+        hint='Run "python manage.py vendor_assets" and commit static/vendor/.',
+        id='tracker.W001',
+    )]
@@ -0,0 +1,93 @@
+"""
+Immutable head-to-head comparisons.
+
+A Comparison holds a month of per-day totals for several users, all read
+in one query of the DailyTotal rollup (``PushupEntry.compare_users``). It
+has each user's stats, the day-by-day and running series for overlaid
+charts, and the running gap to the first user.
+"""
+from calendar import monthrange
+from dataclasses import dataclass
+from itertools import accumulate
+
+
+@dataclass(frozen=True)
+class ComparisonSeries:
+    user_id: int
+    username: str
+    display_name: str
+    daily: tuple
+    cumulative: tuple
+    # Running total minus the first user's, day by day
+    gap: tuple
+
+    @property
+    def total(self):
+        return self.cumulative[-1]
+
+    @property
+    def days_active(self):
+        return sum(1 for total in self.daily if total)
+
+    @property
+    def best_day(self):
+        return max(self.daily)
+
+    @property
+    def average(self):
+        return round(self.total / self.days_active, 1) if self.days_active else 0
+
+    def stats(self):
+        """The ``PushupEntry.get_user_stats`` dict (without the series)."""
+        return {
+            'total': self.total,
+            'average': self.average,
+            'best_day': self.best_day,
+            'days_active': self.days_active,
+        }
+
+
+@dataclass(frozen=True)
+class Comparison:
+    year: int
+    month: int
+    labels: tuple
+    series: tuple
+
+    @classmethod
+    def build(cls, year, month, users, rows):
+        """
+        Build from ``users`` (the User objects, in display order) and
+        ``(user_id, date, day_total)`` rows for that month.
+        """
+        labels = tuple(range(1, monthrange(year, month)[1] + 1))
+        daily = {user.pk: [0] * len(labels) for user in users}
+        for user_id, day, total in rows:
+            daily[user_id][day.day - 1] += total
+
+        cumulative = {user_id: tuple(accumulate(days)) for user_id, days in daily.items()}
+        reference = cumulative[users[0].pk] if users else ()
+        series = tuple(
+            ComparisonSeries(
+                user_id=user.pk,
+                username=user.username,
+                display_name=user.get_full_name() or user.username,
+                daily=tuple(daily[user.pk]),
+                cumulative=cumulative[user.pk],
+                gap=tuple(mine - theirs for mine, theirs in zip(cumulative[user.pk], reference)),
+            )
+            for user in users
+        )
+        return cls(year=year, month=month, labels=labels, series=series)
+
+    def for_user(self, user_id):
+        for series in self.series:
+            if series.user_id == user_id:
+                return series
+        return None
+
+    def __iter__(self):
+        return iter(self.series)
+
+    def __len__(self):
+        return len(self.series)
@@ -0,0 +1,146 @@
+"""
+Live activity feed.
+
+``recent_entries`` is the one query behind both the polling endpoint
+(``/api/feed/?after=<cursor>``) and the server-sent event stream. For the
+stream, a per-process ``FeedBroadcaster`` keeps a bounded buffer of the
+newest items and refreshes it at most once per poll interval, however many
+listeners are connected, so a thousand open dashboards cost one indexed
+query per interval rather than one each.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import PushupEntry
+from .pagination import encode_feed_cursor, decode_feed_cursor, newer_than
+
+COLUMNS = ['id', 'username', 'count', 'date', 'created_at']
+FEED_SIZE = 15
+
+
+def recent_query(after=None, limit=FEED_SIZE):
+    """Up to ``limit`` entries newer than the ``after`` cursor, newest first."""
+    return newer_than(PushupEntry.objects.select_related('user'), after)[:limit]
+
+
+def recent_entries(after=None, limit=FEED_SIZE):
+    return list(recent_query(after, limit))
+
+
+def feed_row(entry):
+    return [entry.pk, entry.user.username, entry.count, entry.date, entry.created_at]
+
+
+class FeedBroadcaster:
+    """
+    Fan out feed items to every stream in this process from one DB read.
+
+    The buffer holds the newest ``buffer_size`` items, oldest first, as
+    ``((created_at, id), cursor, row)``. A listener whose cursor has fallen
+    off the end of a full buffer is told to reload instead of being sent a
+    partial history.
+    """
+
+    def __init__(self, buffer_size=100, interval=5.0):
+        self.buffer_size = buffer_size
+        self.interval = interval
+        self.items = deque(maxlen=buffer_size)
+        self.cursor = None
+        self.fetched_at = None
+        self._lock = None
+        self._loop = None
+
+    def lock(self):
+        # asyncio primitives belong to one event loop; recreate the lock if
+        # the server (or a test) runs us in a new one
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._lock = loop, asyncio.Lock()
+        return self._lock
+
+    def extend(self, entries):
+        """Add entries (newest first, as ``recent_entries`` returns them)."""
+        if self.cursor is not None and len(entries) == self.buffer_size:
+            # More arrived than we can hold; the gap is unrecoverable anyway
+            self.items.clear()
+        for entry in reversed(entries):
+            self.items.append(((entry.created_at, entry.pk), encode_feed_cursor(entry), feed_row(entry)))
+        if entries:
+            self.cursor = encode_feed_cursor(entries[0])
+
+    async def refresh(self):
+        async with self.lock():
+            if self.fetched_at is None or time.monotonic() - self.fetched_at >= self.interval:
+                entries = await sync_to_async(recent_entries)(self.cursor, self.buffer_size)
+                # Mutate the buffer back on the event loop, never in the DB thread
+                self.extend(entries)
+                self.fetched_at = time.monotonic()
+
+    async def since(self, cursor):
+        """
+        Return ``(items, cursor, complete)`` for a listener at ``cursor``.
+
+        ``items`` are ``(cursor, row)`` pairs oldest first; ``complete`` is
+        False when items between the listener's cursor and the buffer may
+        have been dropped, so the client should reload the feed.
+        """
+        await self.refresh()
+        if cursor is None:
+            return [], self.cursor, True
+
+        position = decode_feed_cursor(cursor)
+        if position is None:
+            return [], self.cursor, False
+        if len(self.items) == self.buffer_size and position < self.items[0][0]:
+            return [], self.cursor, False
+
+        newer = [(item_cursor, row) for item_position, item_cursor, row in self.items if item_position > position]
+        return newer, newer[-1][0] if newer else cursor, True
+
+
+broadcaster = FeedBroadcaster(
+    buffer_size=getattr(settings, 'TRACKER_FEED_BUFFER', 100),
+    interval=getattr(settings, 'TRACKER_FEED_POLL_INTERVAL', 5.0),
+)
+
+
+def sse_event(data, event=None, event_id=None):
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append('data: ' + json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')))
+    return '\n'.join(lines) + '\n\n'
+
+
+async def event_stream(cursor, lifetime=300, keepalive=15):
+    """
+    Yield SSE messages for new feed items after ``cursor``.
+
+    The stream closes after ``lifetime`` seconds; EventSource reconnects on
+    its own and resumes from the ``Last-Event-ID`` it was last sent.
+    """
+    started = last_sent = time.monotonic()
+    yield 'retry: 3000\n\n'
+
+    while time.monotonic() - started < lifetime:
+        items, new_cursor, complete = await broadcaster.since(cursor)
+        if not complete:
+            yield sse_event({'cursor': new_cursor}, event='reload', event_id=new_cursor)
+            last_sent = time.monotonic()
+        elif items:
+            for item_cursor, row in items:
+                yield sse_event(dict(zip(COLUMNS, row)), event='entry', event_id=item_cursor)
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= keepalive:
+            yield ': keepalive\n\n'
+            last_sent = time.monotonic()
+        cursor = new_cursor
+        await asyncio.sleep(broadcaster.interval)
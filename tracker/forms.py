@@ -1,8 +1,14 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from django.utils import timezone
-from .models import PushupEntry
+from .models import PushupEntry, Profile, timezone_names
+from .timezones import local_today
+
+
+def validate_pushup_count(count):
+    """Count rule shared by PushupEntryForm and the import/sync paths."""
+    if count < 1:
+        raise forms.ValidationError("Count must be at least 1.")
 
 
 class SignUpForm(UserCreationForm):
@@ -10,11 +16,42 @@ class SignUpForm(UserCreationForm):
     email = forms.EmailField(max_length=254, required=True, help_text='Required. Enter a valid email address.')
     first_name = forms.CharField(max_length=30, required=False, help_text='Optional.')
     last_name = forms.CharField(max_length=30, required=False, help_text='Optional.')
+    # Filled in from the browser by js/timezone.js; blank keeps the server default
+    timezone = forms.CharField(required=False, widget=forms.HiddenInput(attrs={'data-browser-timezone': ''}))
 
     class Meta:
         model = User
         fields = ('username', 'first_name', 'last_name', 'email', 'password1', 'password2')
 
+    def clean_timezone(self):
+        # An unknown browser zone is not worth rejecting the signup over
+        name = self.cleaned_data.get('timezone')
+        return name if name in timezone_names() else ''
+
+    def save(self, commit=True):
+        user = super().save(commit)
+        if commit and self.cleaned_data.get('timezone'):
+            Profile.objects.create(user=user, timezone=self.cleaned_data['timezone'])
+        return user
+
+
+class ProfileForm(forms.ModelForm):
+    """Form for a user's settings (currently just their timezone)."""
+
+    class Meta:
+        model = Profile
+        fields = ['timezone']
+        widgets = {
+            'timezone': forms.Select(attrs={'class': 'form-select'}),
+        }
+        help_texts = {
+            'timezone': 'Your days (and the "today only" rule for new entries) start at midnight here.',
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['timezone'].widget.choices = [(name, name) for name in timezone_names()]
+
 
 class PushupEntryForm(forms.ModelForm):
     """Form for adding/editing pushup entries."""
@@ -32,14 +69,14 @@ class PushupEntryForm(forms.ModelForm):
         self.user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         
-        # Set default date to today
+        # Set default date to today (on the user's calendar)
         if not self.instance.pk:
-            self.fields['date'].initial = timezone.now().date()
+            self.fields['date'].initial = local_today(self.user)
 
     def clean_date(self):
         """Validate that regular users can only enter today's date."""
         date = self.cleaned_data.get('date')
-        today = timezone.now().date()
+        today = local_today(self.user)
         
         # Allow admins and staff to enter any date
         if self.user and (self.user.is_staff or self.user.is_superuser):
@@ -57,7 +94,7 @@ class PushupEntryForm(forms.ModelForm):
     def clean_count(self):
         """Validate that count is positive."""
         count = self.cleaned_data.get('count')
-        if count and count < 1:
-            raise forms.ValidationError("Count must be at least 1.")
+        if count is not None:
+            validate_pushup_count(count)
         return count
 
@@ -0,0 +1,163 @@
+"""
+PWA icon build (``manage.py build_icons``, or ``python generate_icons.py``).
+
+One high-resolution master is rendered (or loaded from ``source``) per
+purpose: ``any`` fills the square, ``maskable`` keeps the artwork inside the
+centre 80% that launchers never crop. Every size is downsampled from its
+master in a process pool, and a file is only rewritten when its bytes
+change, so an unchanged build touches nothing (and leaves the service
+worker's static version alone). The ``icons`` array of manifest.json is
+regenerated from the same list.
+
+Needs Pillow only, not Django.
+"""
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+MASTER_SIZE = 1024
+# Manifest icon sizes
+SIZES = [72, 96, 128, 144, 152, 192, 384, 512]
+MASKABLE_SIZES = [192, 512]
+# Launchers may crop maskable icons to a circle of this share of the width
+MASKABLE_SAFE_ZONE = 0.8
+
+BG_COLOR = (102, 126, 234)  # #667eea purple
+TEXT_COLOR = (255, 255, 255)  # white
+TEXT = '💪'
+
+# Tried in order; Pillow's built-in font is the last resort
+FONT_CANDIDATES = [
+    '/System/Library/Fonts/Apple Color Emoji.ttc',
+    '/System/Library/Fonts/Supplemental/Arial.ttf',
+    '/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+    'seguiemj.ttf',
+    'arial.ttf',
+]
+
+
+def load_font(size):
+    """The first usable font from FONT_CANDIDATES, probed once per master."""
+    for candidate in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def render_master(text=TEXT, purpose='any', source=None):
+    """A MASTER_SIZE square RGB image for ``purpose`` (``any`` or ``maskable``)."""
+    scale = MASKABLE_SAFE_ZONE if purpose == 'maskable' else 1.0
+    master = Image.new('RGB', (MASTER_SIZE, MASTER_SIZE), BG_COLOR)
+
+    if source:
+        artwork = Image.open(source).convert('RGBA')
+        side = round(MASTER_SIZE * scale)
+        artwork = artwork.resize((side, side), Image.Resampling.LANCZOS)
+        offset = (MASTER_SIZE - side) // 2
+        master.paste(artwork, (offset, offset), artwork)
+        return master
+
+    draw = ImageDraw.Draw(master)
+    font = load_font(round(MASTER_SIZE * 0.6 * scale))
+    draw.text(
+        (MASTER_SIZE / 2, MASTER_SIZE / 2), text, font=font, fill=TEXT_COLOR,
+        anchor='mm', embedded_color=True,
+    )
+    return master
+
+
+def encode_png(image, lossless=False):
+    if not lossless:
+        # Flat artwork survives a 256-colour palette and shrinks several-fold
+        image = image.quantize(colors=256, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def _downsample(job):
+    """Process-pool worker: ``(name, size, format, master bytes, lossless)`` -> (name, file bytes)."""
+    name, size, fmt, master_bytes, lossless = job
+    master = Image.frombytes('RGB', (MASTER_SIZE, MASTER_SIZE), master_bytes)
+    if fmt == 'ico':
+        buffer = io.BytesIO()
+        master.save(buffer, 'ICO', sizes=[(16, 16), (32, 32), (48, 48)])
+        return name, buffer.getvalue()
+    return name, encode_png(master.resize((size, size), Image.Resampling.LANCZOS), lossless)
+
+
+def outputs():
+    """Every file the build writes, as ``(name, size, purpose, format)``."""
+    files = [(f'icon-{size}x{size}.png', size, 'any', 'png') for size in SIZES]
+    files += [(f'icon-maskable-{size}x{size}.png', size, 'maskable', 'png') for size in MASKABLE_SIZES]
+    files += [
+        # iOS adds its own rounded corners and needs an opaque square
+        ('apple-touch-icon.png', 180, 'any', 'png'),
+        ('favicon.png', 32, 'any', 'png'),
+        ('favicon.ico', 48, 'any', 'ico'),
+    ]
+    return files
+
+
+def manifest_icons(url_prefix):
+    icons = [
+        {'src': f'{url_prefix}icon-{size}x{size}.png', 'sizes': f'{size}x{size}', 'type': 'image/png', 'purpose': 'any'}
+        for size in SIZES
+    ]
+    icons += [
+        {'src': f'{url_prefix}icon-maskable-{size}x{size}.png', 'sizes': f'{size}x{size}', 'type': 'image/png',
+         'purpose': 'maskable'}
+        for size in MASKABLE_SIZES
+    ]
+    return icons
+
+
+def _unchanged(path, content):
+    """True if ``path`` already holds ``content`` (compared by hash)."""
+    return path.exists() and hashlib.sha256(path.read_bytes()).digest() == hashlib.sha256(content).digest()
+
+
+def build(output_dir, manifest_path=None, url_prefix='/static/icons/', text=TEXT, source=None,
+          workers=None, lossless=False, dry_run=False):
+    """
+    Build every icon into ``output_dir`` and refresh the manifest's icons.
+
+    Returns ``{file name: 'written' | 'unchanged'}`` (``'stale'`` instead of
+    ``'written'`` with ``dry_run``), the manifest under its file name.
+    """
+    masters = {
+        purpose: render_master(text, purpose, source).tobytes()
+        for purpose in {purpose for _, _, purpose, _ in outputs()}
+    }
+    jobs = [(name, size, fmt, masters[purpose], lossless) for name, size, purpose, fmt in outputs()]
+
+    with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+        rendered = dict(pool.map(_downsample, jobs))
+
+    results = {name: _store(Path(output_dir) / name, content, dry_run) for name, content in rendered.items()}
+
+    if manifest_path:
+        manifest = json.loads(Path(manifest_path).read_text())
+        manifest['icons'] = manifest_icons(url_prefix)
+        content = (json.dumps(manifest, indent=2, ensure_ascii=False) + '\n').encode()
+        results[Path(manifest_path).name] = _store(manifest_path, content, dry_run)
+    return results
+
+
+def _store(path, content, dry_run):
+    path = Path(path)
+    if _unchanged(path, content):
+        return 'unchanged'
+    if dry_run:
+        return 'stale'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return 'written'
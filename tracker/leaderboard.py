@@ -0,0 +1,78 @@
+"""
+Immutable leaderboard results.
+
+A Leaderboard is built from one query and carries everything templates and
+the API need (ranks, competitor count, leader total), so nothing downstream
+has to go back to the database.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class LeaderboardRow:
+    rank: int
+    user_id: int
+    username: str
+    first_name: str
+    last_name: str
+    total: int
+
+    @property
+    def display_name(self):
+        full_name = f'{self.first_name} {self.last_name}'.strip()
+        return full_name or self.username
+
+
+@dataclass(frozen=True)
+class Leaderboard:
+    year: int
+    month: int
+    rows: tuple
+    competitor_count: int
+    leader_total: int
+
+    @classmethod
+    def build(cls, year, month, values):
+        """
+        Build from ``(user_id, username, first_name, last_name, total)``
+        tuples already sorted by total, highest first.
+
+        Users on the same total share a rank ("1, 2, 2, 4").
+        """
+        rows = []
+        previous_total = None
+        rank = 0
+        for position, (user_id, username, first_name, last_name, total) in enumerate(values, 1):
+            if total != previous_total:
+                rank = position
+                previous_total = total
+            rows.append(LeaderboardRow(rank, user_id, username, first_name, last_name, total))
+
+        return cls(
+            year=year,
+            month=month,
+            rows=tuple(rows),
+            competitor_count=len(rows),
+            leader_total=rows[0].total if rows else 0,
+        )
+
+    @property
+    def active_users(self):
+        # Only users who logged pushups this month make it onto the board
+        return self.competitor_count
+
+    def rank_of(self, user_id):
+        """Return the user's rank, or None if they are not on the board."""
+        for row in self.rows:
+            if row.user_id == user_id:
+                return row.rank
+        return None
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows)
@@ -0,0 +1,145 @@
+import json
+import statistics
+import time
+import tracemalloc
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tracker.models import PushupEntry
+
+from .benchmark_views import NO_CACHE
+
+# name: (method, URL name)
+PAGES = {
+    'dashboard': ('get', 'dashboard'),
+    'leaderboard': ('get', 'leaderboard'),
+    'profile': ('get', 'profile'),
+    'history': ('get', 'history'),
+    'add_entry': ('post', 'add_entry'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure query count, p50/p95 latency and peak memory of the main pages '
+        'through the test client, as JSON. Seed a database first (seed_pushups); '
+        'pass --baseline to fail when a page got slower or needs more queries.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to view the pages as (default: the first user with entries).')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per page (default: 50).')
+        parser.add_argument('--pages', nargs='+', choices=list(PAGES), default=list(PAGES))
+        parser.add_argument('--cold', action='store_true', help='Bypass the cache, so every request hits the database.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument('--baseline', help='Earlier JSON report to compare against.')
+        parser.add_argument(
+            '--tolerance', type=float, default=1.5,
+            help='Allowed p95 slowdown against the baseline, as a factor (default: 1.5).'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2:
+            raise CommandError('--requests must be at least 2.')
+
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            users = User.objects.order_by('pk')
+            user = users.filter(pushup_entries__isnull=False).first() or users.first()
+        if user is None:
+            raise CommandError('No such user; run seed_pushups first.')
+
+        client = Client()
+        client.force_login(user)
+
+        report = {
+            'database': {
+                'vendor': connection.vendor,
+                'users': User.objects.count(),
+                'entries': PushupEntry.objects.count(),
+            },
+            'user': user.username,
+            'cache': 'off' if options['cold'] else 'on',
+            'requests': options['requests'],
+            'pages': {},
+        }
+        with override_settings(ALLOWED_HOSTS=['*'], **({'CACHES': NO_CACHE} if options['cold'] else {})):
+            for name in options['pages']:
+                report['pages'][name] = self.measure(client, name, options['requests'])
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['baseline']:
+            self.compare(report, json.loads(Path(options['baseline']).read_text()), options['tolerance'])
+
+    def measure(self, client, name, requests):
+        method, url_name = PAGES[name]
+        url = reverse(url_name)
+        data = {'date': timezone.localdate().isoformat(), 'count': 10} if method == 'post' else None
+        expected = 302 if method == 'post' else 200
+
+        def one_request():
+            response = getattr(client, method)(url, data)
+            if response.status_code != expected:
+                raise CommandError(f'{url} returned {response.status_code}.')
+
+        # Writes are rolled back so repeated runs see the same data
+        with transaction.atomic() if method == 'post' else nullcontext():
+            # The first request fills the caches; it is not counted
+            one_request()
+
+            latencies = []
+            queries = 0
+            for _ in range(requests):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    one_request()
+                    latencies.append(time.perf_counter() - started)
+                queries = max(queries, len(captured))
+
+            # tracemalloc slows everything down, so memory gets its own request
+            tracemalloc.start()
+            try:
+                one_request()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+            if method == 'post':
+                transaction.set_rollback(True)
+
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        return {
+            'queries': queries,
+            'p50_ms': round(percentiles[49] * 1000, 2),
+            'p95_ms': round(percentiles[94] * 1000, 2),
+            'peak_kb': round(peak / 1024),
+        }
+
+    def compare(self, report, baseline, tolerance):
+        regressions = []
+        for name, current in report['pages'].items():
+            previous = baseline.get('pages', {}).get(name)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append(f"{name}: {previous['queries']} -> {current['queries']} queries")
+            if current['p95_ms'] > previous['p95_ms'] * tolerance:
+                regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+
+        if regressions:
+            raise CommandError('Regressions against the baseline:\n  ' + '\n  '.join(regressions))
+        self.stderr.write(self.style.SUCCESS('No regressions against the baseline.'))
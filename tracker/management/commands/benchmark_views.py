@@ -0,0 +1,102 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+
+from tracker import api, async_views, views
+
+# name: (path, sync view, async view)
+PAGES = {
+    'dashboard': ('/dashboard/', views.dashboard, async_views.dashboard),
+    'leaderboard': ('/leaderboard/', views.leaderboard, async_views.leaderboard),
+    'profile': ('/profile/', views.profile, async_views.profile),
+    'feed': ('/api/feed/', api.feed, async_views.feed),
+}
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def percentile(latencies, pct):
+    return statistics.quantiles(latencies, n=100, method='inclusive')[pct - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare p50/p99 latency of the sync and async views for the read-heavy '
+        'pages, calling the views in-process against the configured database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to view the pages as (default: the first user).')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per page and mode (default: 200).')
+        parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight at once (default: 10).')
+        parser.add_argument('--pages', nargs='+', choices=sorted(PAGES), default=sorted(PAGES))
+        parser.add_argument('--cold', action='store_true', help='Bypass the cache, so every request hits the database.')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2 or options['concurrency'] < 1:
+            raise CommandError('--requests must be at least 2 and --concurrency at least 1.')
+
+        users = User.objects.order_by('pk')
+        user = users.filter(username=options['user']).first() if options['user'] else users.first()
+        if user is None:
+            raise CommandError('No such user; create one (or seed some data) first.')
+
+        self.stdout.write(
+            f"{options['requests']} requests per run, {options['concurrency']} concurrent, "
+            f"as {user.username}, cache {'off' if options['cold'] else 'on'}"
+        )
+        self.stdout.write(f"{'page':<12} {'mode':<6} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+
+        with override_settings(CACHES=NO_CACHE) if options['cold'] else nullcontext():
+            for name in options['pages']:
+                path, sync_view, async_view = PAGES[name]
+                for mode, run in (('sync', self.run_sync), ('async', self.run_async)):
+                    started = time.perf_counter()
+                    latencies = run(sync_view if mode == 'sync' else async_view, path, user, options)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f'{name:<12} {mode:<6} {percentile(latencies, 50) * 1000:>8.1f} '
+                        f'{percentile(latencies, 99) * 1000:>8.1f} {len(latencies) / elapsed:>8.0f}'
+                    )
+
+    def run_sync(self, view, path, user, options):
+        """Each request on a worker thread, like a threaded WSGI server."""
+        factory = RequestFactory()
+
+        def one_request(_):
+            request = factory.get(path)
+            request.user = user
+            started = time.perf_counter()
+            view(request)
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            return list(pool.map(one_request, range(options['requests'])))
+
+    def run_async(self, view, path, user, options):
+        """All requests on one event loop, like an ASGI worker."""
+        factory = AsyncRequestFactory()
+
+        async def auser():
+            return user
+
+        async def main():
+            slots = asyncio.Semaphore(options['concurrency'])
+
+            async def one_request():
+                async with slots:
+                    request = factory.get(path)
+                    request.auser = auser
+                    started = time.perf_counter()
+                    await view(request)
+                    return time.perf_counter() - started
+
+            return await asyncio.gather(*(one_request() for _ in range(options['requests'])))
+
+        return asyncio.run(main())
@@ -0,0 +1,55 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import icons
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the PWA icons (all sizes, maskable variants, apple-touch-icon and '
+        'favicons) from one master image and regenerate the icons in manifest.json. '
+        'Files whose content would not change are left alone.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help='Square artwork to use instead of the text placeholder.')
+        parser.add_argument('--text', default=icons.TEXT, help='Placeholder text or emoji (default: %(default)s).')
+        parser.add_argument('--workers', type=int, help='Processes for downsampling (default: one per CPU).')
+        parser.add_argument('--lossless', action='store_true', help='Keep full colour instead of a 256-colour palette.')
+        parser.add_argument('--check', action='store_true', help='Write nothing; fail if any file is out of date.')
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        if options['source'] and not Path(options['source']).is_file():
+            raise CommandError(f"No such file: {options['source']}")
+
+        # The manifest is served as-is, so its URLs must be absolute
+        static_url = settings.STATIC_URL
+        if not static_url.startswith(('/', 'http')):
+            static_url = '/' + static_url
+
+        started = time.perf_counter()
+        results = icons.build(
+            static_dir / 'icons',
+            manifest_path=static_dir / 'manifest.json',
+            url_prefix=f'{static_url}icons/',
+            text=options['text'],
+            source=options['source'],
+            workers=options['workers'],
+            lossless=options['lossless'],
+            dry_run=options['check'],
+        )
+
+        for name, status in sorted(results.items()):
+            if status != 'unchanged' or options['verbosity'] > 1:
+                self.stdout.write(f'{status:<10} {name}')
+
+        changed = sum(status != 'unchanged' for status in results.values())
+        if options['check'] and changed:
+            raise CommandError(f'{changed} icon files are out of date; run build_icons.')
+        self.stdout.write(self.style.SUCCESS(
+            f'{changed} of {len(results)} files updated in {time.perf_counter() - started:.1f}s.'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from tracker.cache import cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters for the leaderboard and stats cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them.')
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        self.stdout.write(
+            f"hits: {stats['hits']}  misses: {stats['misses']}  hit ratio: {stats['hit_ratio']:.1%}"
+        )
+
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.models import MonthlyTotal, LeaderboardSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Freeze the standings of completed months into leaderboard snapshots. '
+        'Run it after each month rollover; months left unfrozen are frozen on first read.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help='Only freeze this year.')
+        parser.add_argument('--month', type=int, help='Only freeze this month (requires --year).')
+        parser.add_argument('--refresh', action='store_true', help='Re-freeze months that already have a snapshot.')
+
+    def handle(self, *args, **options):
+        year = options['year']
+        month = options['month']
+
+        if month and not year:
+            raise CommandError('--month requires --year.')
+        if month and not 1 <= month <= 12:
+            raise CommandError('--month must be between 1 and 12.')
+
+        months = MonthlyTotal.objects.order_by().values_list('year', 'month').distinct()
+        if year:
+            months = months.filter(year=year)
+        if month:
+            months = months.filter(month=month)
+
+        frozen = set(LeaderboardSnapshot.objects.values_list('year', 'month'))
+        count = 0
+        for snapshot_year, snapshot_month in sorted(months):
+            if not LeaderboardSnapshot.is_closed(snapshot_year, snapshot_month):
+                continue
+            if (snapshot_year, snapshot_month) in frozen and not options['refresh']:
+                continue
+            LeaderboardSnapshot.freeze(snapshot_year, snapshot_month)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Froze {count} monthly leaderboards.'))
@@ -0,0 +1,140 @@
+import csv
+import json
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tracker.forms import validate_pushup_count
+from tracker.models import PushupEntry
+from tracker.services import refresh_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        'Import historical pushup entries from CSV, NDJSON or JSON. '
+        'Rows need username, date (YYYY-MM-DD) and count; notes is optional. '
+        'CSV and NDJSON are streamed; a JSON array is read into memory first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import.')
+        parser.add_argument(
+            '--format', choices=['csv', 'ndjson', 'json'],
+            help='Input format (default: from the file extension).'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert (default: 5000).')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing.')
+        parser.add_argument('--max-errors', type=int, default=20, help='Invalid rows to print (default: 20).')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or self.guess_format(path)
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        user_ids = dict(User.objects.values_list('username', 'id'))
+        affected = set()
+        batch = []
+        imported = invalid = 0
+        started = time.monotonic()
+        months = 0
+
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as handle:
+                for line_number, row in self.read_rows(handle, fmt):
+                    try:
+                        entry = self.build_entry(row, user_ids)
+                    except ValidationError as error:
+                        invalid += 1
+                        if invalid <= options['max_errors']:
+                            self.stderr.write(f'Row {line_number}: {"; ".join(error.messages)}')
+                        continue
+
+                    batch.append(entry)
+                    if len(batch) >= batch_size:
+                        imported += self.write_batch(batch, affected, options['dry_run'])
+                        batch = []
+                        self.report_progress(imported, started)
+
+                imported += self.write_batch(batch, affected, options['dry_run'])
+        except OSError as error:
+            raise CommandError(f'Could not read {path}: {error}')
+        except (csv.Error, json.JSONDecodeError) as error:
+            raise CommandError(f'Could not parse {path}: {error}')
+        finally:
+            # Batches committed before a failure still need their rollups and caches
+            if affected:
+                self.stdout.write('Refreshing monthly totals and caches...')
+                months = refresh_summaries(affected)
+
+        elapsed = time.monotonic() - started
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {imported} entries in {elapsed:.1f}s '
+            f'({imported / elapsed if elapsed else 0:,.0f} rows/s), '
+            f'{invalid} invalid rows skipped, {months} months refreshed.'
+        ))
+
+    def guess_format(self, path):
+        for suffix, fmt in (('.csv', 'csv'), ('.ndjson', 'ndjson'), ('.jsonl', 'ndjson'), ('.json', 'json')):
+            if path.lower().endswith(suffix):
+                return fmt
+        raise CommandError('Cannot tell the format from the file name; pass --format.')
+
+    def read_rows(self, handle, fmt):
+        """Yield ``(line_number, row_dict)`` pairs."""
+        if fmt == 'csv':
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, row
+        elif fmt == 'ndjson':
+            for line_number, line in enumerate(handle, 1):
+                if line.strip():
+                    yield line_number, json.loads(line)
+        else:
+            data = json.load(handle)
+            if not isinstance(data, list):
+                raise CommandError('A JSON import must be an array of objects.')
+            yield from enumerate(data, 1)
+
+    def build_entry(self, row, user_ids):
+        """Validate a row and return an unsaved PushupEntry."""
+        if not isinstance(row, dict):
+            raise ValidationError('Expected an object with username, date and count.')
+
+        username = str(row.get('username') or '').strip()
+        if username not in user_ids:
+            raise ValidationError(f'Unknown user "{username}".')
+
+        try:
+            day = date.fromisoformat(str(row.get('date') or '').strip())
+        except ValueError:
+            raise ValidationError(f'Invalid date "{row.get("date")}".')
+
+        try:
+            count = int(str(row.get('count')).strip())
+        except ValueError:
+            raise ValidationError(f'Invalid count "{row.get("count")}".')
+        validate_pushup_count(count)
+
+        notes = (row.get('notes') or '').strip() or None
+        return PushupEntry(user_id=user_ids[username], date=day, count=count, notes=notes)
+
+    def write_batch(self, batch, affected, dry_run):
+        if not batch:
+            return 0
+        if not dry_run:
+            with transaction.atomic():
+                PushupEntry.objects.bulk_create(batch)
+            affected.update((entry.user_id, entry.date.year, entry.date.month) for entry in batch)
+        return len(batch)
+
+    def report_progress(self, imported, started):
+        elapsed = time.monotonic() - started
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(f'  {imported:,} rows ({rate:,.0f} rows/s)')
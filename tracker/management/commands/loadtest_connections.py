@@ -0,0 +1,122 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Send requests through the full WSGI handler from several threads (like a '
+        'threaded gunicorn worker) and report how many database connections they '
+        'opened. Run it once per DB_CONN_MAX_AGE / DB_POOL setting to compare.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to make the requests as (default: the first user).')
+        parser.add_argument('--path', default='/dashboard/', help='Page to request (default: /dashboard/).')
+        parser.add_argument('--requests', type=int, default=500, help='Total requests (default: 500).')
+        parser.add_argument('--concurrency', type=int, default=4, help='Threads sending requests (default: 4).')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 2 or options['concurrency'] < 1:
+            raise CommandError('--requests must be at least 2 and --concurrency at least 1.')
+
+        users = User.objects.order_by('pk')
+        user = users.filter(username=options['user']).first() if options['user'] else users.first()
+        if user is None:
+            raise CommandError('No such user; create one (or seed some data) first.')
+
+        database = settings.DATABASES['default']
+        self.stdout.write(
+            f"{connection.vendor}: CONN_MAX_AGE={database.get('CONN_MAX_AGE', 0)}, "
+            f"pool={'on' if database.get('OPTIONS', {}).get('pool') else 'off'}, "
+            f"{options['requests']} x {options['path']} on {options['concurrency']} threads"
+        )
+
+        opened = []
+        counter_lock = threading.Lock()
+
+        def count_connection(sender, **kwargs):
+            with counter_lock:
+                opened.append(1)
+
+        sessions_before = self.server_sessions()
+        connection_created.connect(count_connection)
+        try:
+            with override_settings(ALLOWED_HOSTS=['*']):
+                latencies, statuses, held = self.run(user, options)
+        finally:
+            connection_created.disconnect(count_connection)
+        sessions_after = self.server_sessions()
+
+        self.stdout.write(f'status codes: {dict(sorted(statuses.items()))}')
+        self.stdout.write(
+            f'latency p50 {statistics.median(latencies) * 1000:.1f} ms, '
+            f'max {max(latencies) * 1000:.1f} ms'
+        )
+        # With a pool this counts checkouts, not new server connections
+        self.stdout.write(f'connections set up by Django: {len(opened)}')
+        if sessions_before is not None:
+            self.stdout.write(f'sessions opened on the server: {sessions_after - sessions_before}')
+        if held is not None:
+            self.stdout.write(f'connections still open after the run: {held}')
+
+    def run(self, user, options):
+        client = Client()
+        client.force_login(user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        handler = WSGIHandler()
+        statuses = {}
+        statuses_lock = threading.Lock()
+
+        def one_request(_):
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': options['path'],
+                'SERVER_NAME': 'localhost',
+                'SERVER_PORT': '443',
+                'HTTP_HOST': 'localhost',
+                'HTTP_COOKIE': cookie,
+                'wsgi.url_scheme': 'https',
+                'wsgi.input': BytesIO(),
+            }
+            started = time.perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            b''.join(response)
+            # Sends request_finished, which closes or keeps the connection
+            response.close()
+            with statuses_lock:
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            latencies = list(pool.map(one_request, range(options['requests'])))
+            held = self.open_connections()
+        return latencies, statuses, held
+
+    def server_sessions(self):
+        """Sessions PostgreSQL (14+) has accepted for this database so far."""
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT sessions FROM pg_stat_database WHERE datname = current_database()')
+            return cursor.fetchone()[0]
+
+    def open_connections(self):
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND backend_type = 'client backend' AND pid <> pg_backend_pid()"
+            )
+            return cursor.fetchone()[0]
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import cache
+from tracker.models import MonthlyTotal
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the MonthlyTotal and DailyTotal summary tables from pushup entries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help='Only rebuild this year.')
+        parser.add_argument('--month', type=int, help='Only rebuild this month (requires --year).')
+
+    def handle(self, *args, **options):
+        year = options['year']
+        month = options['month']
+
+        if month and not year:
+            raise CommandError('--month requires --year.')
+        if month and not 1 <= month <= 12:
+            raise CommandError('--month must be between 1 and 12.')
+
+        summaries = MonthlyTotal.objects.all()
+        if year:
+            summaries = summaries.filter(year=year)
+        if month:
+            summaries = summaries.filter(month=month)
+
+        def touched():
+            return set(summaries.values_list('user_id', 'year', 'month'))
+
+        # Rows that go away and rows that appear both change cached pages
+        affected = touched()
+        rows = MonthlyTotal.rebuild(year, month)
+        affected |= touched()
+        cache.record_write([user_id for user_id, _, _ in affected], [key[1:] for key in affected])
+
+        scope = f'{year}-{month:02d}' if month else (str(year) if year else 'all months')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} monthly totals for {scope}.'))
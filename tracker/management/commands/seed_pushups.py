@@ -0,0 +1,85 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracker import cache
+from tracker.models import MonthlyTotal, PushupEntry
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate synthetic users and entries for load testing, ending today. '
+        'Users are named <prefix>00001, ... and share the password "pushups". '
+        'Use a throwaway database (DJANGO_SQLITE_PATH) for large runs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Users to create (default: 100).')
+        parser.add_argument('--days', type=int, default=30, help='Days of history per user (default: 30).')
+        parser.add_argument('--entries-per-day', type=int, default=1, help='Entries on each active day (default: 1).')
+        parser.add_argument('--active', type=float, default=0.7, help='Share of days a user logs anything (default: 0.7).')
+        parser.add_argument('--prefix', default='seed', help='Username prefix (default: seed).')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for repeatable data (default: 0).')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert (default: 5000).')
+        parser.add_argument('--clear', action='store_true', help='Delete users with the prefix first.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['days'] < 1 or options['entries_per_day'] < 1:
+            raise CommandError('--users, --days and --entries-per-day must be at least 1.')
+        if not 0 < options['active'] <= 1:
+            raise CommandError('--active must be between 0 and 1.')
+
+        prefix = options['prefix']
+        batch_size = options['batch_size']
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        if options['clear']:
+            deleted, _ = User.objects.filter(username__startswith=prefix).delete()
+            self.stdout.write(f'Deleted {deleted} rows from earlier seeding.')
+        elif User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f'Users named {prefix}* already exist; pass --clear to replace them.')
+
+        # Hashing is deliberately slow; every seeded user shares one hash
+        password = make_password('pushups')
+        width = len(str(options['users']))
+        User.objects.bulk_create(
+            (User(username=f'{prefix}{number:0{width}d}', password=password)
+             for number in range(1, options['users'] + 1)),
+            batch_size=batch_size,
+        )
+        user_ids = list(User.objects.filter(username__startswith=prefix).values_list('pk', flat=True))
+
+        today = timezone.localdate()
+        days = [today - timedelta(days=offset) for offset in range(options['days'])]
+        batch = []
+        entries = 0
+        for user_id in user_ids:
+            for day in days:
+                if rng.random() >= options['active']:
+                    continue
+                for _ in range(options['entries_per_day']):
+                    batch.append(PushupEntry(user_id=user_id, date=day, count=rng.randint(5, 60)))
+                if len(batch) >= batch_size:
+                    PushupEntry.objects.bulk_create(batch)
+                    entries += len(batch)
+                    batch = []
+        PushupEntry.objects.bulk_create(batch)
+        entries += len(batch)
+
+        # bulk_create skips save(), so build the monthly totals in one pass per
+        # month (seeded users have nothing cached, so only months need bumping)
+        months = sorted({(day.year, day.month) for day in days})
+        for year, month in months:
+            MonthlyTotal.rebuild(year, month)
+        cache.record_write([], months)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(user_ids)} users and {entries} entries over {len(months)} months '
+            f'in {time.perf_counter() - started:.1f}s.'
+        ))
@@ -0,0 +1,150 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+from django.db.models import Sum
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tracker.models import MonthlyTotal, PushupEntry
+
+
+class Command(BaseCommand):
+    help = (
+        'Stress a throwaway SQLite database with parallel writers: each writer is '
+        'a separate process (like a gunicorn worker) that adds, edits and deletes '
+        'entries through the views, all starting at the same moment. Reports '
+        '"database is locked" errors and checks the monthly totals afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=16, help='Writer processes (default: 16).')
+        parser.add_argument('--entries', type=int, default=30, help='Entries each writer adds (default: 30).')
+        parser.add_argument('--untuned', action='store_true', help='Use plain SQLite instead of DJANGO_SQLITE_TUNED.')
+        # Internal: the roles the command runs itself in
+        parser.add_argument('--worker', type=int, help='(internal) run as writer N')
+        parser.add_argument('--start-at', type=float, help='(internal) when writers begin')
+        parser.add_argument('--verify', action='store_true', help='(internal) compare totals')
+
+    def handle(self, *args, **options):
+        if options['worker'] is not None:
+            return self.write(options['worker'], options['entries'], options['start_at'])
+        if options['verify']:
+            return self.verify()
+
+        if options['writers'] < 1 or options['entries'] < 1:
+            raise CommandError('--writers and --entries must be at least 1.')
+
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE='pushup_counter.settings',
+                DJANGO_SQLITE_PATH=os.path.join(directory, 'stress.sqlite3'),
+                DJANGO_SQLITE_TUNED='False' if options['untuned'] else 'True',
+                DJANGO_CACHE_BACKEND='locmem',
+            )
+            self.manage(env, 'migrate', '--verbosity', '0')
+
+            self.stdout.write(
+                f"{options['writers']} writers x {options['entries']} entries, "
+                f"SQLite {'untuned' if options['untuned'] else 'tuned'}"
+            )
+            # Give every process time to start before the burst
+            start_at = time.time() + 2 + options['writers'] * 0.1
+            writers = [
+                subprocess.Popen(
+                    self.command(
+                        'stress_sqlite', '--worker', str(worker), '--entries', str(options['entries']),
+                        '--start-at', str(start_at),
+                    ),
+                    env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                )
+                for worker in range(options['writers'])
+            ]
+            results = [self.result(writer) for writer in writers]
+            report = json.loads(self.manage(env, 'stress_sqlite', '--verify').strip().splitlines()[-1])
+
+        writes = sum(result['writes'] for result in results)
+        locked = sum(result['locked'] for result in results)
+        elapsed = max(result['elapsed'] for result in results)
+        self.stdout.write(f'writes: {writes} ok, {locked} "database is locked", {writes / elapsed:.0f} writes/s')
+        self.stdout.write(f"slowest write: {max(result['slowest'] for result in results) * 1000:.0f} ms")
+        self.stdout.write(f"monthly totals off: {report['mismatched']}")
+
+        if locked or report['mismatched']:
+            raise CommandError('Concurrent writes failed or left the totals inconsistent.')
+        self.stdout.write(self.style.SUCCESS('All writes succeeded and the totals match.'))
+
+    def command(self, *args):
+        return [sys.executable, str(settings.BASE_DIR / 'manage.py'), *args]
+
+    def result(self, writer):
+        # Locked requests are logged to stderr; only show it if the writer crashed
+        out, err = writer.communicate()
+        if writer.returncode:
+            raise CommandError(f'A writer failed:\n{err}')
+        return json.loads(out.strip().splitlines()[-1])
+
+    def manage(self, env, *args):
+        return subprocess.run(self.command(*args), env=env, check=True, capture_output=True, text=True).stdout
+
+    def write(self, worker, entries, start_at):
+        """One writer: add entries, editing every third and deleting every fifth."""
+        user = User.objects.create_user(f'stress{worker}')
+        client = Client()
+        client.force_login(user)
+        today = timezone.localdate().isoformat()
+
+        writes = locked = 0
+        slowest = 0.0
+        time.sleep(max(0.0, start_at - time.time()))
+        started = time.perf_counter()
+
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for number in range(entries):
+                requests = [(reverse('add_entry'), {'date': today, 'count': number % 5 + 1})]
+                latest = user.pushup_entries.order_by('-pk').values_list('pk', flat=True).first()
+                if latest and number % 3 == 2:
+                    requests.append((reverse('edit_entry', args=[latest]), {'date': today, 'count': 7}))
+                if latest and number % 5 == 4:
+                    requests.append((reverse('delete_entry', args=[latest]), {}))
+
+                for url, data in requests:
+                    request_started = time.perf_counter()
+                    try:
+                        response = client.post(url, data)
+                        if response.status_code != 302:
+                            raise CommandError(f'{url} was rejected with status {response.status_code}.')
+                        writes += 1
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        locked += 1
+                    slowest = max(slowest, time.perf_counter() - request_started)
+
+        self.stdout.write(json.dumps({
+            'writes': writes, 'locked': locked, 'slowest': slowest,
+            'elapsed': time.perf_counter() - started,
+        }))
+
+    def verify(self):
+        actual = {
+            (row['user_id'], row['date__year'], row['date__month']): row['total']
+            for row in PushupEntry.objects.values('user_id', 'date__year', 'date__month').annotate(total=Sum('count'))
+        }
+        stored = {
+            (row.user_id, row.year, row.month): row.total
+            for row in MonthlyTotal.objects.all()
+        }
+        mismatched = sum(
+            actual.get(key, 0) != stored.get(key, 0) for key in actual.keys() | stored.keys()
+        )
+        self.stdout.write(json.dumps({'mismatched': mismatched}))
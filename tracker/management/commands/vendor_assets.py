@@ -0,0 +1,55 @@
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.assets import SOURCE_MAP_COMMENT, VENDOR, cdn_url, is_vendored, static_path, strip_source_map
+
+
+class Command(BaseCommand):
+    help = (
+        'Download the pinned third-party front-end assets into static/vendor/ '
+        'so pages no longer load them from the CDN. Commit the files afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Download files that are already present.')
+        parser.add_argument('--check', action='store_true', help='Only report which assets are missing.')
+
+    def handle(self, *args, **options):
+        root = Path(settings.STATICFILES_DIRS[0])
+        missing = [name for name in VENDOR if not (root / static_path(name)).exists()]
+
+        if options['check']:
+            for name in missing:
+                self.stdout.write(f'missing: {static_path(name)}')
+            # Downloaded before source map comments were stripped
+            mapped = [
+                name for name in VENDOR
+                if name not in missing and SOURCE_MAP_COMMENT.search((root / static_path(name)).read_bytes())
+            ]
+            for name in mapped:
+                self.stdout.write(f'source map comment: {static_path(name)}')
+            if missing:
+                raise CommandError(f'{len(missing)} vendored assets are missing; run vendor_assets.')
+            if mapped:
+                raise CommandError(f'{len(mapped)} vendored assets reference missing source maps; run vendor_assets --force.')
+            self.stdout.write(self.style.SUCCESS('All vendored assets are present.'))
+            return
+
+        for name in VENDOR if options['force'] else missing:
+            target = root / static_path(name)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                with urllib.request.urlopen(cdn_url(name), timeout=30) as response:
+                    content = response.read()
+            except OSError as exc:
+                raise CommandError(f'Could not download {cdn_url(name)}: {exc}')
+            if target.suffix in ('.css', '.js'):
+                content = strip_source_map(content)
+            target.write_bytes(content)
+            self.stdout.write(f'{static_path(name)} ({target.stat().st_size // 1024} KB)')
+
+        is_vendored.cache_clear()
+        self.stdout.write(self.style.SUCCESS('Vendored assets are up to date.'))
@@ -0,0 +1,39 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils import timezone
+
+from .timezones import atimezone_name, timezone_name
+
+
+class UserTimezoneMiddleware:
+    """
+    Activate the signed-in user's timezone for the request, so
+    ``timezone.localtime()``/``localdate()`` and template dates follow
+    their calendar. Must come after AuthenticationMiddleware.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user = request.user
+        if user.is_authenticated:
+            timezone.activate(timezone_name(user.pk))
+        try:
+            return self.get_response(request)
+        finally:
+            timezone.deactivate()
+
+    async def __acall__(self, request):
+        user = await request.auser()
+        if user.is_authenticated:
+            timezone.activate(await atimezone_name(user.pk))
+        try:
+            return await self.get_response(request)
+        finally:
+            timezone.deactivate()
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_monthly_totals(apps, schema_editor):
+    PushupEntry = apps.get_model('tracker', 'PushupEntry')
+    MonthlyTotal = apps.get_model('tracker', 'MonthlyTotal')
+
+    daily_totals = PushupEntry.objects.values('user_id', 'date').annotate(
+        day_total=Sum('count')
+    ).order_by('user_id', 'date')
+
+    summaries = {}
+    for row in daily_totals.iterator(chunk_size=2000):
+        key = (row['user_id'], row['date'].year, row['date'].month)
+        summary = summaries.setdefault(key, MonthlyTotal(
+            user_id=key[0], year=key[1], month=key[2], total=0, days_active=0, best_day=0
+        ))
+        summary.total += row['day_total']
+        summary.days_active += 1
+        summary.best_day = max(summary.best_day, row['day_total'])
+
+    MonthlyTotal.objects.bulk_create(summaries.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('days_active', models.PositiveSmallIntegerField(default=0)),
+                ('best_day', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-year', '-month', '-total'],
+                'indexes': [models.Index(fields=['year', 'month', '-total'], name='tracker_mon_year_b54871_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'year', 'month'), name='unique_monthly_total')],
+            },
+        ),
+        migrations.RunPython(populate_monthly_totals, migrations.RunPython.noop),
+    ]
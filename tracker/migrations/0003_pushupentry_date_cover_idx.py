@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_monthlytotal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pushupentry',
+            index=models.Index(fields=['date', 'user', 'count'], name='tracker_pus_date_cover_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0003_pushupentry_date_cover_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pushupentry',
+            index=models.Index(fields=['user', '-date', '-created_at', '-id'], name='tracker_pus_user_id_e222e5_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='pushupentry',
+            name='tracker_pus_user_id_8c4924_idx',
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-18 03:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_pushupentry_feed_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pushupentry',
+            name='client_id',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='pushupentry',
+            constraint=models.UniqueConstraint(fields=('user', 'client_id'), name='unique_client_entry'),
+        ),
+    ]
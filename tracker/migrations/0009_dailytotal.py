@@ -0,0 +1,48 @@
+# Generated by Django 5.1.4 on 2026-10-18 04:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_daily_totals(apps, schema_editor):
+    PushupEntry = apps.get_model('tracker', 'PushupEntry')
+    DailyTotal = apps.get_model('tracker', 'DailyTotal')
+
+    daily_totals = PushupEntry.objects.values('user_id', 'date').annotate(
+        day_total=Sum('count')
+    ).order_by('user_id', 'date')
+
+    batch = []
+    for row in daily_totals.iterator(chunk_size=2000):
+        batch.append(DailyTotal(user_id=row['user_id'], date=row['date'], total=row['day_total']))
+        if len(batch) >= 1000:
+            DailyTotal.objects.bulk_create(batch)
+            batch = []
+    DailyTotal.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_profile_timezone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['user', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='unique_daily_total')],
+            },
+        ),
+        migrations.RunPython(populate_daily_totals, migrations.RunPython.noop),
+    ]
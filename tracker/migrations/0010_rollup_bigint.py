@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0009_dailytotal'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailytotal',
+            name='total',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='monthlytotal',
+            name='best_day',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='monthlytotal',
+            name='total',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
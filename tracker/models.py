@@ -1,76 +1,226 @@
-from django.db import models
+import datetime
+import zoneinfo
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import F, Q, Sum, Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 
+from .comparison import Comparison
+from .leaderboard import Leaderboard
+from .trends import user_trends
+
+# The last timezone in which any given day ends (UTC-12)
+LATEST_TIMEZONE = zoneinfo.ZoneInfo('Etc/GMT+12')
+
+
+def date_window(year, month=None):
+    """
+    Return ``(start, end)`` dates covering a month, or a whole year if no
+    month is given. ``end`` is exclusive, so filter with ``__gte``/``__lt``
+    and the date indexes can be range-scanned.
+    """
+    year = int(year)
+    if month is None:
+        return datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+
+    month = int(month)
+    start = datetime.date(year, month, 1)
+    if month == 12:
+        return start, datetime.date(year + 1, 1, 1)
+    return start, datetime.date(year, month + 1, 1)
+
+
+def in_window(year, month=None, field='date'):
+    """Filter kwargs limiting ``field`` to :func:`date_window`."""
+    start, end = date_window(year, month)
+    return {f'{field}__gte': start, f'{field}__lt': end}
+
 
 class PushupEntry(models.Model):
     """Model to track pushup entries for users."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pushup_entries')
-    date = models.DateField(default=timezone.now)
+    # The day in the user's own timezone, fixed when the entry is written, so
+    # month and day aggregates stay plain range scans on the date indexes
+    date = models.DateField(default=timezone.localdate)
     count = models.IntegerField(validators=[MinValueValidator(1)])
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by offline clients so a re-sent entry is recognised, not duplicated
+    client_id = models.UUIDField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['-date', '-created_at']
         verbose_name_plural = "Pushup Entries"
         indexes = [
-            models.Index(fields=['user', '-date']),
+            # Matches the history ordering, so keyset pages are a single index range
+            models.Index(fields=['user', '-date', '-created_at', '-id']),
             models.Index(fields=['-date']),
+            # Covers month-wide GROUP BY user aggregates without touching the table
+            models.Index(fields=['date', 'user', 'count'], name='tracker_pus_date_cover_idx'),
+            # Activity feed order; ?after=<cursor> reads are a short range scan
+            models.Index(fields=['-created_at', '-id'], name='tracker_pus_feed_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'client_id'], name='unique_client_entry'),
         ]
 
     def __str__(self):
         return f"{self.user.username} - {self.count} pushups on {self.date}"
 
+    def _lock_stored_state(self):
+        """
+        Lock this entry's row and return its stored (user_id, date, count).
+
+        Read inside the write's transaction rather than trusting what was
+        loaded earlier: the instance may come from only()/defer(), be
+        refreshed, or be stale because another request changed the row.
+        """
+        if self._state.adding or self.pk is None:
+            return None
+        return (
+            PushupEntry.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list('user_id', 'date', 'count')
+            .first()
+        )
+
+    def save(self, *args, **kwargs):
+        # Accept datetimes and ISO strings (shell, fixtures) as well as dates
+        self.date = self._meta.get_field('date').to_python(self.date)
+        with transaction.atomic():
+            # Also read by the post_save signal to invalidate the old month
+            self._previous_state = previous = self._lock_stored_state()
+            super().save(*args, **kwargs)
+            current = (self.user_id, self.date, self.count)
+            if previous != current:
+                MonthlyTotal.record_change(previous, current)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self._lock_stored_state()
+            result = super().delete(*args, **kwargs)
+            # Already gone (deleted by someone else): nothing left to subtract
+            if previous is not None:
+                MonthlyTotal.record_change(previous, None)
+        return result
+
+    @staticmethod
+    def _leaderboard_rows(year, month):
+        return MonthlyTotal.objects.filter(
+            year=year,
+            month=month,
+            total__gt=0
+        ).order_by('-total', 'user__username').values_list(
+            'user__id', 'user__username', 'user__first_name', 'user__last_name', 'total'
+        )
+
     @staticmethod
     def get_monthly_leaderboard(year, month):
-        """Get leaderboard for a specific month."""
-        from django.db.models import Sum
+        """Get leaderboard for a specific month as an immutable Leaderboard."""
+        rows = PushupEntry._leaderboard_rows(year, month)
         
-        entries = PushupEntry.objects.filter(
-            date__year=year,
-            date__month=month
-        ).values('user__id', 'user__username', 'user__first_name', 'user__last_name').annotate(
-            total_pushups=Sum('count')
-        ).order_by('-total_pushups')
+        return Leaderboard.build(year, month, rows)
+
+    @staticmethod
+    async def aget_monthly_leaderboard(year, month):
+        rows = [row async for row in PushupEntry._leaderboard_rows(year, month)]
+        return Leaderboard.build(year, month, rows)
+
+    @staticmethod
+    def _rank_query(user, year, month):
+        """The competitors queryset and the aggregates that rank ``user``."""
+        competitors = MonthlyTotal.objects.filter(year=year, month=month, total__gt=0)
+        user_total = competitors.filter(user=user).values('total')[:1]
         
-        return entries
+        return competitors, {
+            'competitors': Count('id'),
+            'ahead': Count('id', filter=Q(total__gt=Subquery(user_total))),
+            'ranked': Count('id', filter=Q(user=user)),
+        }
+
+    @staticmethod
+    def _rank_result(result):
+        rank = result['ahead'] + 1 if result['ranked'] else None
+        return rank, result['competitors']
+
+    @staticmethod
+    def get_user_rank(user, year, month):
+        """
+        Get a user's rank and the number of competitors for a month.
+
+        Returns ``(rank, competitors)``; rank is None when the user has no
+        pushups that month. Users on the same total share a rank.
+        """
+        competitors, aggregates = PushupEntry._rank_query(user, year, month)
+        return PushupEntry._rank_result(competitors.aggregate(**aggregates))
+
+    @staticmethod
+    async def aget_user_rank(user, year, month):
+        competitors, aggregates = PushupEntry._rank_query(user, year, month)
+        return PushupEntry._rank_result(await competitors.aaggregate(**aggregates))
 
     @staticmethod
     def get_user_monthly_total(user, year, month):
         """Get total pushups for a user in a specific month."""
-        from django.db.models import Sum
-        
-        total = PushupEntry.objects.filter(
+        total = MonthlyTotal.objects.filter(
             user=user,
-            date__year=year,
-            date__month=month
-        ).aggregate(total=Sum('count'))['total']
+            year=year,
+            month=month
+        ).values_list('total', flat=True).first()
         
         return total or 0
 
     @staticmethod
-    def get_user_stats(user, year, month):
-        """Get statistics for a user in a specific month."""
-        from django.db.models import Sum, Max
-        
-        entries = PushupEntry.objects.filter(
+    def _comparison_rows(users, year, month):
+        # One range read of the daily rollup for all users at once
+        return DailyTotal.objects.filter(
+            user_id__in=[user.pk for user in users],
+            **in_window(year, month)
+        ).order_by().values_list('user_id', 'date', 'total')
+
+    @staticmethod
+    def compare_users(users, year, month):
+        """
+        Compare several users' months in a single query.
+
+        ``users`` are User objects; the first one is the reference the
+        running gap is measured against. Returns a Comparison.
+        """
+        rows = PushupEntry._comparison_rows(users, year, month)
+        return Comparison.build(year, month, users, rows)
+
+    @staticmethod
+    async def acompare_users(users, year, month):
+        rows = [row async for row in PushupEntry._comparison_rows(users, year, month)]
+        return Comparison.build(year, month, users, rows)
+
+    @staticmethod
+    def _daily_totals(user, year, month):
+        # Daily totals (multiple entries per day already summed) from the rollup
+        return DailyTotal.objects.filter(
             user=user,
-            date__year=year,
-            date__month=month
-        )
-        
-        # Get daily totals (sum multiple entries per day)
-        daily_totals = entries.values('date').annotate(
-            day_total=Sum('count')
-        ).values_list('day_total', flat=True)
-        
-        # Calculate stats
-        total = sum(daily_totals) if daily_totals else 0
-        days_active = len(daily_totals)
-        best_day = max(daily_totals) if daily_totals else 0
+            **in_window(year, month)
+        ).values('date').annotate(
+            day_total=F('total')
+        ).order_by('date')
+
+    # Aggregate over the grouped daily rows in SQL (runs as a subquery)
+    STATS_AGGREGATES = {
+        'total': Sum('day_total'),
+        'days_active': Count('date'),
+        'best_day': Max('day_total'),
+    }
+
+    @staticmethod
+    def _stats(total, days_active, best_day, daily=None):
         average = round(total / days_active, 1) if days_active > 0 else 0
         
         stats = {
@@ -79,6 +229,331 @@ class PushupEntry(models.Model):
             'best_day': best_day,
             'days_active': days_active
         }
+        if daily is not None:
+            stats['daily'] = daily
         
         return stats
 
+    @staticmethod
+    def _series_stats(daily):
+        return PushupEntry._stats(sum(daily.values()), len(daily), max(daily.values(), default=0), daily)
+
+    @staticmethod
+    def _aggregate_stats(result):
+        return PushupEntry._stats(result['total'] or 0, result['days_active'], result['best_day'] or 0)
+
+    @staticmethod
+    def get_user_stats(user, year, month, with_series=False):
+        """
+        Get statistics for a user in a specific month in one query.
+
+        With ``with_series=True`` the per-day totals come back from the same
+        query under ``'daily'`` (a ``{date: total}`` dict, ordered by date).
+        """
+        daily_totals = PushupEntry._daily_totals(user, year, month)
+        
+        if with_series:
+            return PushupEntry._series_stats(dict(daily_totals.values_list('date', 'day_total')))
+        return PushupEntry._aggregate_stats(daily_totals.order_by().aggregate(**PushupEntry.STATS_AGGREGATES))
+
+    @staticmethod
+    async def aget_user_stats(user, year, month, with_series=False):
+        daily_totals = PushupEntry._daily_totals(user, year, month)
+        
+        if with_series:
+            daily = {day: total async for day, total in daily_totals.values_list('date', 'day_total')}
+            return PushupEntry._series_stats(daily)
+        result = await daily_totals.order_by().aaggregate(**PushupEntry.STATS_AGGREGATES)
+        return PushupEntry._aggregate_stats(result)
+
+
+class MonthlyTotal(models.Model):
+    """Per-user monthly summary, kept in step with PushupEntry writes."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_totals')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    total = models.PositiveBigIntegerField(default=0)
+    days_active = models.PositiveSmallIntegerField(default=0)
+    best_day = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-year', '-month', '-total']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'year', 'month'], name='unique_monthly_total'),
+        ]
+        indexes = [
+            models.Index(fields=['year', 'month', '-total']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.total} pushups in {self.year}-{self.month:02d}"
+
+    @staticmethod
+    def record_change(previous, current):
+        """
+        Apply an entry write to the affected monthly rows.
+
+        ``previous`` and ``current`` are ``(user_id, date, count)`` tuples (or
+        None for a create/delete). Day and month totals move by F() deltas;
+        days active and best day are re-derived from that user's daily rows
+        for the month only.
+        """
+        deltas = {}
+        day_deltas = {}
+        if previous:
+            user_id, date, count = previous
+            key = (user_id, date.year, date.month)
+            deltas[key] = deltas.get(key, 0) - count
+            day_deltas[(user_id, date)] = day_deltas.get((user_id, date), 0) - count
+        if current:
+            user_id, date, count = current
+            key = (user_id, date.year, date.month)
+            deltas[key] = deltas.get(key, 0) + count
+            day_deltas[(user_id, date)] = day_deltas.get((user_id, date), 0) + count
+
+        # Days first: the monthly day stats are derived from them
+        for (user_id, day), delta in day_deltas.items():
+            if delta:
+                DailyTotal.apply_delta(user_id, day, delta)
+        for (user_id, year, month), delta in deltas.items():
+            MonthlyTotal.apply_delta(user_id, year, month, delta)
+
+        # Backfills into a closed month re-freeze its leaderboard
+        for year, month in {(year, month) for _, year, month in deltas}:
+            if LeaderboardSnapshot.is_closed(year, month):
+                LeaderboardSnapshot.refresh(year, month)
+
+    @staticmethod
+    def apply_delta(user_id, year, month, delta):
+        """Add ``delta`` to a user's monthly total and refresh the day stats."""
+        days = DailyTotal.objects.filter(
+            user_id=OuterRef('user_id'),
+            **in_window(year, month)
+        ).order_by()
+
+        days_active = days.values('user_id').annotate(days=Count('id')).values('days')
+        best_day = days.order_by('-total').values('total')[:1]
+
+        with transaction.atomic():
+            MonthlyTotal.objects.get_or_create(user_id=user_id, year=year, month=month)
+            MonthlyTotal.objects.filter(user_id=user_id, year=year, month=month).update(
+                total=F('total') + delta,
+                days_active=Coalesce(Subquery(days_active), Value(0)),
+                best_day=Coalesce(Subquery(best_day), Value(0)),
+            )
+
+    @staticmethod
+    def daily_totals(year=None, month=None, user_ids=None):
+        """Per-user, per-day sums of PushupEntry, ordered by user and date."""
+        entries = PushupEntry.objects.all()
+        if year:
+            entries = entries.filter(**in_window(year, month))
+        if user_ids is not None:
+            entries = entries.filter(user_id__in=user_ids)
+
+        return entries.values('user_id', 'date').annotate(
+            day_total=Sum('count')
+        ).order_by('user_id', 'date')
+
+    @staticmethod
+    def rebuild(year=None, month=None, user_ids=None):
+        """
+        Recompute monthly rows (and the DailyTotal rows under them) from
+        PushupEntry.
+
+        Scoped to one year (and optionally month) and/or a set of users when
+        given; returns the number of monthly rows written.
+        """
+        if month and not year:
+            raise ValueError('Rebuilding a month requires a year.')
+
+        rows = MonthlyTotal.objects.all()
+        days = DailyTotal.objects.all()
+        if year:
+            rows = rows.filter(year=year)
+            days = days.filter(**in_window(year, month))
+        if month:
+            rows = rows.filter(month=month)
+        if user_ids is not None:
+            rows = rows.filter(user_id__in=user_ids)
+            days = days.filter(user_id__in=user_ids)
+
+        summaries = {}
+        daily = []
+        for row in MonthlyTotal.daily_totals(year, month, user_ids).iterator(chunk_size=2000):
+            daily.append(DailyTotal(user_id=row['user_id'], date=row['date'], total=row['day_total']))
+            key = (row['user_id'], row['date'].year, row['date'].month)
+            summary = summaries.setdefault(key, MonthlyTotal(
+                user_id=key[0], year=key[1], month=key[2]
+            ))
+            summary.total += row['day_total']
+            summary.days_active += 1
+            summary.best_day = max(summary.best_day, row['day_total'])
+
+        with transaction.atomic():
+            rows.delete()
+            days.delete()
+            DailyTotal.objects.bulk_create(daily, batch_size=1000)
+            MonthlyTotal.objects.bulk_create(summaries.values(), batch_size=1000)
+            LeaderboardSnapshot.refresh(year, month)
+
+        return len(summaries)
+
+
+class DailyTotal(models.Model):
+    """Per-user daily summary (one row per active day), kept in step with PushupEntry writes."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_totals')
+    date = models.DateField()
+    total = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['user', 'date']
+        constraints = [
+            # Also the index for a user's date ranges
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_daily_total'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.total} pushups on {self.date}"
+
+    @staticmethod
+    def apply_delta(user_id, day, delta):
+        """Add ``delta`` to a user's day; a day left at zero is removed."""
+        with transaction.atomic():
+            DailyTotal.objects.get_or_create(user_id=user_id, date=day)
+            DailyTotal.objects.filter(user_id=user_id, date=day).update(total=F('total') + delta)
+            if delta < 0:
+                DailyTotal.objects.filter(user_id=user_id, date=day, total=0).delete()
+
+    @staticmethod
+    def _history(user, today):
+        # (date, total) for every active day up to today, oldest first
+        return DailyTotal.objects.filter(user=user, date__lte=today).order_by('date').values_list('date', 'total')
+
+    @staticmethod
+    def trends(user, today):
+        """Streaks and long-range totals/averages (see trends.py) in one query."""
+        return user_trends(DailyTotal._history(user, today), today)
+
+    @staticmethod
+    async def atrends(user, today):
+        rows = [row async for row in DailyTotal._history(user, today)]
+        return user_trends(rows, today)
+
+
+class LeaderboardSnapshot(models.Model):
+    """
+    Frozen standings for a completed month.
+
+    ``rows`` holds ``[user_id, username, first_name, last_name, total]``
+    lists in leaderboard order, so reading a past month is a single-row
+    lookup that never aggregates PushupEntry or MonthlyTotal again.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    rows = models.JSONField(default=list)
+    frozen_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['year', 'month'], name='unique_leaderboard_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"Leaderboard {self.year}-{self.month:02d} ({len(self.rows)} users)"
+
+    @staticmethod
+    def is_closed(year, month, today=None):
+        """Whether the month has ended everywhere, so its standings can be frozen."""
+        today = today or timezone.localdate(timezone=LATEST_TIMEZONE)
+        return date_window(year, month)[1] <= today
+
+    @staticmethod
+    def freeze(year, month):
+        """Store the month's current standings, replacing any older snapshot."""
+        board = PushupEntry.get_monthly_leaderboard(year, month)
+        rows = [
+            [row.user_id, row.username, row.first_name, row.last_name, row.total]
+            for row in board
+        ]
+        LeaderboardSnapshot.objects.update_or_create(year=year, month=month, defaults={'rows': rows})
+        return board
+
+    @staticmethod
+    def refresh(year=None, month=None):
+        """
+        Re-freeze existing snapshots after their months were rewritten.
+
+        Months that were never frozen are left alone; they freeze lazily on
+        their next read. Returns the number of snapshots refreshed.
+        """
+        snapshots = LeaderboardSnapshot.objects.all()
+        if year:
+            snapshots = snapshots.filter(year=year)
+        if month:
+            snapshots = snapshots.filter(month=month)
+
+        months = list(snapshots.values_list('year', 'month'))
+        for snapshot_year, snapshot_month in months:
+            LeaderboardSnapshot.freeze(snapshot_year, snapshot_month)
+        return len(months)
+
+    @staticmethod
+    def get_leaderboard(year, month):
+        """
+        Return the month's Leaderboard: live for the current month, from
+        the snapshot (frozen on first read) once the month is over.
+        """
+        if not LeaderboardSnapshot.is_closed(year, month):
+            return PushupEntry.get_monthly_leaderboard(year, month)
+
+        snapshot = LeaderboardSnapshot.objects.filter(year=year, month=month).first()
+        if snapshot is None:
+            return LeaderboardSnapshot.freeze(year, month)
+        return Leaderboard.build(year, month, snapshot.rows)
+
+    @staticmethod
+    async def aget_leaderboard(year, month):
+        if not LeaderboardSnapshot.is_closed(year, month):
+            return await PushupEntry.aget_monthly_leaderboard(year, month)
+
+        snapshot = await LeaderboardSnapshot.objects.filter(year=year, month=month).afirst()
+        if snapshot is None:
+            return await sync_to_async(LeaderboardSnapshot.freeze)(year, month)
+        return Leaderboard.build(year, month, snapshot.rows)
+
+
+@lru_cache(maxsize=1)
+def timezone_names():
+    """Every IANA timezone name zoneinfo knows, sorted."""
+    return sorted(zoneinfo.available_timezones())
+
+
+def validate_timezone(name):
+    if name not in timezone_names():
+        raise ValidationError(f'"{name}" is not a known timezone.')
+
+
+def default_timezone():
+    return settings.TIME_ZONE
+
+
+class Profile(models.Model):
+    """Per-user settings. Users without a row use ``settings.TIME_ZONE``."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
+    timezone = models.CharField(max_length=64, default=default_timezone, validators=[validate_timezone])
+
+    def __str__(self):
+        return f"{self.user.username} ({self.timezone})"
+
+    @staticmethod
+    def get_timezone(user_id):
+        """The user's timezone name, without loading the profile row."""
+        name = Profile.objects.filter(user_id=user_id).values_list('timezone', flat=True).first()
+        return name or settings.TIME_ZONE
+
+    @staticmethod
+    async def aget_timezone(user_id):
+        name = await Profile.objects.filter(user_id=user_id).values_list('timezone', flat=True).afirst()
+        return name or settings.TIME_ZONE
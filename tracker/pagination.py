@@ -0,0 +1,135 @@
+"""
+Keyset (cursor) pagination over PushupEntry.
+
+Pages follow the model's ordering plus ``id`` as a tie-breaker, and the
+cursor is the last row's ``(date, created_at, id)``. Each page is one
+indexed range read of ``page_size + 1`` rows, however deep the user goes.
+
+The activity feed runs the other way: its cursor is the newest item's
+``(created_at, id)`` and ``newer_than`` returns only what came after it.
+
+The admin keeps numbered pages but counts them with
+``EstimatedCountPaginator``, which trusts the PostgreSQL planner's row
+estimate instead of running an exact COUNT(*) once a result is large.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+ORDERING = ('-date', '-created_at', '-id')
+FEED_ORDERING = ('-created_at', '-id')
+
+
+def _encode(*parts):
+    raw = '|'.join(str(part) for part in parts)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode(token):
+    raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+    return raw.split('|')
+
+
+def encode_cursor(entry):
+    return _encode(entry.date.isoformat(), entry.created_at.isoformat(), entry.pk)
+
+
+def decode_cursor(token):
+    """Return ``(date, created_at, id)`` for a cursor, or None if it is invalid."""
+    if not token:
+        return None
+    try:
+        day, created_at, pk = _decode(token)
+        return date.fromisoformat(day), datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, page_size=50):
+    """
+    Return ``(rows, next_cursor)`` for the page after ``cursor``.
+
+    ``next_cursor`` is None on the last page.
+    """
+    queryset = queryset.order_by(*ORDERING)
+
+    position = decode_cursor(cursor)
+    if position:
+        day, created_at, pk = position
+        queryset = queryset.filter(
+            Q(date__lt=day)
+            | Q(date=day, created_at__lt=created_at)
+            | Q(date=day, created_at=created_at, pk__lt=pk)
+        )
+
+    rows = list(queryset[:page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def encode_feed_cursor(entry):
+    return _encode(entry.created_at.isoformat(), entry.pk)
+
+
+def decode_feed_cursor(token):
+    """Return ``(created_at, id)`` for a feed cursor, or None if it is invalid."""
+    if not token:
+        return None
+    try:
+        created_at, pk = _decode(token)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def newer_than(queryset, cursor=None):
+    """Order ``queryset`` newest first, keeping only rows after a feed cursor."""
+    queryset = queryset.order_by(*FEED_ORDERING)
+
+    position = decode_feed_cursor(cursor)
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+        )
+    return queryset
+
+
+def planner_estimate(queryset):
+    """The planner's row estimate for ``queryset`` on PostgreSQL, else None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that counts large results from the planner's estimate.
+
+    Small results (and every result on other databases) are still counted
+    exactly; past EXACT_COUNT_LIMIT the page count is approximate, which is
+    fine for browsing.
+    """
+    EXACT_COUNT_LIMIT = 10000
+
+    @cached_property
+    def count(self):
+        estimate = planner_estimate(self.object_list)
+        if estimate is None or estimate < self.EXACT_COUNT_LIMIT:
+            return super().count
+        return estimate
@@ -0,0 +1,69 @@
+"""
+Service worker support.
+
+The worker is rendered from ``tracker/service-worker.js`` so it can be
+served from the site root (a worker only controls URLs below its own path)
+and so its cache names carry the version of the deployed static files:
+every ``collectstatic`` that changes an asset produces a new worker, and
+the new worker drops the previous build's caches on activation.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+
+from .assets import asset_url, is_vendored
+
+# Always-needed assets fetched when the worker installs, so the first paint
+# of a cached page works offline
+PRECACHE = [
+    'manifest.json',
+    'icons/icon-192x192.png',
+    'icons/favicon.png',
+    'css/custom.css',
+    'js/pwa.js',
+    'js/offline-queue.js',
+    # The add-entry page's offline handling, which must work without a connection
+    'js/entry-form.js',
+]
+# Third-party files every page uses (see assets.py); Chart.js is fetched on demand
+PRECACHE_VENDOR = ['bootstrap.css', 'bootstrap.js', 'bootstrap-icons.css', 'bootstrap-icons.woff2']
+
+
+def _source_files_version():
+    """Hash of every static source file's path, size and mtime."""
+    digest = hashlib.blake2b(digest_size=8)
+    for finder in finders.get_finders():
+        for path, storage in finder.list(['CVS', '.*', '*~']):
+            info = os.stat(storage.path(path))
+            digest.update(f'{path}:{info.st_size}:{info.st_mtime_ns}'.encode())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _built_version():
+    # ManifestStaticFilesStorage hashes staticfiles.json on collectstatic
+    return getattr(staticfiles_storage, 'manifest_hash', '') or _source_files_version()
+
+
+def static_version():
+    """
+    Version string for the current static build.
+
+    With a manifest storage this is the manifest's own hash; otherwise (in
+    development) it is derived from the source files and recomputed on
+    every call while DEBUG is on, so edits show up without a restart.
+    """
+    if settings.DEBUG and not getattr(staticfiles_storage, 'manifest_hash', ''):
+        return _source_files_version()
+    return _built_version()
+
+
+def precache_urls():
+    # Only vendored copies: one failed cross-origin fetch would abort the install
+    vendored = [asset_url(name) for name in PRECACHE_VENDOR if is_vendored(name)]
+    return [static(path) for path in PRECACHE] + vendored
@@ -0,0 +1,230 @@
+import asyncio
+import uuid
+from calendar import monthrange
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404
+from django.utils import timezone
+
+from . import cache
+from .feed import FEED_SIZE
+from .forms import PushupEntryForm
+from .models import PushupEntry, MonthlyTotal, date_window
+from .pagination import encode_feed_cursor
+
+
+def month_chart(year, month, daily):
+    """Build chart labels (day numbers) and values for every day of a month."""
+    days_in_month = monthrange(year, month)[1]
+    by_day = {day.day: total for day, total in daily.items()}
+
+    chart_labels = list(range(1, days_in_month + 1))
+    chart_data = [by_day.get(day, 0) for day in chart_labels]
+    return chart_labels, chart_data
+
+
+def month_from_request(request, now=None):
+    """
+    Return ``(year, month)`` from the ``year``/``month`` GET params,
+    defaulting to the current month. Raises Http404 for invalid values.
+    """
+    now = now or timezone.localtime()
+    try:
+        year = int(request.GET.get('year', now.year))
+        month = int(request.GET.get('month', now.month))
+        date_window(year, month)
+    except (TypeError, ValueError):
+        raise Http404('Invalid month.')
+    return year, month
+
+
+async def alist(queryset):
+    """Evaluate a queryset with the async ORM."""
+    return [row async for row in queryset]
+
+
+def shift_month(year, month, offset):
+    """Return the ``(year, month)`` that is ``offset`` months away."""
+    index = year * 12 + (month - 1) + offset
+    return index // 12, index % 12 + 1
+
+
+def refresh_summaries(affected):
+    """
+    Bring summaries and caches up to date after writes that bypassed
+    ``PushupEntry.save()`` (bulk_create, QuerySet.update/delete).
+
+    ``affected`` is an iterable of ``(user_id, year, month)``; each month is
+    rebuilt once for just the users that changed in it. Inside a transaction
+    the cache is only invalidated once it commits.
+    """
+    by_month = {}
+    for user_id, year, month in affected:
+        by_month.setdefault((year, month), set()).add(user_id)
+
+    for (year, month), user_ids in sorted(by_month.items()):
+        MonthlyTotal.rebuild(year, month, user_ids=user_ids)
+
+    user_ids = {user_id for user_ids in by_month.values() for user_id in user_ids}
+    months = list(by_month)
+    transaction.on_commit(lambda: cache.record_write(user_ids, months))
+    return len(by_month)
+
+
+def sync_entries(user, items):
+    """
+    Store a batch of entries queued by an offline client.
+
+    Each item is a dict with ``client_id`` (a UUID the client generated),
+    ``date``, ``count`` and optional ``notes``, validated with the same rules
+    as PushupEntryForm. Items whose ``client_id`` is already stored are
+    reported as duplicates without being re-validated, so a batch can be
+    re-sent safely. Everything valid is inserted in one transaction.
+
+    Returns one ``{'client_id', 'status', ...}`` dict per item, where status
+    is ``created`` or ``duplicate`` (with the entry ``id``) or ``invalid``
+    (with ``errors``).
+    """
+    parsed = []
+    for item in items:
+        item = item if isinstance(item, dict) else {}
+        try:
+            parsed.append((uuid.UUID(str(item.get('client_id'))), item))
+        except ValueError:
+            parsed.append((None, item))
+
+    with transaction.atomic():
+        client_ids = {client_id for client_id, _ in parsed if client_id}
+        existing = set(PushupEntry.objects.filter(
+            user=user, client_id__in=client_ids
+        ).values_list('client_id', flat=True))
+
+        results = []
+        new = {}
+        for client_id, item in parsed:
+            if client_id is None:
+                results.append({'client_id': item.get('client_id'), 'status': 'invalid',
+                                'errors': {'client_id': [{'message': 'A valid UUID is required.', 'code': 'invalid'}]}})
+                continue
+            if client_id in existing or client_id in new:
+                results.append({'client_id': str(client_id), 'status': 'duplicate'})
+                continue
+
+            form = PushupEntryForm(item, user=user)
+            if not form.is_valid():
+                results.append({'client_id': str(client_id), 'status': 'invalid', 'errors': form.errors.get_json_data()})
+                continue
+
+            entry = form.save(commit=False)
+            entry.user = user
+            entry.client_id = client_id
+            new[client_id] = entry
+            results.append({'client_id': str(client_id), 'status': 'created'})
+
+        # A concurrent retry of the same batch may have inserted some already
+        PushupEntry.objects.bulk_create(new.values(), ignore_conflicts=True)
+        refresh_summaries({(user.pk, entry.date.year, entry.date.month) for entry in new.values()})
+
+        stored = dict(PushupEntry.objects.filter(
+            user=user, client_id__in=client_ids
+        ).values_list('client_id', 'pk'))
+
+    for result in results:
+        if result['status'] != 'invalid':
+            result['id'] = stored.get(uuid.UUID(result['client_id']))
+    return results
+
+
+class DashboardSnapshot:
+    """
+    Everything the dashboard shows, gathered in at most three queries
+    (the first two are served from the month cache when it is warm):
+
+    1. the user's per-day totals for the month (stats, today, chart),
+    2. the user's rank and competitor count,
+    3. the user's recent entries together with the global activity feed.
+    """
+
+    RECENT_ENTRIES = 10
+    FEED_SIZE = FEED_SIZE
+
+    def __init__(self, user, now=None, _loaded=None):
+        self.user = user
+        self.now = now or timezone.localtime()
+        self.year = self.now.year
+        self.month = self.now.month
+        self.today = self.now.date()
+
+        stats, rank, rows = _loaded or (
+            cache.get_user_stats(user, self.year, self.month, with_series=True),
+            cache.get_user_rank(user, self.year, self.month),
+            list(self._entries_query(user)),
+        )
+
+        self.stats = stats
+        self.today_total = self.stats['daily'].get(self.today, 0)
+        self.chart_labels, self.chart_data = month_chart(self.year, self.month, self.stats['daily'])
+
+        self.user_rank, self.total_competitors = rank
+
+        self.recent_entries, self.activity_feed = self._split_entries(rows)
+
+    @classmethod
+    async def aload(cls, user, now=None):
+        """Build a snapshot with the three lookups awaited concurrently."""
+        now = now or timezone.localtime()
+        loaded = await asyncio.gather(
+            cache.aget_user_stats(user, now.year, now.month, with_series=True),
+            cache.aget_user_rank(user, now.year, now.month),
+            alist(cls._entries_query(user)),
+        )
+        return cls(user, now, _loaded=loaded)
+
+    @classmethod
+    def _entries_query(cls, user):
+        """
+        Fetch the user's latest entries and the global feed in one query.
+
+        Both lists are slices of a sort order, so the union of the two
+        sliced id subqueries contains every row either list needs; they are
+        split back apart by re-sorting in Python.
+        """
+        recent_order = ('-date', '-created_at', '-id')
+        feed_order = ('-created_at', '-id')
+
+        recent_ids = PushupEntry.objects.filter(user=user).order_by(*recent_order).values('pk')
+        feed_ids = PushupEntry.objects.order_by(*feed_order).values('pk')
+
+        return PushupEntry.objects.select_related('user').filter(
+            Q(pk__in=recent_ids[:cls.RECENT_ENTRIES]) | Q(pk__in=feed_ids[:cls.FEED_SIZE])
+        )
+
+    def _split_entries(self, rows):
+        own = [entry for entry in rows if entry.user_id == self.user.pk]
+        own.sort(key=lambda entry: (entry.date, entry.created_at, entry.pk), reverse=True)
+        rows.sort(key=lambda entry: (entry.created_at, entry.pk), reverse=True)
+
+        return own[:self.RECENT_ENTRIES], rows[:self.FEED_SIZE]
+
+    def context(self):
+        """Template context for ``tracker/dashboard.html``."""
+        return {
+            'stats': self.stats,
+            'today_total': self.today_total,
+            'recent_entries': self.recent_entries,
+            'user_rank': self.user_rank,
+            'total_competitors': self.total_competitors,
+            'current_month': self.now.strftime('%B %Y'),
+            'chart_labels': self.chart_labels,
+            'chart_data': self.chart_data,
+            'activity_feed': self.activity_feed,
+            'feed_cursor': encode_feed_cursor(self.activity_feed[0]) if self.activity_feed else '',
+            'feed_size': self.FEED_SIZE,
+            'feed_sse': getattr(settings, 'TRACKER_FEED_SSE', False),
+            'feed_poll_interval': getattr(settings, 'TRACKER_FEED_POLL_INTERVAL', 5),
+            'today': self.today,
+            'yesterday': self.today - timedelta(days=1),
+        }
@@ -0,0 +1,40 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import record_write
+from .models import Profile, PushupEntry
+from .timezones import forget_timezone
+
+
+def _record_after_commit(*states):
+    """Bump cache versions for ``(user_id, date)`` pairs once the write commits."""
+    states = [(user_id, day) for user_id, day in states if day]
+    # Bumping before commit would let a reader cache the old rows under the new version
+    transaction.on_commit(partial(
+        record_write,
+        [user_id for user_id, _ in states],
+        [(day.year, day.month) for _, day in states],
+    ))
+
+
+@receiver(post_save, sender=PushupEntry)
+def invalidate_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    _record_after_commit(
+        (instance.user_id, instance.date),
+        (previous[0], previous[1]) if previous else (None, None),
+    )
+
+
+@receiver(post_delete, sender=PushupEntry)
+def invalidate_on_delete(sender, instance, **kwargs):
+    _record_after_commit((instance.user_id, instance.date))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def forget_profile_timezone(sender, instance, **kwargs):
+    transaction.on_commit(partial(forget_timezone, instance.user_id))
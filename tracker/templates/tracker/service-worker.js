@@ -0,0 +1,268 @@
+{% load static %}// Service Worker for Pushup Counter PWA
+// Rendered by tracker.views.service_worker; the version below is the hash of
+// the deployed static files, so each deploy gets fresh caches.
+
+const VERSION = '{{ version }}';
+const STATIC_CACHE = 'pushup-static-' + VERSION;
+const PAGES_CACHE = 'pushup-pages-' + VERSION;
+const DATA_CACHE = 'pushup-data-' + VERSION;
+const CURRENT_CACHES = [STATIC_CACHE, PAGES_CACHE, DATA_CACHE];
+
+const STATIC_URL = '{{ static_url }}';
+const PRECACHE_URLS = {{ precache_urls|safe }};
+const NETWORK_TIMEOUT_MS = {{ network_timeout_ms }};
+
+importScripts('{% static "js/offline-queue.js" %}');
+
+// Hashed by ManifestStaticFilesStorage (name.0123456789ab.ext): never changes
+const HASHED_ASSET = /\.[0-9a-f]{12}\.[a-z0-9]+$/i;
+// Pinned CDN fallbacks for assets not yet vendored (tracker/assets.py) are immutable too
+const CDN_HOSTS = ['cdn.jsdelivr.net'];
+// Live data that must never come from a cache
+const NETWORK_ONLY = ['/api/feed/'];
+// Leaving the session invalidates everything cached for the user
+const SESSION_PATHS = ['/login/', '/logout/', '/signup/'];
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(
+    caches.open(STATIC_CACHE)
+      .then((cache) => cache.addAll(PRECACHE_URLS))
+      .catch((error) => {
+        console.log('[Service Worker] Precaching failed:', error);
+      })
+  );
+  // Activate immediately
+  self.skipWaiting();
+});
+
+// Drop the caches of previous builds
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys().then((cacheNames) => Promise.all(
+      cacheNames
+        .filter((cacheName) => !CURRENT_CACHES.includes(cacheName))
+        .map((cacheName) => caches.delete(cacheName))
+    ))
+  );
+  // Take control immediately
+  return self.clients.claim();
+});
+
+self.addEventListener('fetch', (event) => {
+  const request = event.request;
+
+  // Skip anything that is not http(s)
+  if (!request.url.startsWith('http')) {
+    return;
+  }
+
+  const url = new URL(request.url);
+  const sameOrigin = url.origin === self.location.origin;
+
+  // Checked before the GET-only filter: logging out (and in) is a form POST
+  if (sameOrigin && SESSION_PATHS.some((path) => url.pathname.startsWith(path))) {
+    event.waitUntil(clearUserCaches());
+    return;
+  }
+
+  // Other writes always go to the network
+  if (request.method !== 'GET') {
+    return;
+  }
+
+  if (sameOrigin && url.pathname.startsWith(STATIC_URL)) {
+    if (HASHED_ASSET.test(url.pathname)) {
+      event.respondWith(cacheFirst(request, STATIC_CACHE));
+    } else {
+      event.respondWith(staleWhileRevalidate(event, STATIC_CACHE));
+    }
+    return;
+  }
+
+  if (CDN_HOSTS.includes(url.hostname)) {
+    event.respondWith(cacheFirst(request, STATIC_CACHE));
+    return;
+  }
+
+  if (!sameOrigin || NETWORK_ONLY.some((path) => url.pathname.startsWith(path))) {
+    return;
+  }
+
+  if (url.pathname.startsWith('/api/')) {
+    event.respondWith(staleWhileRevalidate(event, DATA_CACHE));
+    return;
+  }
+
+  if (request.mode === 'navigate' || (request.headers.get('Accept') || '').includes('text/html')) {
+    event.respondWith(networkFirst(request, PAGES_CACHE, NETWORK_TIMEOUT_MS));
+  }
+});
+
+function cacheable(response) {
+  // Redirects (e.g. to the login page) must not be stored under the original URL
+  return response && response.ok && !response.redirected && response.type !== 'opaque';
+}
+
+// Immutable assets: serve from the cache, fetch (and keep) only on a miss
+function cacheFirst(request, cacheName) {
+  return caches.open(cacheName).then((cache) =>
+    cache.match(request).then((cached) => cached || fetch(request).then((response) => {
+      if (cacheable(response)) {
+        cache.put(request, response.clone());
+      }
+      return response;
+    }))
+  );
+}
+
+// Answer from the cache right away and refresh it in the background
+function staleWhileRevalidate(event, cacheName) {
+  return caches.open(cacheName).then((cache) =>
+    cache.match(event.request).then((cached) => {
+      const network = fetch(event.request).then((response) => {
+        if (cacheable(response)) {
+          cache.put(event.request, response.clone());
+        }
+        return response;
+      });
+      if (cached) {
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+      }
+      return network;
+    })
+  );
+}
+
+// Prefer a fresh page; fall back to the cached copy if the network is slow
+// or down, and to an offline notice if there is no copy either
+function networkFirst(request, cacheName, timeoutMs) {
+  return caches.open(cacheName).then((cache) => {
+    const network = fetch(request).then((response) => {
+      if (cacheable(response)) {
+        cache.put(request, response.clone());
+      }
+      return response;
+    });
+    // A late network failure is fine once the cached copy was served
+    network.catch(() => {});
+    const slow = new Promise((resolve) => setTimeout(resolve, timeoutMs))
+      .then(() => cache.match(request));
+
+    return Promise.race([network, slow])
+      .then((response) => response || network)
+      .catch(() => cache.match(request).then((cached) => cached || offlineResponse()));
+  });
+}
+
+function offlineResponse() {
+  return new Response(
+    '<html><body><h1>Offline</h1><p>No internet connection. Please try again later.</p></body></html>',
+    {
+      headers: { 'Content-Type': 'text/html' }
+    }
+  );
+}
+
+function clearUserCaches() {
+  return Promise.all([caches.delete(PAGES_CACHE), caches.delete(DATA_CACHE)]);
+}
+
+// Handle push notifications (for Android/Desktop)
+self.addEventListener('push', (event) => {
+  console.log('[Service Worker] Push received:', event);
+  
+  let data = {};
+  if (event.data) {
+    data = event.data.json();
+  }
+
+  const title = data.title || 'Pushup Counter';
+  const options = {
+    body: data.body || 'You have a new notification',
+    icon: '/static/icons/icon-192x192.png',
+    badge: '/static/icons/icon-96x96.png',
+    vibrate: [200, 100, 200],
+    data: {
+      url: data.url || '/',
+      dateOfArrival: Date.now(),
+    },
+    actions: [
+      {
+        action: 'open',
+        title: 'View',
+        icon: '/static/icons/icon-96x96.png'
+      },
+      {
+        action: 'close',
+        title: 'Close',
+        icon: '/static/icons/icon-96x96.png'
+      }
+    ],
+    tag: data.tag || 'default',
+    requireInteraction: false,
+  };
+
+  event.waitUntil(
+    self.registration.showNotification(title, options)
+  );
+});
+
+// Handle notification clicks
+self.addEventListener('notificationclick', (event) => {
+  console.log('[Service Worker] Notification click:', event);
+  
+  event.notification.close();
+
+  if (event.action === 'close') {
+    return;
+  }
+
+  // Open the app
+  const urlToOpen = event.notification.data.url || '/';
+  
+  event.waitUntil(
+    clients.matchAll({ type: 'window', includeUncontrolled: true })
+      .then((windowClients) => {
+        // Check if app is already open
+        for (let i = 0; i < windowClients.length; i++) {
+          const client = windowClients[i];
+          if (client.url === urlToOpen && 'focus' in client) {
+            return client.focus();
+          }
+        }
+        // App not open, open new window
+        if (clients.openWindow) {
+          return clients.openWindow(urlToOpen);
+        }
+      })
+  );
+});
+
+// Background sync: flush entries queued while offline (see js/offline-queue.js)
+self.addEventListener('sync', (event) => {
+  if (event.tag === PushupQueue.SYNC_TAG) {
+    event.waitUntil(syncPendingData());
+  }
+});
+
+// A page that comes back online asks the worker to flush when the browser
+// has no Background Sync support
+self.addEventListener('message', (event) => {
+  if (event.data && event.data.type === 'flush-queue') {
+    event.waitUntil(syncPendingData());
+  }
+});
+
+// Rejecting makes the browser retry the sync later
+function syncPendingData() {
+  return PushupQueue.flush().then((result) => {
+    if (result.created || result.invalid.length) {
+      // Cached pages and API responses now miss the new entries
+      clearUserCaches();
+    }
+    return self.clients.matchAll({ type: 'window' }).then((windowClients) => {
+      windowClients.forEach((client) => client.postMessage({ type: 'queue-synced', result: result }));
+    });
+  });
+}
@@ -0,0 +1,11 @@
+from django import template
+
+from tracker.assets import asset_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor(name):
+    """URL of a vendored third-party asset: ``{% vendor 'bootstrap.css' %}``."""
+    return asset_url(name)
@@ -1,4 +1,1246 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.core.cache import cache as django_cache
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.signals import template_rendered
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
+from .forms import PushupEntryForm
+from .models import PushupEntry, MonthlyTotal, DailyTotal, LeaderboardSnapshot, Profile, date_window
+from . import async_views, cache, checks, icons, views
+from .feed import FeedBroadcaster, recent_entries
+from .assets import VENDOR, is_vendored, static_path
+from .pagination import EstimatedCountPaginator, planner_estimate
+from .pwa import _built_version, static_version
+from .services import DashboardSnapshot
+from .timezones import local_today, timezone_name
+from .trends import user_trends
+
+
+class MonthlyTotalTests(TestCase):
+    """MonthlyTotal must match a fresh aggregate after every kind of write."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='pw')
+        self.other = User.objects.create_user('bob', password='pw')
+
+    def summary(self, user, year, month):
+        row = MonthlyTotal.objects.get(user=user, year=year, month=month)
+        return (row.total, row.days_active, row.best_day)
+
+    def test_create_updates_total_and_day_stats(self):
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=15)
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 2), count=30)
+
+        self.assertEqual(self.summary(self.user, 2025, 3), (65, 2, 35))
+
+    def test_edit_moves_entry_between_months(self):
+        entry = PushupEntry.objects.create(user=self.user, date=date(2025, 3, 31), count=40)
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=10)
+
+        entry = PushupEntry.objects.get(pk=entry.pk)
+        entry.date = date(2025, 4, 1)
+        entry.count = 25
+        entry.save()
+
+        self.assertEqual(self.summary(self.user, 2025, 3), (10, 1, 10))
+        self.assertEqual(self.summary(self.user, 2025, 4), (25, 1, 25))
+
+    def test_save_of_partially_loaded_entry(self):
+        entry = PushupEntry.objects.create(user=self.user, date=date(2025, 3, 5), count=40)
+
+        partial = PushupEntry.objects.only('notes').get(pk=entry.pk)
+        partial.notes = 'Felt strong'
+        partial.save()
+
+        self.assertEqual(self.summary(self.user, 2025, 3), (40, 1, 40))
+
+    def test_save_after_refresh_from_db(self):
+        entry = PushupEntry.objects.create(user=self.user, date=date(2025, 3, 5), count=50)
+        PushupEntry.objects.filter(pk=entry.pk).update(count=5)
+        MonthlyTotal.rebuild(2025, 3)
+
+        entry.refresh_from_db()
+        entry.count = 55
+        entry.save()
+
+        self.assertEqual(self.summary(self.user, 2025, 3), (55, 1, 55))
+
+    def test_save_of_stale_instance(self):
+        entry = PushupEntry.objects.create(user=self.user, date=date(2025, 3, 5), count=10)
+        stale = PushupEntry.objects.get(pk=entry.pk)
+        entry.count = 20
+        entry.save()
+
+        stale.count = 30
+        stale.save()
+
+        self.assertEqual(self.summary(self.user, 2025, 3), (30, 1, 30))
+
+    def test_totals_past_the_32_bit_range(self):
+        big = 2 ** 31 - 1
+        for day in (1, 1, 2):
+            PushupEntry.objects.create(user=self.user, date=date(2025, 3, day), count=big)
+
+        self.assertEqual(self.summary(self.user, 2025, 3), (3 * big, 2, 2 * big))
+        self.assertEqual(DailyTotal.objects.get(user=self.user, date=date(2025, 3, 1)).total, 2 * big)
+
+    def test_delete_removes_count(self):
+        entry = PushupEntry.objects.create(user=self.user, date=date(2025, 3, 5), count=40)
+        PushupEntry.objects.get(pk=entry.pk).delete()
+
+        self.assertEqual(self.summary(self.user, 2025, 3), (0, 0, 0))
+        self.assertFalse(PushupEntry.get_monthly_leaderboard(2025, 3))
+
+    def test_admin_bulk_delete_refreshes_summary(self):
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 2), count=30)
+        admin_user = User.objects.create_superuser('root', password='pw')
+        self.client.force_login(admin_user)
+
+        self.client.post(reverse('admin:tracker_pushupentry_changelist'), {
+            'action': 'delete_selected',
+            '_selected_action': list(PushupEntry.objects.filter(count=30).values_list('pk', flat=True)),
+            'post': 'yes',
+        })
+
+        self.assertEqual(self.summary(self.user, 2025, 3), (20, 1, 20))
+
+    def test_views_keep_summary_current(self):
+        self.client.login(username='alice', password='pw')
+        today = timezone.now().date()
+        self.client.post(reverse('add_entry'), {'date': today, 'count': 30})
+        entry = PushupEntry.objects.get(user=self.user)
+
+        self.client.post(reverse('edit_entry', args=[entry.pk]), {'date': today, 'count': 45})
+        self.assertEqual(PushupEntry.get_user_monthly_total(self.user, today.year, today.month), 45)
+
+        self.client.post(reverse('delete_entry', args=[entry.pk]))
+        self.assertEqual(PushupEntry.get_user_monthly_total(self.user, today.year, today.month), 0)
+
+    def test_leaderboard_reads_summary_rows(self):
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+        PushupEntry.objects.create(user=self.other, date=date(2025, 3, 2), count=50)
+
+        leaderboard = PushupEntry.get_monthly_leaderboard(2025, 3)
+        self.assertEqual([row.username for row in leaderboard], ['bob', 'alice'])
+        self.assertEqual(leaderboard.leader_total, 50)
+
+    def test_rebuild_command_matches_incremental_rows(self):
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 3), count=25)
+        PushupEntry.objects.create(user=self.other, date=date(2025, 4, 2), count=50)
+        expected = set(MonthlyTotal.objects.values_list('user', 'year', 'month', 'total', 'days_active', 'best_day'))
+
+        MonthlyTotal.objects.all().delete()
+        call_command('rebuild_monthly_totals', stdout=StringIO())
+
+        actual = set(MonthlyTotal.objects.values_list('user', 'year', 'month', 'total', 'days_active', 'best_day'))
+        self.assertEqual(actual, expected)
+
+    def test_rebuild_command_invalidates_cached_pages(self):
+        django_cache.clear()
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+        self.assertEqual(cache.get_user_stats(self.user, 2025, 3)['total'], 20)
+        PushupEntry.objects.filter(user=self.user).update(count=35)
+
+        call_command('rebuild_monthly_totals', '--year', '2025', '--month', '3', stdout=StringIO())
+
+        self.assertEqual(cache.get_user_stats(self.user, 2025, 3)['total'], 35)
+        self.assertEqual(cache.get_leaderboard(2025, 3).leader_total, 35)
+
+
+class DailyTotalTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+
+    def days(self):
+        return list(DailyTotal.objects.filter(user=self.user).values_list('date', 'total'))
+
+    def test_writes_keep_one_row_per_active_day(self):
+        first = PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=15)
+        self.assertEqual(self.days(), [(date(2025, 3, 1), 35)])
+
+        first = PushupEntry.objects.get(pk=first.pk)
+        first.date = date(2025, 3, 2)
+        first.save()
+        self.assertEqual(self.days(), [(date(2025, 3, 1), 15), (date(2025, 3, 2), 20)])
+
+        PushupEntry.objects.get(pk=first.pk).delete()
+        self.assertEqual(self.days(), [(date(2025, 3, 1), 15)])
+
+        DailyTotal.objects.all().delete()
+        MonthlyTotal.rebuild()
+        self.assertEqual(self.days(), [(date(2025, 3, 1), 15)])
+
+    def test_trends_from_the_rollup(self):
+        today = date(2025, 3, 10)
+        for day, count in [(date(2024, 12, 30), 5), (date(2025, 3, 1), 10), (date(2025, 3, 2), 10),
+                           (date(2025, 3, 3), 10), (date(2025, 3, 8), 1), (date(2025, 3, 9), 2)]:
+            PushupEntry.objects.create(user=self.user, date=day, count=count)
+
+        with self.assertNumQueries(1):
+            trends = DailyTotal.trends(self.user, today)
+
+        # Nothing logged yet today does not break the streak
+        self.assertEqual((trends['current_streak'], trends['longest_streak']), (2, 3))
+        self.assertEqual((trends['total'], trends['days_active']), (38, 6))
+        self.assertEqual(trends['rolling'], {7: round(3 / 7, 1), 30: round(33 / 30, 1)})
+        self.assertEqual(trends['weekly'][-2:], [(date(2025, 3, 3), 13), (date(2025, 3, 10), 0)])
+        self.assertEqual(trends['monthly'][-3:], [(date(2025, 1, 1), 0), (date(2025, 2, 1), 0), (date(2025, 3, 1), 33)])
+        self.assertEqual(trends['yearly'], [(2024, 5), (2025, 33)])
+        self.assertEqual(user_trends([], today)['current_streak'], 0)
+        self.assertEqual(user_trends([(date(2025, 3, 7), 1)], today)['current_streak'], 0)
+
+    def test_trends_api(self):
+        PushupEntry.objects.create(user=self.user, date=timezone.localdate(), count=12)
+        self.client.login(username='alice', password='pw')
+
+        response = self.client.get(reverse('api_my_trends'))
+        payload = response.json()
+        self.assertEqual((payload['current_streak'], payload['total']), (1, 12))
+        self.assertEqual(payload['rolling']['7'], round(12 / 7, 1))
+        self.assertEqual(self.client.get(reverse('api_my_trends'), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+
+class EntryAdminTests(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser('root', password='pw')
+        self.user = User.objects.create_user('alice', password='pw')
+        self.other = User.objects.create_user('bob', password='pw')
+        self.entries = [
+            PushupEntry.objects.create(user=self.user, date=date(2025, 3, 31), count=20, notes='morning'),
+            PushupEntry.objects.create(user=self.user, date=date(2025, 3, 30), count=10),
+            PushupEntry.objects.create(user=self.other, date=date(2025, 3, 31), count=40),
+        ]
+        self.client.force_login(self.admin_user)
+        self.url = reverse('admin:tracker_pushupentry_changelist')
+
+    def action(self, name, entries, **extra):
+        return self.client.post(self.url, {
+            'action': name, '_selected_action': [entry.pk for entry in entries], **extra,
+        })
+
+    def test_changelist_filters_and_searches_without_scans(self):
+        response = self.client.get(self.url, {'user': self.other.pk})
+        self.assertEqual([entry.user for entry in response.context['cl'].result_list], [self.other])
+        self.assertContains(response, 'data-user-filter')
+        self.assertContains(response, 'js/admin-user-filter.js')
+        self.assertNotContains(response, '?user__id__exact=')
+        lookup = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'tracker', 'model_name': 'pushupentry', 'field_name': 'user', 'term': 'ali',
+        })
+        self.assertEqual([item['text'] for item in lookup.json()['results']], ['alice'])
+
+        response = self.client.get(self.url, {'q': 'morning'})
+        self.assertEqual(len(response.context['cl'].result_list), 0)
+        response = self.client.get(self.url, {'q': str(self.entries[1].pk)})
+        self.assertEqual(list(response.context['cl'].result_list), [self.entries[1]])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('LIKE', sql)
+        # One count for the page, none for the whole table
+        self.assertEqual(sql.count('COUNT(*)'), 1)
+
+    def test_bulk_actions_are_set_based_and_refresh_rollups(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.action('move_to_next_day', self.entries[:2])
+        # One UPDATE; the entries themselves are never loaded
+        sql = [query['sql'] for query in queries]
+        self.assertEqual(sum(query.startswith('UPDATE "tracker_pushupentry"') for query in sql), 1)
+        self.assertFalse(any('"tracker_pushupentry"."notes"' in query for query in sql))
+        self.assertEqual(self.user_days(), [(date(2025, 3, 31), 10), (date(2025, 4, 1), 20)])
+        self.assertEqual(PushupEntry.get_user_monthly_total(self.user, 2025, 4), 20)
+
+        user_version = cache.scope_version(cache.user_scope(self.user.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.action('clear_notes', self.entries)
+        self.assertFalse(PushupEntry.objects.filter(notes__isnull=False).exists())
+        self.assertNotEqual(cache.scope_version(cache.user_scope(self.user.pk)), user_version)
+
+        response = self.action('delete_selected', self.entries[1:])
+        self.assertContains(response, '2 pushup entries')
+        with CaptureQueriesContext(connection) as queries:
+            self.action('delete_selected', self.entries[1:], post='yes')
+        self.assertFalse(any('"tracker_pushupentry"."notes"' in query['sql'] for query in queries))
+        # Logged like the stock action, one entry per deleted row
+        logged = LogEntry.objects.filter(action_flag=DELETION).values_list('object_id', 'object_repr')
+        self.assertEqual(sorted(logged), [
+            (str(self.entries[1].pk), 'alice - 10 pushups on 2025-03-31'),
+            (str(self.entries[2].pk), 'bob - 40 pushups on 2025-03-31'),
+        ])
+        self.assertEqual(list(PushupEntry.objects.all()), [self.entries[0]])
+        self.assertEqual(PushupEntry.get_user_monthly_total(self.other, 2025, 3), 0)
+        self.assertEqual(self.user_days(), [(date(2025, 4, 1), 20)])
+
+    def user_days(self):
+        return list(DailyTotal.objects.filter(user=self.user).values_list('date', 'total'))
+
+    def test_paginator_counts_exactly_off_postgresql(self):
+        paginator = EstimatedCountPaginator(PushupEntry.objects.all(), 2)
+        self.assertIsNone(planner_estimate(PushupEntry.objects.all()))
+        self.assertEqual((paginator.count, paginator.num_pages), (3, 2))
+
+
+class UserRankTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(name, password='pw') for name in ('ann', 'ben', 'cat', 'dan')]
+        for user, count in zip(self.users, (50, 80, 50)):
+            PushupEntry.objects.create(user=user, date=date(2025, 3, 1), count=count)
+
+    def test_rank_counts_users_ahead(self):
+        ann, ben, cat, dan = self.users
+        self.assertEqual(PushupEntry.get_user_rank(ben, 2025, 3), (1, 3))
+        # Ties share the rank below the users ahead of them
+        self.assertEqual(PushupEntry.get_user_rank(ann, 2025, 3), (2, 3))
+        self.assertEqual(PushupEntry.get_user_rank(cat, 2025, 3), (2, 3))
+
+    def test_user_without_entries_is_unranked(self):
+        self.assertEqual(PushupEntry.get_user_rank(self.users[3], 2025, 3), (None, 3))
+        self.assertEqual(PushupEntry.get_user_rank(self.users[0], 2025, 4), (None, 0))
+
+    def test_rank_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            PushupEntry.get_user_rank(self.users[0], 2025, 3)
+
+
+class MonthWindowTests(TestCase):
+    def test_month_and_year_windows(self):
+        self.assertEqual(date_window(2025, 3), (date(2025, 3, 1), date(2025, 4, 1)))
+        self.assertEqual(date_window(2025, 12), (date(2025, 12, 1), date(2026, 1, 1)))
+        self.assertEqual(date_window('2024'), (date(2024, 1, 1), date(2025, 1, 1)))
+
+    def test_monthly_aggregate_uses_covering_index(self):
+        user = User.objects.create_user('alice', password='pw')
+        PushupEntry.objects.create(user=user, date=date(2025, 3, 1), count=10)
+        queryset = MonthlyTotal.daily_totals(2025, 3)
+
+        if connection.vendor == 'sqlite':
+            plan = queryset.explain()
+            self.assertIn('USING COVERING INDEX tracker_pus_date_cover_idx', plan)
+        elif connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # Tiny test tables always favour a seq scan otherwise
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+            self.assertIn('Index Only Scan using tracker_pus_date_cover_idx', plan)
+        else:
+            self.skipTest(f'No plan assertion for {connection.vendor}')
+
+        self.assertNotIn('extract', str(queryset.query).lower())
+
+
+class UserStatsTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        for day, count in ((1, 20), (1, 15), (2, 30), (9, 5)):
+            PushupEntry.objects.create(user=self.user, date=date(2025, 3, day), count=count)
+        PushupEntry.objects.create(user=self.user, date=date(2025, 4, 1), count=99)
+
+    def test_stats_in_one_query(self):
+        with self.assertNumQueries(1):
+            stats = PushupEntry.get_user_stats(self.user, 2025, 3)
+        self.assertEqual(stats, {'total': 70, 'average': 23.3, 'best_day': 35, 'days_active': 3})
+
+    def test_series_comes_from_the_same_query(self):
+        with self.assertNumQueries(1):
+            stats = PushupEntry.get_user_stats(self.user, 2025, 3, with_series=True)
+        self.assertEqual(stats['total'], 70)
+        self.assertEqual(stats['best_day'], 35)
+        self.assertEqual(stats['daily'], {date(2025, 3, 1): 35, date(2025, 3, 2): 30, date(2025, 3, 9): 5})
+
+    def test_empty_month(self):
+        expected = {'total': 0, 'average': 0, 'best_day': 0, 'days_active': 0}
+        self.assertEqual(PushupEntry.get_user_stats(self.user, 2025, 5), expected)
+        self.assertEqual(PushupEntry.get_user_stats(self.user, 2025, 5, with_series=True), {**expected, 'daily': {}})
+
+    def test_pages_render_chart(self):
+        self.client.login(username='alice', password='pw')
+        for url in (reverse('dashboard'), reverse('profile')):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context['chart_data']), len(response.context['chart_labels']))
+
+
+class DashboardSnapshotTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.other = User.objects.create_user('bob', password='pw')
+        today = timezone.now().date()
+        for count in range(1, 13):
+            PushupEntry.objects.create(user=self.user, date=today, count=count)
+        for count in range(1, 20):
+            PushupEntry.objects.create(user=self.other, date=today, count=count)
+
+    def test_snapshot_matches_separate_queries(self):
+        snapshot = DashboardSnapshot(self.user)
+
+        self.assertEqual(snapshot.today_total, sum(range(1, 13)))
+        self.assertEqual((snapshot.user_rank, snapshot.total_competitors), (2, 2))
+        self.assertEqual(snapshot.recent_entries, list(PushupEntry.objects.filter(user=self.user)[:10]))
+        self.assertEqual(
+            snapshot.activity_feed,
+            list(PushupEntry.objects.order_by('-created_at', '-id')[:15])
+        )
+
+    def test_dashboard_query_budget(self):
+        self.client.login(username='alice', password='pw')
+        # Session + user lookups, the user's timezone (cached from then on),
+        # then the snapshot's three queries
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+        # Stats and rank now come from the cache
+        with self.assertNumQueries(3):
+            self.client.get(reverse('dashboard'))
+
+
+class UserTimezoneTests(TestCase):
+    # 12:00 UTC on 31 March is already 1 April in Kiritimati (UTC+14)
+    NOW = datetime(2025, 3, 31, 12, 0, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        Profile.objects.create(user=self.user, timezone='Pacific/Kiritimati')
+        patcher = mock.patch('django.utils.timezone.now', return_value=self.NOW)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_today_follows_the_users_calendar(self):
+        self.assertEqual(local_today(self.user), date(2025, 4, 1))
+        self.assertEqual(local_today(User.objects.create_user('bob')), date(2025, 3, 31))
+
+        form = PushupEntryForm(data={'date': '2025-04-01', 'count': 5}, user=self.user)
+        self.assertTrue(form.is_valid(), form.errors)
+        form = PushupEntryForm(data={'date': '2025-03-31', 'count': 5}, user=self.user)
+        self.assertFalse(form.is_valid())
+
+    def test_dashboard_buckets_by_local_day_and_month(self):
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 31), count=7)
+        PushupEntry.objects.create(user=self.user, date=date(2025, 4, 1), count=11)
+        self.client.login(username='alice', password='pw')
+
+        context = self.client.get(reverse('dashboard')).context
+        self.assertEqual(context['today'], date(2025, 4, 1))
+        self.assertEqual(context['today_total'], 11)
+        self.assertEqual(context['stats']['total'], 11)
+
+    def test_month_closes_once_it_has_ended_everywhere(self):
+        # Still 31 March in UTC-12 until 12:00 UTC on 1 April
+        self.assertFalse(LeaderboardSnapshot.is_closed(2025, 3))
+        with mock.patch('django.utils.timezone.now', return_value=self.NOW + timedelta(days=1)):
+            self.assertTrue(LeaderboardSnapshot.is_closed(2025, 3))
+
+    def test_settings_change_the_cached_timezone(self):
+        self.assertEqual(timezone_name(self.user.pk), 'Pacific/Kiritimati')
+        self.client.login(username='alice', password='pw')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('account_settings'), {'timezone': 'America/New_York'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(timezone_name(self.user.pk), 'America/New_York')
+
+        response = self.client.post(reverse('account_settings'), {'timezone': 'Mars/Olympus_Mons'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Profile.objects.get(user=self.user).timezone, 'America/New_York')
+
+    def test_cached_timezone_expires(self):
+        self.assertEqual(timezone_name(self.user.pk), 'Pacific/Kiritimati')
+        # A change this process's cache never heard of (another worker's locmem)
+        Profile.objects.filter(user=self.user).update(timezone='America/New_York')
+        self.assertEqual(timezone_name(self.user.pk), 'Pacific/Kiritimati')
+
+        with override_settings(TRACKER_TIMEZONE_CACHE_TIMEOUT=1):
+            django_cache.clear()
+            timezone_name(self.user.pk)
+            Profile.objects.filter(user=self.user).update(timezone='Europe/Paris')
+            with mock.patch('django.core.cache.backends.locmem.time.time', return_value=time.time() + 2):
+                self.assertEqual(timezone_name(self.user.pk), 'Europe/Paris')
+
+    def test_signup_stores_the_browser_timezone(self):
+        data = {'email': 'c@example.com', 'password1': 'a-Long-pass-42', 'password2': 'a-Long-pass-42'}
+        self.client.post(reverse('signup'), {**data, 'username': 'carol', 'timezone': 'Asia/Tokyo'})
+        self.client.logout()
+        self.client.post(reverse('signup'), {**data, 'username': 'dave', 'timezone': 'Nowhere/Special'})
+
+        self.assertEqual(Profile.objects.get(user__username='carol').timezone, 'Asia/Tokyo')
+        self.assertFalse(Profile.objects.filter(user__username='dave').exists())
+        self.assertEqual(timezone_name(User.objects.get(username='dave').pk), 'UTC')
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.other = User.objects.create_user('bob', password='pw')
+        self.third = User.objects.create_user('carol', password='pw', first_name='Carol')
+        today = timezone.now().date()
+        PushupEntry.objects.create(user=self.user, date=today, count=30)
+        PushupEntry.objects.create(user=self.other, date=today, count=30)
+        PushupEntry.objects.create(user=self.third, date=today, count=10)
+        self.today = today
+
+    def test_result_is_precomputed(self):
+        board = PushupEntry.get_monthly_leaderboard(self.today.year, self.today.month)
+
+        self.assertEqual([(row.rank, row.username) for row in board], [(1, 'alice'), (1, 'bob'), (3, 'carol')])
+        self.assertEqual((board.competitor_count, board.leader_total, board.active_users), (3, 30, 3))
+        self.assertEqual(board.rank_of(self.third.pk), 3)
+        self.assertEqual(board.rows[2].display_name, 'Carol')
+
+    def test_page_query_budgets(self):
+        self.client.login(username='alice', password='pw')
+        # Session + user + timezone lookups, then a single leaderboard query
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('leaderboard'))
+        self.assertContains(response, '@carol')
+        with self.assertNumQueries(2):
+            self.client.get(reverse('leaderboard'))
+
+        # Stats, rank, recent entries and the whole-history trends
+        with self.assertNumQueries(6):
+            self.client.get(reverse('profile'))
+        # Plus the profile user and their timezone; both users' month totals
+        # come from one query
+        with self.assertNumQueries(8):
+            self.client.get(reverse('user_profile', args=['bob']))
+
+
+class ComparisonTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.alice = User.objects.create_user('alice', password='pw')
+        self.bob = User.objects.create_user('bob', password='pw', first_name='Bob')
+        self.carol = User.objects.create_user('carol', password='pw')
+        for user, day, count in [
+            (self.alice, 1, 10), (self.alice, 1, 5), (self.alice, 3, 20),
+            (self.bob, 2, 30), (self.bob, 3, 1),
+            (self.carol, 3, 4), (self.alice, 31, 50),
+        ]:
+            PushupEntry.objects.create(user=user, date=date(2025, 3, day), count=count)
+        PushupEntry.objects.create(user=self.bob, date=date(2025, 4, 1), count=99)
+
+    def test_users_are_compared_in_one_query(self):
+        with self.assertNumQueries(1):
+            comparison = PushupEntry.compare_users([self.alice, self.bob, self.carol], 2025, 3)
+
+        alice, bob, carol = comparison
+        self.assertEqual(len(comparison.labels), 31)
+        self.assertEqual(alice.daily[:3], (15, 0, 20))
+        self.assertEqual(bob.cumulative[:3], (0, 30, 31))
+        self.assertEqual(bob.gap[:3], (-15, 15, -4))
+        self.assertEqual(alice.gap, (0,) * 31)
+        self.assertEqual(bob.display_name, 'Bob')
+        self.assertEqual(carol.stats(), {'total': 4, 'average': 4.0, 'best_day': 4, 'days_active': 1})
+        self.assertEqual(alice.stats(), PushupEntry.get_user_stats(self.alice, 2025, 3))
+
+    def test_api_compares_the_requester_with_others(self):
+        self.client.login(username='alice', password='pw')
+        url = reverse('api_compare') + '?year=2025&month=3&users=bob,carol,bob,alice'
+        payload = self.client.get(url).json()
+
+        self.assertEqual([row[1] for row in payload['rows']], ['alice', 'bob', 'carol'])
+        self.assertEqual([row[3] for row in payload['rows']], [85, 31, 4])
+        self.assertEqual(payload['rows'][1][8][-1], 31 - 85)
+
+        self.assertEqual(self.client.get(reverse('api_compare')).status_code, 400)
+        response = self.client.get(reverse('api_compare') + '?users=bob,nobody')
+        self.assertEqual((response.status_code, response.json()['users']), (404, ['nobody']))
+        with mock.patch('tracker.api.COMPARE_LIMIT', 1):
+            self.assertEqual(self.client.get(reverse('api_compare') + '?users=bob,carol').status_code, 400)
+
+
+class LeaderboardSnapshotTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.other = User.objects.create_user('bob', password='pw')
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+        PushupEntry.objects.create(user=self.other, date=date(2025, 3, 2), count=50)
+
+    def test_closed_month_is_frozen_on_first_read(self):
+        board = LeaderboardSnapshot.get_leaderboard(2025, 3)
+        self.assertEqual(LeaderboardSnapshot.objects.get().rows[0], [self.other.pk, 'bob', '', '', 50])
+
+        with self.assertNumQueries(1) as queries:
+            frozen = LeaderboardSnapshot.get_leaderboard(2025, 3)
+        self.assertNotIn('tracker_monthlytotal', queries[0]['sql'])
+        self.assertEqual(frozen, board)
+
+    def test_backfill_refreezes_only_that_month(self):
+        call_command('freeze_leaderboards', stdout=StringIO())
+        PushupEntry.objects.create(user=self.user, date=date(2025, 4, 1), count=5)
+        call_command('freeze_leaderboards', stdout=StringIO())
+        april = LeaderboardSnapshot.objects.get(month=4).frozen_at
+
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 9), count=40)
+
+        board = LeaderboardSnapshot.get_leaderboard(2025, 3)
+        self.assertEqual([(row.username, row.total) for row in board], [('alice', 60), ('bob', 50)])
+        self.assertEqual(LeaderboardSnapshot.objects.get(month=4).frozen_at, april)
+
+    def test_current_month_stays_live(self):
+        today = timezone.now().date()
+        PushupEntry.objects.create(user=self.user, date=today, count=5)
+        self.assertEqual(LeaderboardSnapshot.get_leaderboard(today.year, today.month).leader_total, 5)
+        call_command('freeze_leaderboards', stdout=StringIO())
+        self.assertFalse(LeaderboardSnapshot.objects.filter(year=today.year, month=today.month).exists())
+
+    def test_month_navigation(self):
+        self.client.login(username='alice', password='pw')
+        response = self.client.get(reverse('leaderboard'), {'year': '2025', 'month': '3'})
+        self.assertContains(response, 'Final standings for March 2025')
+        self.assertEqual(response.context['previous_month'], (2025, 2))
+        self.assertEqual(response.context['next_month'], (2025, 4))
+        self.assertEqual([row.username for row in response.context['leaderboard']], ['bob', 'alice'])
+
+        self.assertIsNone(self.client.get(reverse('leaderboard')).context['next_month'])
+        future = timezone.now().year + 1
+        self.assertEqual(self.client.get(reverse('leaderboard'), {'year': future, 'month': 1}).status_code, 404)
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+
+    def check_invalidation(self):
+        cache.reset_cache_stats()
+        self.assertEqual(cache.get_user_stats(self.user, 2025, 3)['total'], 20)
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get_user_stats(self.user, 2025, 3)['total'], 20)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PushupEntry.objects.create(user=self.user, date=date(2025, 3, 2), count=5)
+
+        self.assertEqual(cache.get_user_stats(self.user, 2025, 3)['total'], 25)
+        self.assertEqual(cache.cache_stats(), {'hits': 1, 'misses': 2, 'hit_ratio': 0.333})
+
+    def test_locmem_backend(self):
+        self.check_invalidation()
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={'default': backend}):
+                self.check_invalidation()
+
+    @skipUnless(os.environ.get('TRACKER_TEST_REDIS_URL'), 'set TRACKER_TEST_REDIS_URL to a scratch Redis database')
+    def test_redis_backend(self):
+        backend = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': os.environ['TRACKER_TEST_REDIS_URL']}
+        with override_settings(CACHES={'default': backend}):
+            django_cache.clear()
+            self.check_invalidation()
+
+    def test_bumps_never_reuse_a_version(self):
+        scope = cache.month_scope(2025, 3)
+        seen = {cache.scope_version(scope)}
+        # A clock that stands still (or is coarse) still yields new versions
+        with mock.patch('tracker.cache.time.time_ns', return_value=1):
+            for _ in range(3):
+                cache.bump_scope(scope)
+                seen.add(cache.scope_version(scope))
+        self.assertEqual(len(seen), 4)
+
+    def test_moving_an_entry_invalidates_both_months(self):
+        cache.get_leaderboard(2025, 3)
+        cache.get_leaderboard(2025, 4)
+
+        entry = PushupEntry.objects.get(user=self.user)
+        entry.date = date(2025, 4, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.save()
+
+        self.assertEqual(len(cache.get_leaderboard(2025, 3)), 0)
+        self.assertEqual(cache.get_leaderboard(2025, 4).leader_total, 20)
+
+    def test_other_months_stay_cached(self):
+        cache.get_leaderboard(2025, 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            PushupEntry.objects.create(user=self.user, date=date(2025, 5, 1), count=5)
+
+        with self.assertNumQueries(0):
+            cache.get_leaderboard(2025, 3)
+
+
+class SettingsTests(SimpleTestCase):
+    def setting(self, expression, module='pushup_counter.settings', argv=(), **env):
+        """Evaluate ``expression`` on the settings loaded in a fresh process (or return its error)."""
+        inherited = {key: value for key, value in os.environ.items() if not key.startswith(('DJANGO_', 'DB_'))}
+        env = {**inherited, 'DJANGO_SETTINGS_MODULE': module, **env}
+        code = f'import sys; sys.argv[1:] = {list(argv)!r}; from django.conf import settings; print({expression})'
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True)
+        return result.stdout.strip() or result.stderr.strip().splitlines()[-1]
+
+    def cache_backend(self, **env):
+        return self.setting('settings.CACHES["default"]["BACKEND"]', **env)
+
+    def test_shared_cache_outside_debug(self):
+        self.assertIn('FileBasedCache', self.cache_backend(DJANGO_DEBUG='False', WEB_CONCURRENCY='4'))
+        self.assertIn('LocMemCache', self.cache_backend(DJANGO_DEBUG='True', WEB_CONCURRENCY='1'))
+
+    def test_locmem_refused_for_several_workers(self):
+        error = self.cache_backend(DJANGO_DEBUG='True', DJANGO_CACHE_BACKEND='locmem', WEB_CONCURRENCY='3')
+        self.assertIn('ImproperlyConfigured', error)
+
+    def test_migrate_runs_without_statement_timeout(self):
+        options = 'settings.DATABASES["default"]["OPTIONS"].get("options")'
+        production = 'pushup_counter.settings_production'
+        self.assertEqual(self.setting(options, production, ['runserver']), '-c statement_timeout=30000')
+        self.assertEqual(self.setting(options, production, ['migrate']), 'None')
+
+
+class HistoryPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='pw')
+        for day in range(1, 29):
+            for count in (10, 20):
+                PushupEntry.objects.create(user=self.user, date=date(2025, 2, day), count=count)
+        PushupEntry.objects.create(user=self.user, date=date(2024, 2, 1), count=5)
+        self.client.login(username='alice', password='pw')
+
+    def walk(self, params):
+        seen, cursor = [], None
+        while True:
+            response = self.client.get(reverse('history'), {**params, **({'after': cursor} if cursor else {})})
+            seen.extend(entry.pk for entry in response.context['entries'])
+            cursor = response.context['next_cursor']
+            if not cursor:
+                return seen
+
+    def test_pages_cover_every_entry_in_order(self):
+        with mock.patch('tracker.views.HISTORY_PAGE_SIZE', 7):
+            seen = self.walk({})
+
+        expected = list(PushupEntry.objects.filter(user=self.user).order_by('-date', '-created_at', '-id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_filters_use_date_ranges(self):
+        self.assertEqual(len(self.walk({'year': '2025', 'month': '2'})), 56)
+        self.assertEqual(len(self.walk({'year': '2024'})), 1)
+        self.assertEqual(len(self.walk({'month': '2'})), 57)
+
+    def test_bad_parameters_fall_back_to_first_page(self):
+        response = self.client.get(reverse('history'), {'year': 'abc', 'month': '13', 'after': '%%%'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['entries']), 50)
+
+    def test_page_queries_do_not_grow(self):
+        # Session, user, the page and the year dropdown; no COUNT queries
+        with self.assertNumQueries(4):
+            self.client.get(reverse('history'))
+
+
+class ImportPushupsTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=10)
+
+    def run_import(self, suffix, content, *args):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, encoding='utf-8', delete=False) as handle:
+            handle.write(content)
+        self.addCleanup(os.unlink, handle.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_pushups', handle.name, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_in_batches_refreshes_summaries(self):
+        cache.get_leaderboard(2025, 3)
+        # The command runs in autocommit; here the test transaction defers it
+        with self.captureOnCommitCallbacks(execute=True):
+            out, err = self.run_import('.csv', (
+                'username,date,count,notes\n'
+                'alice,2025-03-01,20,morning\n'
+                'alice,2025-03-02,30,\n'
+                'nobody,2025-03-02,30,\n'
+                'alice,2025-03-03,0,\n'
+                'alice,2025-04-01,5,\n'
+            ), '--batch-size', '2')
+
+        self.assertIn('Imported 3 entries', out)
+        self.assertIn('2 invalid rows skipped', out)
+        self.assertIn('Row 4: Unknown user "nobody".', err)
+        self.assertIn('Row 5: Count must be at least 1.', err)
+        self.assertEqual(MonthlyTotal.objects.get(user=self.user, year=2025, month=3).total, 60)
+        self.assertEqual(cache.get_leaderboard(2025, 3).leader_total, 60)
+
+    def test_csv_with_byte_order_mark(self):
+        # As saved by spreadsheet tools ("CSV UTF-8")
+        out, err = self.run_import('.csv', '\ufeffusername,date,count\nalice,2025-03-02,25\n')
+
+        self.assertIn('Imported 1 entries', out)
+        self.assertEqual(err, '')
+        self.assertEqual(PushupEntry.get_user_monthly_total(self.user, 2025, 3), 35)
+
+    def test_ndjson_and_dry_run(self):
+        content = '{"username": "alice", "date": "2025-05-01", "count": 12}\n\n'
+        self.run_import('.ndjson', content, '--dry-run')
+        self.assertFalse(PushupEntry.objects.filter(date=date(2025, 5, 1)).exists())
+
+        self.run_import('.ndjson', content)
+        self.assertEqual(PushupEntry.get_user_monthly_total(self.user, 2025, 5), 12)
+
+    def test_failure_partway_refreshes_committed_batches(self):
+        cache.get_user_stats(self.user, 2025, 6)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaisesMessage(CommandError, 'Could not parse'):
+                self.run_import('.ndjson', (
+                    '{"username": "alice", "date": "2025-06-01", "count": 12}\n'
+                    '{"username": "alice", "date": "2025-06-02", "count": 8}\n'
+                    '{"username": "alice", "date": \n'
+                ), '--batch-size', '1')
+
+        self.assertEqual(MonthlyTotal.objects.get(user=self.user, year=2025, month=6).total, 20)
+        self.assertEqual(DailyTotal.objects.filter(user=self.user, date__month=6).count(), 2)
+        self.assertEqual(cache.get_user_stats(self.user, 2025, 6)['total'], 20)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.other = User.objects.create_user('bob', password='pw')
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20, notes='a, "quoted" note')
+        PushupEntry.objects.create(user=self.user, date=date(2024, 3, 1), count=10)
+        PushupEntry.objects.create(user=self.other, date=date(2025, 3, 2), count=50)
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_history_csv_only_has_own_filtered_entries(self):
+        self.client.login(username='alice', password='pw')
+        response = self.client.get(reverse('export_history', args=['csv']), {'year': '2025'})
+
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('pushups-alice-2025.csv', response['Content-Disposition'])
+        rows = list(csv.reader(StringIO(self.content(response))))
+        self.assertEqual(rows[0], ['date', 'count', 'notes', 'created_at'])
+        self.assertEqual([row[:3] for row in rows[1:]], [['2025-03-01', '20', 'a, "quoted" note']])
+
+    def test_leaderboard_ndjson_for_past_month(self):
+        self.client.login(username='alice', password='pw')
+        response = self.client.get(reverse('export_leaderboard', args=['ndjson']), {'year': '2025', 'month': '3'})
+
+        lines = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([(line['rank'], line['username'], line['total_pushups']) for line in lines],
+                         [(1, 'bob', 50), (2, 'alice', 20)])
+        self.assertEqual(self.client.get(reverse('export_leaderboard', args=['xml'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('export_leaderboard', args=['csv']), {'month': '13'}).status_code, 404)
+
+    def test_admin_export_is_staff_only(self):
+        url = reverse('admin:tracker_pushupentry_export', args=['csv'])
+        self.client.login(username='alice', password='pw')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(User.objects.create_superuser('root', password='pw'))
+        body = self.content(self.client.get(url))
+        self.assertEqual(len(body.strip().splitlines()), 4)
+        self.assertIn('bob', body)
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw', first_name='Alice')
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+        self.client.login(username='alice', password='pw')
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api_leaderboard')).status_code, 401)
+
+    def test_payloads(self):
+        params = {'year': '2025', 'month': '3'}
+        leaderboard = self.client.get(reverse('api_leaderboard'), params).json()
+        self.assertEqual(leaderboard['rows'], [[1, self.user.pk, 'alice', 'Alice', 20]])
+
+        stats = self.client.get(reverse('api_my_stats'), params).json()
+        self.assertEqual((stats['total'], stats['rank'], stats['competitors']), (20, 1, 1))
+
+        chart = self.client.get(reverse('api_my_chart'), params).json()
+        self.assertEqual((len(chart['labels']), chart['data'][0]), (31, 20))
+
+        self.assertEqual(len(self.client.get(reverse('api_feed')).json()['rows']), 1)
+        self.assertEqual(self.client.get(reverse('api_history')).json()['next'], None)
+
+    def test_conditional_get_returns_304_until_the_month_changes(self):
+        url = reverse('api_leaderboard')
+        params = {'year': '2025', 'month': '3'}
+        response = self.client.get(url, params)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+
+        # Session and user lookups only; the ETag comes from the cache
+        with self.assertNumQueries(2):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PushupEntry.objects.create(user=self.user, date=date(2025, 3, 2), count=5)
+
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['rows'][0][-1], 25)
+
+
+class ActivityFeedTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 1), count=20)
+        self.client.login(username='alice', password='pw')
+
+    def test_after_cursor_returns_only_newer_items(self):
+        cursor = self.client.get(reverse('api_feed')).json()['cursor']
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 2), count=5)
+        PushupEntry.objects.create(user=self.user, date=date(2025, 3, 3), count=7)
+
+        page = self.client.get(reverse('api_feed'), {'after': cursor}).json()
+        self.assertEqual([row[2] for row in page['rows']], [7, 5])
+
+        up_to_date = self.client.get(reverse('api_feed'), {'after': page['cursor']}).json()
+        self.assertEqual((up_to_date['rows'], up_to_date['cursor']), ([], page['cursor']))
+        self.assertEqual(self.client.get(reverse('api_feed'), {'after': 'nonsense'}).status_code, 400)
+
+    async def test_broadcaster_reads_once_for_all_listeners(self):
+        broadcaster = FeedBroadcaster(buffer_size=3, interval=60)
+        _, cursor, _ = await broadcaster.since(None)
+        await PushupEntry.objects.acreate(user=self.user, date=date(2025, 3, 2), count=5)
+
+        broadcaster.fetched_at = None
+        with mock.patch('tracker.feed.recent_entries', wraps=recent_entries) as fetch:
+            results = await asyncio.gather(*[broadcaster.since(cursor) for _ in range(50)])
+        self.assertEqual(fetch.call_count, 1)
+        self.assertTrue(all([row[2] for _, row in items] == [5] and complete for items, _, complete in results))
+
+    async def test_listener_that_fell_behind_is_told_to_reload(self):
+        broadcaster = FeedBroadcaster(buffer_size=2, interval=0)
+        _, cursor, _ = await broadcaster.since(None)
+        for day in range(2, 6):
+            await PushupEntry.objects.acreate(user=self.user, date=date(2025, 3, day), count=day)
+            await broadcaster.refresh()
+
+        items, _, complete = await broadcaster.since(cursor)
+        self.assertEqual((items, complete), ([], False))
+
+    def test_stream_is_opt_in(self):
+        self.assertEqual(self.client.get(reverse('api_feed_stream')).status_code, 404)
+        with override_settings(TRACKER_FEED_SSE=True):
+            self.client.logout()
+            self.assertEqual(self.client.get(reverse('api_feed_stream')).status_code, 401)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.other = User.objects.create_user('bob', password='pw')
+        today = timezone.now().date()
+        for count in (5, 12):
+            PushupEntry.objects.create(user=self.user, date=today, count=count)
+        PushupEntry.objects.create(user=self.other, date=today, count=30)
+
+    def capture(self):
+        contexts = []
+        receiver = lambda sender, context, **kwargs: contexts.append(context.flatten())
+        template_rendered.connect(receiver, weak=False)
+        self.addCleanup(template_rendered.disconnect, receiver)
+        return contexts
+
+    def sync_context(self, view, path, *args):
+        request = RequestFactory().get(path)
+        request.user = self.user
+        contexts = self.capture()
+        self.assertEqual(view(request, *args).status_code, 200)
+        return contexts[0]
+
+    async def async_context(self, view, path, *args):
+        async def auser():
+            return self.user
+        request = AsyncRequestFactory().get(path)
+        request.auser = auser
+        contexts = self.capture()
+        self.assertEqual((await view(request, *args)).status_code, 200)
+        return contexts[0]
+
+    async def test_async_pages_match_sync(self):
+        pages = [
+            ('dashboard', '/dashboard/', (), ['stats', 'today_total', 'user_rank', 'total_competitors', 'activity_feed']),
+            ('leaderboard', '/leaderboard/', (), ['leaderboard', 'next_month']),
+            ('profile', '/profile/bob/', ('bob',), ['stats', 'user_rank', 'total_users', 'comparison', 'recent_entries']),
+        ]
+        for name, path, args, keys in pages:
+            expected = await sync_to_async(self.sync_context)(getattr(views, name), path, *args)
+            actual = await self.async_context(getattr(async_views, name), path, *args)
+            for key in keys:
+                self.assertEqual(actual[key], expected[key], (name, key))
+
+    async def test_async_feed_api(self):
+        request = AsyncRequestFactory().get('/api/feed/')
+        request.auser = sync_to_async(AnonymousUser)
+        self.assertEqual((await async_views.feed(request)).status_code, 401)
+
+        request = AsyncRequestFactory().get('/api/feed/')
+        request.auser = sync_to_async(lambda: self.user)
+        payload = json.loads((await async_views.feed(request)).content)
+        self.assertEqual([row[2] for row in payload['rows']], [30, 12, 5])
+
+
+class ServiceWorkerTests(TestCase):
+    def test_served_from_root_with_build_version(self):
+        response = self.client.get('/service-worker.js')
+
+        self.assertEqual(response['Content-Type'], 'application/javascript')
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertContains(response, f"const VERSION = '{static_version()}';")
+        self.assertContains(response, '"/static/manifest.json"')
+        self.assertContains(response, "importScripts('/static/js/offline-queue.js');")
+
+    def test_logout_post_clears_user_caches(self):
+        worker = self.client.get('/service-worker.js').content.decode()
+        # Logout is a POST, so the session check must come before the GET-only return
+        self.assertLess(worker.index('SESSION_PATHS.some('), worker.index("request.method !== 'GET'"))
+
+    def test_version_follows_the_static_manifest(self):
+        _built_version.cache_clear()
+        self.addCleanup(_built_version.cache_clear)
+        with mock.patch('tracker.pwa.staticfiles_storage', SimpleNamespace(manifest_hash='0123abcd')):
+            self.assertEqual(static_version(), '0123abcd')
+
+
+class FrontEndAssetTests(TestCase):
+    def setUp(self):
+        User.objects.create_user('alice', password='pw')
+        self.client.login(username='alice', password='pw')
+        is_vendored.cache_clear()
+        self.addCleanup(is_vendored.cache_clear)
+
+    def test_vendored_files_are_served_locally(self):
+        with mock.patch('tracker.assets.finders.find', return_value='/found'):
+            response = self.client.get(reverse('leaderboard'))
+        self.assertContains(response, '/static/vendor/bootstrap/dist/css/bootstrap.min.css')
+        self.assertContains(response, '/static/css/custom.css')
+        self.assertNotContains(response, 'cdn.jsdelivr.net')
+        self.assertNotContains(response, '<style>')
+
+    def test_missing_files_fall_back_to_the_pinned_cdn_release(self):
+        with mock.patch('tracker.assets.finders.find', return_value=None):
+            response = self.client.get(reverse('leaderboard'))
+        self.assertContains(response, 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css')
+
+    def test_deploy_check_warns_until_vendored(self):
+        with mock.patch('tracker.assets.finders.find', return_value=None):
+            warnings = checks.check_vendored_assets(None)
+        self.assertEqual([warning.id for warning in warnings], ['tracker.W001'])
+        is_vendored.cache_clear()
+        with mock.patch('tracker.assets.finders.find', return_value='/found'):
+            self.assertEqual(checks.check_vendored_assets(None), [])
+
+    def test_chart_js_only_on_chart_pages(self):
+        self.assertNotContains(self.client.get(reverse('leaderboard')), 'chart.umd.js')
+        self.assertContains(self.client.get(reverse('dashboard')), 'chart.umd.js')
+        self.assertContains(self.client.get(reverse('profile')), 'chart.umd.js')
+
+    def test_pages_have_no_inline_scripts(self):
+        for name in ('dashboard', 'profile', 'add_entry', 'leaderboard'):
+            content = self.client.get(reverse(name)).content.decode()
+            # Only external files and json_script data blocks
+            scripts = re.findall(r'<script([^>]*)>', content)
+            self.assertTrue(scripts)
+            for attributes in scripts:
+                self.assertRegex(attributes, r'\bsrc=|type="application/json"', name)
+
+    def test_vendored_files_collect_under_manifest_storage(self):
+        releases = {
+            'bootstrap.min.css': b'.btn{color:red}\n/*# sourceMappingURL=bootstrap.min.css.map */',
+            'bootstrap-icons.min.css': b'@font-face{src:url("./fonts/bootstrap-icons.woff2?24e3eb84") format("woff2")}',
+            'bootstrap.bundle.min.js': b'console.log(1);\n//# sourceMappingURL=bootstrap.bundle.min.js.map\n',
+        }
+
+        def urlopen(url, timeout):
+            return BytesIO(releases.get(url.rpartition('/')[2], b'font or script'))
+
+        source, root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, root)
+        storages = {'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'}}
+        with override_settings(STATICFILES_DIRS=[source, settings.BASE_DIR / 'static'],
+                               STATIC_ROOT=root, STORAGES=storages):
+            with mock.patch('tracker.management.commands.vendor_assets.urllib.request.urlopen', urlopen):
+                call_command('vendor_assets', stdout=StringIO())
+            call_command('vendor_assets', '--check', stdout=StringIO())
+            call_command('collectstatic', '--noinput', verbosity=0)
+
+        with open(os.path.join(root, 'staticfiles.json')) as handle:
+            manifest = json.load(handle)['paths']
+        for name in VENDOR:
+            self.assertIn(static_path(name), manifest)
+        for name in ('bootstrap.css', 'bootstrap.js'):
+            with open(os.path.join(root, manifest[static_path(name)]), 'rb') as handle:
+                self.assertNotIn(b'sourceMappingURL', handle.read())
+
+
+class SyncEntriesTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.client.login(username='alice', password='pw')
+        self.today = timezone.now().date().isoformat()
+
+    def post(self, entries):
+        return self.client.post(reverse('api_sync'), json.dumps({'entries': entries}), content_type='application/json')
+
+    def test_batch_is_idempotent(self):
+        first, second = str(uuid.uuid4()), str(uuid.uuid4())
+        batch = [
+            {'client_id': first, 'date': self.today, 'count': 20},
+            {'client_id': second, 'date': self.today, 'count': 15, 'notes': 'gym'},
+            {'client_id': first, 'date': self.today, 'count': 20},
+            {'client_id': str(uuid.uuid4()), 'date': '2020-01-01', 'count': 5},
+            {'client_id': 'not-a-uuid', 'date': self.today, 'count': 5},
+            {'client_id': str(uuid.uuid4()), 'date': self.today, 'count': 0},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post(batch)
+
+        payload = response.json()
+        self.assertEqual(payload['created'], 2)
+        self.assertEqual([result['status'] for result in payload['results']],
+                         ['created', 'created', 'duplicate', 'invalid', 'invalid', 'invalid'])
+        self.assertEqual(payload['results'][0]['id'], payload['results'][2]['id'])
+        self.assertIn('count', payload['results'][5]['errors'])
+        today = timezone.now().date()
+        self.assertEqual(cache.get_user_stats(self.user, today.year, today.month)['total'], 35)
+
+        # Re-sending (even after the entries' day has passed) creates nothing
+        with mock.patch('tracker.forms.local_today', return_value=today + timedelta(days=1)):
+            retry = self.post(batch[:2]).json()
+        self.assertEqual((retry['created'], [r['status'] for r in retry['results']]), (0, ['duplicate', 'duplicate']))
+        self.assertEqual(PushupEntry.get_user_monthly_total(self.user, today.year, today.month), 35)
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.client.get(reverse('api_sync')).status_code, 405)
+        self.assertEqual(self.client.post(reverse('api_sync'), 'nope', content_type='application/json').status_code, 400)
+        with mock.patch('tracker.api.SYNC_BATCH_LIMIT', 1):
+            self.assertEqual(self.post([{}, {}]).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.post([]).status_code, 401)
+
+
+class LoadtestConnectionsTests(TransactionTestCase):
+    # The in-memory test database never closes its connections, so this
+    # only checks that requests go through the full handler and get counted
+    def test_reports_requests_and_connections(self):
+        User.objects.create_user('alice', password='pw')
+        out = StringIO()
+        call_command('loadtest_connections', '--requests', '12', '--concurrency', '3', '--path', '/leaderboard/', stdout=out)
+
+        self.assertIn('status codes: {200: 12}', out.getvalue())
+        self.assertRegex(out.getvalue(), r'connections set up by Django: \d+')
+
+
+class StressSqliteTests(SimpleTestCase):
+    def test_parallel_writers_on_tuned_sqlite(self):
+        out = StringIO()
+        call_command('stress_sqlite', '--writers', '6', '--entries', '6', stdout=out)
+
+        self.assertIn('0 "database is locked"', out.getvalue())
+        self.assertIn('monthly totals off: 0', out.getvalue())
+
+
+class BenchmarkSuiteTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+
+    def test_seed_builds_entries_and_totals(self):
+        call_command('seed_pushups', '--users', '4', '--days', '3', '--entries-per-day', '2', '--active', '1', stdout=StringIO())
+
+        self.assertEqual(User.objects.filter(username__startswith='seed').count(), 4)
+        self.assertEqual(PushupEntry.objects.count(), 4 * 3 * 2)
+        self.assertEqual(
+            sum(MonthlyTotal.objects.values_list('total', flat=True)),
+            sum(PushupEntry.objects.values_list('count', flat=True)),
+        )
+
+    def test_report_and_baseline(self):
+        call_command('seed_pushups', '--users', '3', '--days', '2', stdout=StringIO())
+        out = StringIO()
+        call_command('benchmark_pages', '--requests', '3', stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['pages']), {'dashboard', 'leaderboard', 'profile', 'history', 'add_entry'})
+        self.assertEqual(report['database']['users'], 3)
+        # add_entry's writes are rolled back
+        self.assertEqual(report['database']['entries'], PushupEntry.objects.count())
+        self.assertTrue(all(page['queries'] > 0 for page in report['pages'].values()))
+
+        report['pages']['dashboard']['queries'] -= 1
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as baseline:
+            json.dump(report, baseline)
+            baseline.flush()
+            with self.assertRaisesMessage(CommandError, 'dashboard'):
+                call_command('benchmark_pages', '--requests', '3', '--pages', 'dashboard',
+                             '--baseline', baseline.name, stdout=StringIO(), stderr=StringIO())
+
+
+class BuildIconsTests(SimpleTestCase):
+    def test_incremental_build_and_manifest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manifest = os.path.join(directory, 'manifest.json')
+            with open(manifest, 'w') as handle:
+                json.dump({'name': 'Pushup Counter', 'icons': []}, handle)
+
+            first = icons.build(directory, manifest_path=manifest, workers=2)
+            self.assertEqual(set(first.values()), {'written'})
+            self.assertIn('icon-maskable-512x512.png', first)
+
+            with open(manifest) as handle:
+                data = json.load(handle)
+            self.assertEqual(data['name'], 'Pushup Counter')
+            self.assertIn(
+                {'src': '/static/icons/icon-maskable-192x192.png', 'sizes': '192x192',
+                 'type': 'image/png', 'purpose': 'maskable'},
+                data['icons'],
+            )
+
+            # Nothing changed: nothing is rewritten
+            self.assertEqual(set(icons.build(directory, manifest_path=manifest, workers=2).values()), {'unchanged'})
+
+            os.remove(os.path.join(directory, 'favicon.png'))
+            stale = icons.build(directory, manifest_path=manifest, workers=2, dry_run=True)
+            self.assertEqual([name for name, status in stale.items() if status != 'unchanged'], ['favicon.png'])
+            self.assertFalse(os.path.exists(os.path.join(directory, 'favicon.png')))
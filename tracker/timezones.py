@@ -0,0 +1,64 @@
+"""
+Per-user calendars.
+
+An entry's ``date`` is the day in its user's timezone when it was written,
+so "today", the current month and every monthly aggregate follow the
+user's own midnight while the queries stay plain ranges on the indexed
+``date`` column; nothing is converted per query. The timezone name is
+cached and dropped when the profile changes (see signals.py). That only
+reaches every worker through a shared cache backend (file or redis, which
+the settings require for several workers); the timeout bounds how long
+any other cache can keep an old name.
+"""
+import zoneinfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Profile
+
+TIMEZONE_KEY = 'tracker:timezone:{user_id}'
+
+
+def _timeout():
+    return getattr(settings, 'TRACKER_TIMEZONE_CACHE_TIMEOUT', 5 * 60)
+
+
+def timezone_name(user_id):
+    """The user's IANA timezone name (``settings.TIME_ZONE`` without a profile)."""
+    key = TIMEZONE_KEY.format(user_id=user_id)
+    name = cache.get(key)
+    if name is None:
+        name = Profile.get_timezone(user_id)
+        cache.set(key, name, timeout=_timeout())
+    return name
+
+
+async def atimezone_name(user_id):
+    key = TIMEZONE_KEY.format(user_id=user_id)
+    name = await cache.aget(key)
+    if name is None:
+        name = await Profile.aget_timezone(user_id)
+        await cache.aset(key, name, timeout=_timeout())
+    return name
+
+
+def forget_timezone(user_id):
+    cache.delete(TIMEZONE_KEY.format(user_id=user_id))
+
+
+def user_timezone(user):
+    """The user's timezone as a ZoneInfo."""
+    return zoneinfo.ZoneInfo(timezone_name(user.pk))
+
+
+def local_today(user):
+    """Today's date on the user's calendar; the server's for anonymous users."""
+    if user is None or not user.is_authenticated:
+        return timezone.localdate()
+    return timezone.localdate(timezone=user_timezone(user))
+
+
+async def alocal_today(user):
+    return timezone.localdate(timezone=zoneinfo.ZoneInfo(await atimezone_name(user.pk)))
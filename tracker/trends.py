@@ -0,0 +1,103 @@
+"""
+Streaks and long-range trends from the DailyTotal rollup.
+
+A user's whole history is one indexed read of at most one row per active
+day. It is scattered once into a dense per-day numpy array (zero on rest
+days); everything else is whole-array arithmetic on it: a prefix-sum
+array gives any window's total (a week, a month, a rolling average) by
+subtracting two entries, and streaks are the runs between the edges of
+the active-day mask.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+# Rolling averages, in days
+ROLLING_WINDOWS = (7, 30)
+# How far back the rolling series, weekly and monthly totals go
+ROLLING_DAYS = 90
+WEEKS = 12
+MONTHS = 12
+
+
+def day_offsets(days, start):
+    """Days from ``start`` to each date in ``days``, as an integer array."""
+    return (np.array(days, dtype='datetime64[D]') - np.datetime64(start, 'D')).astype(np.int64)
+
+
+def dense_days(rows, start, end):
+    """Totals for every day from ``start`` to ``end`` (inclusive) as an array."""
+    days = np.zeros((end - start).days + 1, dtype=np.int64)
+    if rows:
+        dates, totals = zip(*rows)
+        days[day_offsets(dates, start)] = totals
+    return days
+
+
+def streaks(days):
+    """
+    ``(current, longest)`` runs of active days in a dense array ending today.
+
+    A streak is still current on a day with nothing logged yet, as long as
+    yesterday was active.
+    """
+    edges = np.diff(np.concatenate(([0], days > 0, [0])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    lengths = ends - starts
+    longest = int(lengths.max(initial=0))
+
+    # The last run counts if it reaches today or yesterday
+    current = int(lengths[-1]) if lengths.size and ends[-1] >= len(days) - 1 else 0
+    return current, longest
+
+
+def month_starts(last, count):
+    """The first days of the last ``count`` months up to ``last``, oldest first."""
+    index = last.year * 12 + last.month - 1
+    return [date(month // 12, month % 12 + 1, 1) for month in range(index - count + 1, index + 1)]
+
+
+def user_trends(rows, today):
+    """
+    Streaks, weekly/monthly/yearly totals and rolling averages from
+    ``(date, total)`` rows (oldest first, none after ``today``).
+    """
+    rows = list(rows)
+    start = min(rows[0][0] if rows else today, today - timedelta(days=ROLLING_DAYS + max(ROLLING_WINDOWS)))
+    days = dense_days(rows, start, today)
+    prefix = np.concatenate(([0], np.cumsum(days)))
+
+    def window_totals(firsts, ends):
+        """Totals from each of ``firsts`` up to (not including) ``ends``, clipped to the array."""
+        lo = np.clip(day_offsets(firsts, start), 0, len(days))
+        hi = np.clip(day_offsets(ends, start), 0, len(days))
+        return (prefix[hi] - prefix[lo]).tolist()
+
+    current, longest = streaks(days)
+
+    # Rolling averages for each of the last ROLLING_DAYS days
+    ends = np.arange(len(days) - ROLLING_DAYS + 1, len(days) + 1)
+    rolling = {
+        window: np.round((prefix[ends] - prefix[ends - window]) / window, 1).tolist()
+        for window in ROLLING_WINDOWS
+    }
+
+    monday = today - timedelta(days=today.weekday())
+    weeks = [monday - timedelta(weeks=offset) for offset in range(WEEKS - 1, -1, -1)]
+    months = month_starts(today, MONTHS)
+    years = list(range(rows[0][0].year if rows else today.year, today.year + 1))
+
+    return {
+        'current_streak': current,
+        'longest_streak': longest,
+        'total': int(prefix[-1]),
+        'days_active': len(rows),
+        'rolling': {window: series[-1] for window, series in rolling.items()},
+        'rolling_series': rolling,
+        'weekly': list(zip(weeks, window_totals(weeks, [week + timedelta(weeks=1) for week in weeks]))),
+        'monthly': list(zip(months, window_totals(months, months[1:] + [today + timedelta(days=1)]))),
+        'yearly': list(zip(years, window_totals(
+            [date(year, 1, 1) for year in years], [date(year + 1, 1, 1) for year in years]
+        ))),
+    }
@@ -1,18 +1,27 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import views, api, async_views
+
+# Read-heavy pages have async twins for ASGI deployments
+use_async = getattr(settings, 'TRACKER_ASYNC_VIEWS', False)
+pages = async_views if use_async else views
+feed_api = async_views if use_async else api
 
 urlpatterns = [
     # Home and authentication
     path('', views.home, name='home'),
+    path('service-worker.js', views.service_worker, name='service_worker'),
     path('signup/', views.signup, name='signup'),
     path('login/', auth_views.LoginView.as_view(template_name='tracker/login.html'), name='login'),
     path('logout/', auth_views.LogoutView.as_view(), name='logout'),
     
     # Dashboard and stats
-    path('dashboard/', views.dashboard, name='dashboard'),
-    path('leaderboard/', views.leaderboard, name='leaderboard'),
+    path('dashboard/', pages.dashboard, name='dashboard'),
+    path('leaderboard/', pages.leaderboard, name='leaderboard'),
     path('history/', views.history, name='history'),
+    path('history/export.<str:fmt>', views.export_history, name='export_history'),
+    path('leaderboard/export.<str:fmt>', views.export_leaderboard, name='export_leaderboard'),
     
     # Entry management
     path('add/', views.add_entry, name='add_entry'),
@@ -20,7 +29,19 @@ urlpatterns = [
     path('delete/<int:pk>/', views.delete_entry, name='delete_entry'),
     
     # Profile
-    path('profile/', views.profile, name='profile'),
-    path('profile/<str:username>/', views.profile, name='user_profile'),
+    path('profile/', pages.profile, name='profile'),
+    path('profile/<str:username>/', pages.profile, name='user_profile'),
+    path('settings/', views.account_settings, name='account_settings'),
+    
+    # JSON API
+    path('api/leaderboard/', api.leaderboard, name='api_leaderboard'),
+    path('api/me/stats/', api.my_stats, name='api_my_stats'),
+    path('api/me/chart/', api.my_chart, name='api_my_chart'),
+    path('api/me/trends/', api.my_trends, name='api_my_trends'),
+    path('api/compare/', api.compare, name='api_compare'),
+    path('api/feed/', feed_api.feed, name='api_feed'),
+    path('api/feed/stream/', api.feed_stream, name='api_feed_stream'),
+    path('api/history/', api.history, name='api_history'),
+    path('api/entries/sync/', api.sync, name='api_sync'),
 ]
 
@@ -1,12 +1,28 @@
+import json
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.utils import timezone
-from django.db.models import Sum
+from django.views.decorators.cache import cache_control
 from datetime import datetime
-from .models import PushupEntry
-from .forms import SignUpForm, PushupEntryForm
+from .models import PushupEntry, Profile, in_window
+from .forms import SignUpForm, PushupEntryForm, ProfileForm
+from .services import DashboardSnapshot, month_from_request, shift_month
+from . import cache
+from .pagination import keyset_page
+from .exports import FORMATS, stream_export
+from .pwa import precache_urls, static_version
+from .timezones import local_today
+
+HISTORY_PAGE_SIZE = 50
+# How long the service worker waits for a fresh page before showing the cached one
+SERVICE_WORKER_TIMEOUT_MS = 3000
+EXPORT_CHUNK_SIZE = 2000
 
 
 def home(request):
@@ -16,6 +32,18 @@ def home(request):
     return render(request, 'tracker/home.html')
 
 
+@cache_control(no_cache=True)
+def service_worker(request):
+    """The PWA service worker, served from the root so it controls every page."""
+    context = {
+        'version': static_version(),
+        'static_url': settings.STATIC_URL,
+        'precache_urls': json.dumps(precache_urls()),
+        'network_timeout_ms': SERVICE_WORKER_TIMEOUT_MS,
+    }
+    return render(request, 'tracker/service-worker.js', context, content_type='application/javascript')
+
+
 def signup(request):
     """User registration view."""
     if request.user.is_authenticated:
@@ -37,95 +65,58 @@ def signup(request):
 @login_required
 def dashboard(request):
     """User dashboard with personal stats."""
-    now = timezone.now()
-    current_year = now.year
-    current_month = now.month
-    today = now.date()
-    
-    # Get user's monthly stats
-    stats = PushupEntry.get_user_stats(request.user, current_year, current_month)
-    
-    # Get today's pushup count
-    today_total = PushupEntry.objects.filter(
-        user=request.user,
-        date=today
-    ).aggregate(total=Sum('count'))['total'] or 0
-    
-    # Get daily pushup data for chart
-    from calendar import monthrange
-    from datetime import date
-    
-    # Get number of days in current month
-    days_in_month = monthrange(current_year, current_month)[1]
-    
-    # Get all entries for current month grouped by day
-    daily_data = PushupEntry.objects.filter(
-        user=request.user,
-        date__year=current_year,
-        date__month=current_month
-    ).values('date').annotate(total=Sum('count')).order_by('date')
-    
-    # Create a dictionary for easy lookup
-    daily_dict = {entry['date'].day: entry['total'] for entry in daily_data}
-    
-    # Create lists for chart (all days of month)
-    chart_labels = list(range(1, days_in_month + 1))
-    chart_data = [daily_dict.get(day, 0) for day in chart_labels]
+    snapshot = DashboardSnapshot(request.user)
     
-    # Get user's recent entries
-    recent_entries = PushupEntry.objects.filter(user=request.user)[:10]
-    
-    # Get user's rank in current month
-    leaderboard = PushupEntry.get_monthly_leaderboard(current_year, current_month)
-    user_rank = None
-    for idx, entry in enumerate(leaderboard, 1):
-        if entry['user__id'] == request.user.id:
-            user_rank = idx
-            break
-    
-    # Get recent activity feed (all users)
-    activity_feed = PushupEntry.objects.select_related('user').order_by('-created_at')[:15]
-    
-    # Calculate yesterday for activity feed
-    from datetime import timedelta
-    yesterday = today - timedelta(days=1)
-    
-    context = {
-        'stats': stats,
-        'today_total': today_total,
-        'recent_entries': recent_entries,
-        'user_rank': user_rank,
-        'total_competitors': leaderboard.count(),
-        'current_month': now.strftime('%B %Y'),
-        'chart_labels': chart_labels,
-        'chart_data': chart_data,
-        'activity_feed': activity_feed,
-        'today': today,
-        'yesterday': yesterday,
+    return render(request, 'tracker/dashboard.html', snapshot.context())
+
+
+def leaderboard_month(request, now):
+    """The requested ``(year, month)``; future months are a 404."""
+    year, month = month_from_request(request, now)
+    if (year, month) > (now.year, now.month):
+        raise Http404('No leaderboard for future months.')
+    return year, month
+
+
+def leaderboard_context(request, board, year, month, now):
+    is_current = (year, month) == (now.year, now.month)
+    return {
+        'leaderboard': board,
+        'current_month': datetime(year, month, 1).strftime('%B %Y'),
+        'current_user_id': request.user.id,
+        'selected_year': year,
+        'selected_month': month,
+        'is_current_month': is_current,
+        'previous_month': shift_month(year, month, -1),
+        'next_month': None if is_current else shift_month(year, month, 1),
     }
-    
-    return render(request, 'tracker/dashboard.html', context)
 
 
 @login_required
 def leaderboard(request):
-    """Leaderboard view showing all users' rankings."""
-    now = timezone.now()
-    current_year = now.year
-    current_month = now.month
-    
-    # Get monthly leaderboard
-    leaderboard_data = PushupEntry.get_monthly_leaderboard(current_year, current_month)
+    """Leaderboard view showing all users' rankings for a month (``?year=&month=``)."""
+    now = timezone.localtime()
+    year, month = leaderboard_month(request, now)
     
-    context = {
-        'leaderboard': leaderboard_data,
-        'current_month': now.strftime('%B %Y'),
-        'current_user_id': request.user.id,
-    }
+    # Live for the current month, frozen once the month is over
+    leaderboard_data = cache.get_leaderboard(year, month)
     
+    context = leaderboard_context(request, leaderboard_data, year, month, now)
     return render(request, 'tracker/leaderboard.html', context)
 
 
+def locked_entries():
+    """
+    Entries to read and then change in one transaction.
+
+    The monthly totals are adjusted by the difference from the count read
+    here, so two concurrent edits must not both start from the same copy:
+    PostgreSQL locks the row, and SQLite with DJANGO_SQLITE_TUNED begins the
+    transaction with the database write lock (``BEGIN IMMEDIATE``).
+    """
+    return PushupEntry.objects.select_for_update()
+
+
 @login_required
 def add_entry(request):
     """Add a new pushup entry."""
@@ -152,15 +143,16 @@ def add_entry(request):
 @login_required
 def edit_entry(request, pk):
     """Edit an existing pushup entry."""
-    entry = get_object_or_404(PushupEntry, pk=pk, user=request.user)
-    
     if request.method == 'POST':
-        form = PushupEntryForm(request.POST, instance=entry, user=request.user)
-        if form.is_valid():
-            form.save()
-            messages.success(request, 'Entry updated successfully!')
-            return redirect('dashboard')
+        with transaction.atomic():
+            entry = get_object_or_404(locked_entries(), pk=pk, user=request.user)
+            form = PushupEntryForm(request.POST, instance=entry, user=request.user)
+            if form.is_valid():
+                form.save()
+                messages.success(request, 'Entry updated successfully!')
+                return redirect('dashboard')
     else:
+        entry = get_object_or_404(PushupEntry, pk=pk, user=request.user)
         form = PushupEntryForm(instance=entry, user=request.user)
     
     context = {
@@ -176,104 +168,122 @@ def edit_entry(request, pk):
 @login_required
 def delete_entry(request, pk):
     """Delete a pushup entry."""
-    entry = get_object_or_404(PushupEntry, pk=pk, user=request.user)
-    
     if request.method == 'POST':
-        entry.delete()
+        with transaction.atomic():
+            get_object_or_404(locked_entries(), pk=pk, user=request.user).delete()
         messages.success(request, 'Entry deleted successfully!')
         return redirect('dashboard')
     
+    entry = get_object_or_404(PushupEntry, pk=pk, user=request.user)
     context = {'entry': entry}
     return render(request, 'tracker/entry_confirm_delete.html', context)
 
 
-@login_required
-def history(request):
-    """View all entries with filtering options."""
+def filter_history(request):
+    """
+    Return the user's entries filtered by the ``year``/``month`` GET params,
+    plus the cleaned params (anything invalid is ignored).
+    """
     entries = PushupEntry.objects.filter(user=request.user)
     
-    # Get filter parameters
-    year = request.GET.get('year')
-    month = request.GET.get('month')
-    
-    if year:
-        entries = entries.filter(date__year=year)
-    if month:
+    year = request.GET.get('year', '')
+    month = request.GET.get('month', '')
+    if not year.isdigit() or not 1 <= int(year) <= 9998:
+        year = ''
+    if not month.isdigit() or not 1 <= int(month) <= 12:
+        month = ''
+    
+    if year and month:
+        entries = entries.filter(**in_window(year, month))
+    elif year:
+        entries = entries.filter(**in_window(year))
+    elif month:
+        # The same month across every year can't be a single date range
         entries = entries.filter(date__month=month)
     
+    return entries, year, month
+
+
+@login_required
+def history(request):
+    """View all entries with filtering options, one keyset page at a time."""
+    entries, year, month = filter_history(request)
+    
+    cursor = request.GET.get('after')
+    page, next_cursor = keyset_page(entries, cursor, page_size=HISTORY_PAGE_SIZE)
+    
     # Get available years for filter dropdown
     years = PushupEntry.objects.filter(user=request.user).dates('date', 'year', order='DESC')
     
     context = {
-        'entries': entries,
+        'entries': page,
         'years': years,
         'selected_year': year,
         'selected_month': month,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
     }
     
     return render(request, 'tracker/history.html', context)
 
 
 @login_required
-def profile(request, username=None):
-    """View a user's profile and stats."""
-    from django.contrib.auth.models import User
-    from calendar import monthrange
-    
-    if username:
-        profile_user = get_object_or_404(User, username=username)
-    else:
-        profile_user = request.user
-    
-    now = timezone.now()
-    current_year = now.year
-    current_month = now.month
-    
-    # Get user's stats
-    stats = PushupEntry.get_user_stats(profile_user, current_year, current_month)
+def export_history(request, fmt):
+    """Stream the user's (filtered) entries as CSV or NDJSON."""
+    if fmt not in FORMATS:
+        raise Http404('Unsupported export format.')
     
-    # Get daily pushup data for chart
-    days_in_month = monthrange(current_year, current_month)[1]
+    entries, year, month = filter_history(request)
+    columns = ('date', 'count', 'notes', 'created_at')
+    rows = entries.order_by('-date', '-created_at', '-id').values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
     
-    # Get all entries for current month grouped by day
-    daily_data = PushupEntry.objects.filter(
-        user=profile_user,
-        date__year=current_year,
-        date__month=current_month
-    ).values('date').annotate(total=Sum('count')).order_by('date')
-    
-    # Create a dictionary for easy lookup
-    daily_dict = {entry['date'].day: entry['total'] for entry in daily_data}
-    
-    # Create lists for chart (all days of month)
-    chart_labels = list(range(1, days_in_month + 1))
-    chart_data = [daily_dict.get(day, 0) for day in chart_labels]
-    
-    # Get user's rank
-    leaderboard = PushupEntry.get_monthly_leaderboard(current_year, current_month)
-    user_rank = None
-    total_users = leaderboard.count()
-    for idx, entry in enumerate(leaderboard, 1):
-        if entry['user__id'] == profile_user.id:
-            user_rank = idx
-            break
-    
-    # Get recent entries
-    recent_entries = PushupEntry.objects.filter(user=profile_user)[:10]
+    filename = '-'.join(filter(None, ['pushups', request.user.username, year, month.zfill(2) if month else '']))
+    return stream_export(columns, rows, filename, fmt)
+
+
+@login_required
+def export_leaderboard(request, fmt):
+    """Stream the leaderboard for any month (``?year=&month=``, default: current)."""
+    if fmt not in FORMATS:
+        raise Http404('Unsupported export format.')
+    
+    year, month = month_from_request(request)
+    
+    rows = (
+        (row.rank, row.username, row.first_name, row.last_name, row.total)
+        for row in cache.get_leaderboard(year, month)
+    )
+    columns = ('rank', 'username', 'first_name', 'last_name', 'total_pushups')
+    return stream_export(columns, rows, f'leaderboard-{year}-{month:02d}', fmt)
+
+
+def profile_users(request, profile_user):
+    """Users to compare on a profile: its owner, then the viewer if different."""
+    return [profile_user] if profile_user == request.user else [profile_user, request.user]
+
+
+def profile_context(request, profile_user, comparison, rank, recent_entries, trends, now):
+    """
+    Template context for ``tracker/profile.html``. ``comparison`` covers the
+    profile user and, on someone else's profile, the viewer as well.
+    """
+    theirs = comparison.for_user(profile_user.pk)
+    stats = theirs.stats()
     
     # Calculate comparison with current user (if viewing someone else's profile)
-    comparison = None
-    if profile_user != request.user:
-        current_user_stats = PushupEntry.get_user_stats(request.user, current_year, current_month)
-        difference = stats['total'] - current_user_stats['total']
-        comparison = {
+    viewer = comparison.for_user(request.user.pk) if profile_user != request.user else None
+    head_to_head = None
+    if viewer is not None:
+        difference = theirs.total - viewer.total
+        head_to_head = {
             'difference': abs(difference),
             'ahead': difference > 0,
             'behind': difference < 0,
             'tied': difference == 0
         }
     
-    context = {
+    user_rank, total_users = rank
+    return {
         'profile_user': profile_user,
         'stats': stats,
         'user_rank': user_rank,
@@ -281,10 +291,59 @@ def profile(request, username=None):
         'recent_entries': recent_entries,
         'current_month': now.strftime('%B %Y'),
         'is_own_profile': profile_user == request.user,
-        'chart_labels': chart_labels,
-        'chart_data': chart_data,
-        'comparison': comparison,
+        'chart_labels': list(comparison.labels),
+        'chart_data': list(theirs.daily),
+        'viewer_chart_data': list(viewer.daily) if viewer else None,
+        'comparison': head_to_head,
+        'trends': trends,
     }
+
+
+@login_required
+def profile(request, username=None):
+    """View a user's profile and stats."""
+    from django.contrib.auth.models import User
+    
+    if username:
+        profile_user = get_object_or_404(User, username=username)
+    else:
+        profile_user = request.user
+    
+    now = timezone.localtime()
+    current_year = now.year
+    current_month = now.month
     
+    # Both users' stats and daily series come from one grouped query
+    comparison = cache.get_comparison(profile_users(request, profile_user), current_year, current_month)
+    
+    # Get user's rank
+    rank = cache.get_user_rank(profile_user, current_year, current_month)
+    
+    # Get recent entries
+    recent_entries = list(PushupEntry.objects.filter(user=profile_user)[:10])
+    
+    # Streaks and long-range trends, on the profile user's own calendar
+    trends = cache.get_user_trends(profile_user, local_today(profile_user))
+    
+    context = profile_context(request, profile_user, comparison, rank, recent_entries, trends, now)
     return render(request, 'tracker/profile.html', context)
 
+
+@login_required
+def account_settings(request):
+    """Let the user pick the timezone their days are counted in."""
+    profile = Profile.objects.filter(user=request.user).first() or Profile(user=request.user)
+
+    if request.method == 'POST':
+        form = ProfileForm(request.POST, instance=profile)
+        if form.is_valid():
+            form.save()
+            messages.success(request, f'Your days now start at midnight in {profile.timezone}.')
+            return redirect('account_settings')
+    else:
+        form = ProfileForm(instance=profile)
+        if not profile.pk:
+            # Nothing chosen yet: let the browser suggest its own timezone
+            form.fields['timezone'].widget.attrs['data-browser-timezone'] = 'suggest'
+
+    return render(request, 'tracker/settings.html', {'form': form})